@@ -0,0 +1,123 @@
+"""Add unique answer per user and question
+
+Revision ID: 3f2a9c1d7e54
+Revises: fd6b6177424f
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2a9c1d7e54"
+down_revision: Union[str, Sequence[str], None] = "fd6b6177424f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 1回のDELETEで消す重複回答の最大件数（ロック時間を抑えるため）
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+
+    with op.get_context().autocommit_block():
+        # (user_id, question_id) ごとに最新の回答を残し、それ以外を対応付ける
+        conn.execute(
+            sa.text("""
+                CREATE TEMPORARY TABLE answer_dedupe_map AS
+                SELECT answer_id, keep_answer_id
+                FROM (
+                    SELECT
+                        answer_id,
+                        FIRST_VALUE(answer_id) OVER (
+                            PARTITION BY user_id, question_id
+                            ORDER BY created_at DESC, answer_id DESC
+                        ) AS keep_answer_id
+                    FROM answers
+                ) ranked
+                WHERE answer_id <> keep_answer_id
+                """)
+        )
+
+        # 残す回答へ付け替えると重複するいいねを先に削除する
+        conn.execute(
+            sa.text("""
+                DELETE FROM answer_likes
+                WHERE like_id IN (
+                    SELECT like_id
+                    FROM (
+                        SELECT
+                            l.like_id,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY
+                                    COALESCE(m.keep_answer_id, l.answer_id),
+                                    l.user_id
+                                ORDER BY
+                                    CASE WHEN m.answer_id IS NULL THEN 0 ELSE 1 END,
+                                    l.created_at
+                            ) AS rn
+                        FROM answer_likes l
+                        LEFT JOIN answer_dedupe_map m ON m.answer_id = l.answer_id
+                    ) ranked_likes
+                    WHERE rn > 1
+                )
+                """)
+        )
+
+        select_batch = sa.text(
+            "SELECT answer_id FROM answer_dedupe_map ORDER BY answer_id LIMIT :limit"
+        )
+        repoint_messages = sa.text("""
+            UPDATE messages
+            SET reference_answer_id = (
+                SELECT m.keep_answer_id
+                FROM answer_dedupe_map m
+                WHERE m.answer_id = messages.reference_answer_id
+            )
+            WHERE reference_answer_id IN :ids
+            """).bindparams(sa.bindparam("ids", expanding=True))
+        repoint_likes = sa.text("""
+            UPDATE answer_likes
+            SET answer_id = (
+                SELECT m.keep_answer_id
+                FROM answer_dedupe_map m
+                WHERE m.answer_id = answer_likes.answer_id
+            )
+            WHERE answer_id IN :ids
+            """).bindparams(sa.bindparam("ids", expanding=True))
+        delete_answers = sa.text(
+            "DELETE FROM answers WHERE answer_id IN :ids"
+        ).bindparams(sa.bindparam("ids", expanding=True))
+        delete_mapped = sa.text(
+            "DELETE FROM answer_dedupe_map WHERE answer_id IN :ids"
+        ).bindparams(sa.bindparam("ids", expanding=True))
+
+        while True:
+            ids = [
+                row.answer_id
+                for row in conn.execute(select_batch, {"limit": BATCH_SIZE})
+            ]
+            if not ids:
+                break
+
+            conn.execute(repoint_messages, {"ids": ids})
+            conn.execute(repoint_likes, {"ids": ids})
+            conn.execute(delete_answers, {"ids": ids})
+            conn.execute(delete_mapped, {"ids": ids})
+
+        conn.execute(sa.text("DROP TABLE answer_dedupe_map"))
+
+    op.create_unique_constraint(
+        "uq_answer_user_question", "answers", ["user_id", "question_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_answer_user_question", "answers", type_="unique")
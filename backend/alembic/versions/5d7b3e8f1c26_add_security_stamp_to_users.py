@@ -0,0 +1,31 @@
+"""Add security_stamp to users
+
+Revision ID: 5d7b3e8f1c26
+Revises: 8c41e7b2a9d3
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d7b3e8f1c26"
+down_revision: Union[str, Sequence[str], None] = "8c41e7b2a9d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users", sa.Column("security_stamp", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "security_stamp")
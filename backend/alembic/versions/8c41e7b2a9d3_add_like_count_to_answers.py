@@ -0,0 +1,42 @@
+"""Add like_count to answers
+
+Revision ID: 8c41e7b2a9d3
+Revises: 3f2a9c1d7e54
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41e7b2a9d3"
+down_revision: Union[str, Sequence[str], None] = "3f2a9c1d7e54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "answers",
+        sa.Column("like_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    # 既存のいいね数でカウンタを初期化する
+    op.execute("""
+        UPDATE answers
+        SET like_count = (
+            SELECT count(*) FROM answer_likes l WHERE l.answer_id = answers.answer_id
+        )
+        WHERE EXISTS (
+            SELECT 1 FROM answer_likes l WHERE l.answer_id = answers.answer_id
+        )
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("answers", "like_count")
@@ -0,0 +1,196 @@
+"""
+Response Serialization Benchmark
+
+Serializes 100-item message and visit lists built from ORM objects and compares:
+
+    response_model : what FastAPI does for response_model routes (validate every
+                     row into the response model with from_attributes, then
+                     dump_json). For visits this also includes building the
+                     VisitRead / VisitorInfo instances the endpoint used to create.
+    fast path      : src.schema.serialization (precompiled attribute plan + orjson)
+
+Usage:
+    python scripts/bench_serialization.py                 # 2000 iterations per case
+    python scripts/bench_serialization.py --iterations 500 --items 50
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+
+from src.db.tables import (
+    Message,
+    MessageStatusEnum,
+    MessageTypeEnum,
+    NotificationLevelEnum,
+    User,
+    Visit,
+)
+from src.schema.message import MessageRead
+from src.schema.serialization import orm_list_response
+from src.schema.visit import VisitorInfo, VisitRead
+
+NOW = datetime(2024, 6, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def make_users(count: int) -> list[User]:
+    return [
+        User(
+            user_id=f"user-{i}",
+            user_name=f"user_{i}",
+            display_name=f"User {i}",
+            bio="Hello! " * 10,
+            icon_url=f"https://example.com/icons/{i}.png",
+            notification_level=NotificationLevelEnum.all,
+            created_at=NOW - timedelta(days=i),
+            last_login_at=NOW,
+        )
+        for i in range(count)
+    ]
+
+
+def make_messages(count: int) -> list[Message]:
+    """受信一覧と同じ形: 送信者・受信者つき、各メッセージに2件のリプライ"""
+    users = make_users(20)
+    owner = users[0]
+    messages = []
+    for i in range(count):
+        sender = users[i % 19 + 1]
+        message = Message(
+            message_id=f"message-{i}",
+            from_user_id=sender.user_id,
+            to_user_id=owner.user_id,
+            message_type=MessageTypeEnum.comment,
+            content="メッセージ本文 " * 20,
+            status=MessageStatusEnum.unread,
+            created_at=NOW - timedelta(minutes=i),
+            from_user=sender,
+            to_user=owner,
+        )
+        message.replies = [
+            Message(
+                message_id=f"message-{i}-reply-{j}",
+                from_user_id=author.user_id,
+                to_user_id=sender.user_id,
+                message_type=MessageTypeEnum.comment,
+                content="返信 " * 10,
+                parent_message_id=message.message_id,
+                status=MessageStatusEnum.read,
+                created_at=NOW - timedelta(minutes=i, seconds=j),
+                from_user=author,
+            )
+            for j, author in enumerate((owner, sender))
+        ]
+        message.reply_count = len(message.replies)
+        messages.append(message)
+    return messages
+
+
+def make_visits(count: int) -> list[Visit]:
+    """訪問者一覧と同じ形: 4件に1件は匿名の訪問"""
+    users = make_users(20)
+    visits = []
+    for i in range(count):
+        visitor = users[i % 19 + 1]
+        anonymous = i % 4 == 0
+        visits.append(
+            Visit(
+                visit_id=i,
+                visitor_user_id=None if anonymous else visitor.user_id,
+                visited_user_id=users[0].user_id,
+                is_anonymous=anonymous,
+                visited_at=NOW - timedelta(hours=i),
+                visitor_user=None if anonymous else visitor,
+            )
+        )
+    return visits
+
+
+def response_model_json(adapter: TypeAdapter, rows) -> bytes:
+    return adapter.dump_json(
+        adapter.validate_python(rows, from_attributes=True), by_alias=True
+    )
+
+
+def legacy_visits_json(adapter: TypeAdapter, visits: list[Visit]) -> bytes:
+    # 以前のエンドポイントと同じく VisitRead を組み立ててから response_model を通す
+    visit_reads = []
+    for visit in visits:
+        visitor_info = None
+        if visit.visitor_user and not visit.is_anonymous:
+            visitor_info = VisitorInfo(
+                user_id=visit.visitor_user.user_id,
+                user_name=visit.visitor_user.user_name,
+                display_name=visit.visitor_user.display_name,
+                icon_url=visit.visitor_user.icon_url,
+                is_anonymous=False,
+            )
+        elif visit.is_anonymous:
+            visitor_info = VisitorInfo(is_anonymous=True)
+        visit_reads.append(
+            VisitRead(
+                visit_id=visit.visit_id,
+                visitor_user_id=visit.visitor_user_id,
+                visited_user_id=visit.visited_user_id,
+                is_anonymous=visit.is_anonymous,
+                visited_at=visit.visited_at,
+                visitor_info=visitor_info,
+            )
+        )
+    return response_model_json(adapter, visit_reads)
+
+
+def fast_visits_json(visits: list[Visit]) -> bytes:
+    anonymous = VisitorInfo(is_anonymous=True)
+    for visit in visits:
+        visit.visitor_info = anonymous if visit.is_anonymous else visit.visitor_user
+    return orm_list_response(VisitRead, visits).body
+
+
+def measure(func, iterations: int) -> float:
+    for _ in range(min(iterations, 100)):
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=100)
+    args = parser.parse_args()
+
+    messages = make_messages(args.items)
+    visits = make_visits(args.items)
+    message_adapter = TypeAdapter(list[MessageRead])
+    visit_adapter = TypeAdapter(list[VisitRead])
+
+    cases = {
+        "messages": (
+            lambda: response_model_json(message_adapter, messages),
+            lambda: orm_list_response(MessageRead, messages).body,
+        ),
+        "visits": (
+            lambda: legacy_visits_json(visit_adapter, visits),
+            lambda: fast_visits_json(visits),
+        ),
+    }
+
+    print(f"=== Serialization ({args.items} items, {args.iterations} iterations) ===")
+    for name, (baseline, fast) in cases.items():
+        # 計測の前に出力が同じであることを確認する
+        assert baseline() == fast(), f"{name}: outputs differ"
+        before = measure(baseline, args.iterations)
+        after = measure(fast, args.iterations)
+        print(
+            f"  {name:<9} response_model {before * 1e6:8.1f} µs"
+            f"   fast path {after * 1e6:8.1f} µs   ({before / after:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
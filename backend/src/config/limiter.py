@@ -1,4 +1,9 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import os
 
-limiter = Limiter(key_func=get_remote_address)
+from src.service.rate_limiter import RateLimiter, create_rate_limit_backend
+
+# アプリ全体で1つのリミッタを共有する（ルートごとにバケツは分かれる）
+limiter = RateLimiter(
+    create_rate_limit_backend(),
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true",
+)
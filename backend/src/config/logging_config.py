@@ -1,7 +1,13 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
-from typing import Any
+import threading
+from dataclasses import dataclass
+from typing import Any, TextIO
 
 import structlog
 from structlog.types import EventDict, Processor
@@ -13,13 +19,195 @@ def add_app_context(logger: Any, method_name: str, event_dict: EventDict) -> Eve
     return event_dict
 
 
+@dataclass(frozen=True)
+class RequestLogSampler:
+    """リクエスト開始・完了ログのサンプリング設定
+
+    route_rates はパスの前方一致で、最も長く一致したものを使う。
+    サンプリングで間引いたリクエストでも、エラーと遅いリクエストは完了ログを残す。
+    """
+
+    default_rate: float = 1.0
+    route_rates: tuple[tuple[str, float], ...] = ()
+    slow_request_seconds: float = 1.0
+
+    def rate_for(self, path: str) -> float:
+        matched = ""
+        rate = self.default_rate
+        for prefix, prefix_rate in self.route_rates:
+            if path.startswith(prefix) and len(prefix) > len(matched):
+                matched, rate = prefix, prefix_rate
+        return rate
+
+    def should_sample(self, path: str) -> bool:
+        rate = self.rate_for(path)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def should_keep(
+        self, sampled: bool, status_code: int | None, duration: float
+    ) -> bool:
+        return (
+            sampled
+            or status_code is None
+            or status_code >= 500
+            or duration >= self.slow_request_seconds
+        )
+
+
+def _parse_route_rates(raw: str) -> tuple[tuple[str, float], ...]:
+    # 例: "/health=0,/messages=0.1"
+    rates = []
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        prefix, rate = item.rsplit("=", 1)
+        rates.append((prefix.strip(), float(rate)))
+    return tuple(rates)
+
+
+_request_log_sampler = RequestLogSampler()
+
+
+def get_request_log_sampler() -> RequestLogSampler:
+    return _request_log_sampler
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """キューが満杯のときは待たずにレコードを捨て、件数だけ数える"""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_STOP = object()
+
+
+class BatchingLogWriter:
+    """キューに溜まったレコードをまとめて1回の write で出力するスレッド"""
+
+    def __init__(self, log_queue: queue.Queue, stream: TextIO, batch_size: int):
+        self.queue = log_queue
+        self.stream = stream
+        self.batch_size = batch_size
+        self.batches = 0
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def restart(self, log_queue: queue.Queue) -> None:
+        # フォークした子プロセスにはスレッドが引き継がれないため作り直す
+        self.queue = log_queue
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            stopping = item is _STOP
+            lines = [] if stopping else [item.getMessage()]
+            # 待たずに取り出せる分だけまとめる（負荷が低いときは即座に書き出す）
+            while not stopping and len(lines) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                lines.append(item.getMessage())
+
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    pass
+                self.batches += 1
+            if stopping:
+                return
+
+
+_log_handler: DroppingQueueHandler | None = None
+_log_writer: BatchingLogWriter | None = None
+
+
+def log_queue_stats() -> dict:
+    if _log_handler is None or _log_writer is None:
+        return {}
+    return {
+        "queued": _log_handler.queue.qsize(),
+        "dropped": _log_handler.dropped,
+        "batches": _log_writer.batches,
+    }
+
+
+def stop_log_writer() -> None:
+    """キューに残ったログを書き出して止める（atexit を経ずに終了するプロセス向け）"""
+    if _log_writer is not None:
+        _log_writer.stop()
+
+
+def _restart_log_writer_in_child() -> None:
+    # フォーク時点のキューの中身は親プロセスが書き出すため、子では空のキューから始める
+    if _log_handler is None or _log_writer is None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=_log_handler.queue.maxsize)
+    _log_handler.queue = log_queue
+    _log_writer.restart(log_queue)
+
+
+def _create_async_handler(stream: TextIO) -> logging.Handler:
+    global _log_handler, _log_writer
+
+    log_queue: queue.Queue = queue.Queue(
+        maxsize=int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+    )
+    _log_handler = DroppingQueueHandler(log_queue)
+    _log_handler.setFormatter(logging.Formatter("%(message)s"))
+    _log_writer = BatchingLogWriter(
+        log_queue, stream, batch_size=int(os.getenv("LOG_BATCH_SIZE", "256"))
+    )
+    _log_writer.start()
+    # 終了時にキューに残ったログを書き出す
+    atexit.register(_log_writer.stop)
+    os.register_at_fork(after_in_child=_restart_log_writer_in_child)
+    return _log_handler
+
+
 def configure_logging() -> None:
-    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    global _request_log_sampler
+
+    log_level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+
+    # stdout への書き込みはリクエスト処理のスレッドから切り離し、専用スレッドでまとめて行う
+    if os.getenv("LOG_ASYNC", "true").lower() == "true" and not logging.root.handlers:
+        logging.basicConfig(
+            level=log_level, handlers=[_create_async_handler(sys.stdout)]
+        )
+    else:
+        logging.basicConfig(format="%(message)s", stream=sys.stdout, level=log_level)
 
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level, logging.INFO),
+    _request_log_sampler = RequestLogSampler(
+        default_rate=float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0")),
+        route_rates=_parse_route_rates(os.getenv("LOG_REQUEST_SAMPLE_RATES", "")),
+        slow_request_seconds=float(os.getenv("LOG_SLOW_REQUEST_SECONDS", "1.0")),
     )
 
     environment = os.getenv("ENVIRONMENT", "development")
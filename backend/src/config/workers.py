@@ -0,0 +1,62 @@
+import os
+
+from src.config.env_config import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from src.service.rate_limiter import RATE_LIMIT_BACKEND
+from src.service.revocation_store import (
+    TOKEN_REVOCATION_BACKEND,
+    TOKEN_REVOCATION_DATABASE_URL,
+    TOKEN_REVOCATION_MAX_OVERFLOW,
+    TOKEN_REVOCATION_POOL_SIZE,
+)
+
+# ワーカープロセス数（uvicorn --workers の既定値も同じ環境変数から取られる）
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# DBの max_connections のうちこのアプリに割り当てる数（未設定なら確認しない）
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+
+# プライマリに接続するエンジン（同期・非同期）の数
+PRIMARY_ENGINES_PER_WORKER = 2
+
+
+def check_worker_safety(
+    workers: int,
+    revocation_backend: str = TOKEN_REVOCATION_BACKEND,
+    rate_limit_backend: str = RATE_LIMIT_BACKEND,
+    max_connections: int = DB_MAX_CONNECTIONS,
+) -> list[str]:
+    """複数ワーカーで動かすと正しく動作しない設定を列挙する"""
+    if workers <= 1:
+        return []
+
+    problems = []
+    if revocation_backend == "memory":
+        problems.append(
+            "TOKEN_REVOCATION_BACKEND=memory: logouts in one worker are not seen "
+            "by the others (use database)"
+        )
+    if rate_limit_backend == "memory":
+        problems.append(
+            f"RATE_LIMIT_BACKEND=memory: every worker keeps its own buckets, "
+            f"allowing {workers}x the configured limits (use sqlite or redis)"
+        )
+
+    per_worker = PRIMARY_ENGINES_PER_WORKER * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # 失効ストアは別の URL を指定しない限りプライマリに自前のエンジンで接続する
+    if revocation_backend == "database" and not TOKEN_REVOCATION_DATABASE_URL:
+        per_worker += TOKEN_REVOCATION_POOL_SIZE + TOKEN_REVOCATION_MAX_OVERFLOW
+    connections = workers * per_worker
+    if max_connections and connections > max_connections:
+        problems.append(
+            f"{workers} workers may open {connections} DB connections, more than "
+            f"DB_MAX_CONNECTIONS={max_connections} (lower DB_POOL_SIZE / DB_MAX_OVERFLOW "
+            f"/ TOKEN_REVOCATION_POOL_SIZE / TOKEN_REVOCATION_MAX_OVERFLOW)"
+        )
+    return problems
+
+
+def ensure_worker_safety(workers: int = WEB_CONCURRENCY) -> None:
+    problems = check_worker_safety(workers)
+    if problems:
+        raise RuntimeError(
+            f"Unsafe configuration for {workers} workers: " + "; ".join(problems)
+        )
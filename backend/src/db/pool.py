@@ -0,0 +1,32 @@
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.service.metrics import DB_POOL_CHECKOUT_WAIT
+
+
+class TimedQueuePool(QueuePool):
+    """接続の取り出しにかかった時間（プール枯渇時の待ち時間を含む）を記録する"""
+
+    metrics_name = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(
+                time.perf_counter() - started, self.metrics_name
+            )
+
+
+class TimedAsyncAdaptedQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+class TimedReadQueuePool(TimedQueuePool):
+    metrics_name = "sync_read"
+
+
+class TimedAsyncAdaptedReadQueuePool(TimedAsyncAdaptedQueuePool):
+    metrics_name = "async_read"
@@ -0,0 +1,81 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator, Callable, Generator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+# 直前に書き込んだクライアントに付けるクッキー（有効な間は読み取りもプライマリで行う）
+PIN_COOKIE = "db_primary"
+
+
+@dataclass
+class RequestRouting:
+    # クッキーにより、このリクエストの読み取りはプライマリに固定されている
+    pinned: bool = False
+    # このリクエストで書き込みが行われた
+    wrote: bool = False
+
+
+request_routing: ContextVar[RequestRouting | None] = ContextVar(
+    "request_routing", default=None
+)
+
+
+def use_primary() -> bool:
+    routing = request_routing.get()
+    return routing is not None and (routing.pinned or routing.wrote)
+
+
+def mark_write() -> None:
+    routing = request_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    mark_write()
+
+
+def _do_orm_execute(orm_execute_state: ORMExecuteState) -> None:
+    # session.execute(insert(...)) などの一括DMLはフラッシュを経由しない
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        mark_write()
+
+
+def track_writes() -> None:
+    """すべての Session（AsyncSession の内部のものを含む）で書き込みを検出する"""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+    if not event.contains(Session, "do_orm_execute", _do_orm_execute):
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+
+
+def read_session_dependency(
+    primary: sessionmaker, replica: sessionmaker
+) -> Callable[[], Generator[Session, None, None]]:
+    """読み取り専用のエンドポイント向けに、レプリカ（固定中はプライマリ）の Session を返す依存関数"""
+
+    def get_read_db() -> Generator[Session, None, None]:
+        db = (primary if use_primary() else replica)()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return get_read_db
+
+
+def async_read_session_dependency(
+    primary: async_sessionmaker, replica: async_sessionmaker
+) -> Callable[[], AsyncGenerator[AsyncSession, None]]:
+    async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+        async with (primary if use_primary() else replica)() as db:
+            yield db
+
+    return get_async_read_db
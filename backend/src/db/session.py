@@ -1,13 +1,110 @@
-from typing import Generator
+import os
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import Pool
 
-from src.config.env_config import DATABASE_URL
+from src.config.env_config import (
+    ASYNC_DATABASE_URL,
+    ASYNC_READ_DATABASE_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_STATEMENT_TIMEOUT_MS,
+    READ_DATABASE_URL,
+)
+from src.db.pool import (
+    TimedAsyncAdaptedQueuePool,
+    TimedAsyncAdaptedReadQueuePool,
+    TimedQueuePool,
+    TimedReadQueuePool,
+)
+from src.db.routing import async_read_session_dependency, read_session_dependency
+from src.db.slow_query import configure_slow_query_log
+from src.service.metrics import instrument_engine
 
-engine = create_engine(DATABASE_URL)
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+    "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+    # フェイルオーバーやアイドル切断で死んだ接続を取り出さない
+    "pool_pre_ping": True,
+}
+
+
+def _connect_args(driver: str) -> dict:
+    if not DB_STATEMENT_TIMEOUT_MS:
+        return {}
+    if driver == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+
+def _create_engine(url: str, poolclass: type[Pool]):
+    return create_engine(
+        url, poolclass=poolclass, connect_args=_connect_args("psycopg2"), **POOL_OPTIONS
+    )
+
+
+def _create_async_engine(url: str, poolclass: type[Pool]):
+    return create_async_engine(
+        url, poolclass=poolclass, connect_args=_connect_args("asyncpg"), **POOL_OPTIONS
+    )
+
+
+engine = _create_engine(DATABASE_URL, TimedQueuePool)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# 高頻度のI/Oをスレッドプールを使わずに処理するための非同期エンジン
+async_engine = _create_async_engine(ASYNC_DATABASE_URL, TimedAsyncAdaptedQueuePool)
+# コミット後の属性アクセスで暗黙のI/Oが発生しないよう expire_on_commit を無効にする
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# 読み取り専用の処理の接続先（レプリカ未設定ならプライマリと同じもの）
+if READ_DATABASE_URL:
+    read_engine = _create_engine(READ_DATABASE_URL, TimedReadQueuePool)
+    async_read_engine = _create_async_engine(
+        ASYNC_READ_DATABASE_URL, TimedAsyncAdaptedReadQueuePool
+    )
+    ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=async_read_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    read_engine, async_read_engine = engine, async_engine
+    ReadSessionLocal, AsyncReadSessionLocal = SessionLocal, AsyncSessionLocal
+
+ENGINES = {"sync": engine, "async": async_engine}
+if READ_DATABASE_URL:
+    ENGINES.update({"sync_read": read_engine, "async_read": async_read_engine})
+
+for name, db_engine in ENGINES.items():
+    instrument_engine(getattr(db_engine, "sync_engine", db_engine), name)
+configure_slow_query_log(ENGINES)
+
+
+def _reset_pools_in_child() -> None:
+    # 親プロセスの接続をフォーク先で使い回さない（閉じると親の接続も切れるため破棄のみ）
+    for db_engine in ENGINES.values():
+        getattr(db_engine, "sync_engine", db_engine).dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_pools_in_child)
+
+
+def pools() -> dict[str, Pool]:
+    return {
+        name: getattr(db_engine, "sync_engine", db_engine).pool
+        for name, db_engine in ENGINES.items()
+    }
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -15,3 +112,15 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# 書き込み直後のクライアントには ReadYourWritesMiddleware がプライマリを使わせる
+get_read_db = read_session_dependency(SessionLocal, ReadSessionLocal)
+get_async_read_db = async_read_session_dependency(
+    AsyncSessionLocal, AsyncReadSessionLocal
+)
@@ -0,0 +1,260 @@
+import asyncio
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import greenlet
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config.logging_config import get_logger
+from src.service.metrics import (
+    DB_SLOW_QUERIES,
+    current_route,
+    install_query_timer,
+    query_duration,
+)
+
+logger = get_logger(__name__)
+
+SRC_DIR = str(Path(__file__).resolve().parents[1])
+_DB_DIR = str(Path(__file__).resolve().parent)
+
+_WHITESPACE = re.compile(r"\s+")
+# IN 句のプレースホルダ数は件数で変わるため1つにまとめる
+_IN_LIST = re.compile(r"IN \((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,?)+\)")
+# 展開された IN 句のパラメータ名に付く連番（__[POSTCOMPILE_x] 展開後の _1, _2 ...）
+_NUMBERED_PARAM = re.compile(r"(:\w+?)_\d+\b")
+# EXPLAIN できる文（ANALYZE は付けないので実行はされない）
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+# 実行計画の取得に使う接続に付ける（EXPLAIN 自体を記録しないため）
+_EXPLAIN_OPTION = "slow_query_explain"
+
+MAX_PARAMETERS_LENGTH = 500
+MAX_EXPLAINED_SHAPES = 1000
+
+
+def normalize_statement(statement: str) -> str:
+    """パラメータの数や空白の違いを無視した「文の形」を返す"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _NUMBERED_PARAM.sub(r"\1", shape)
+
+
+def _src_call_site(frame) -> str | None:
+    # src/db（セッション・イベント処理）を除いた、最も内側の src のフレーム
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(SRC_DIR) and not filename.startswith(_DB_DIR):
+            path = Path(filename).relative_to(Path(SRC_DIR).parent)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def find_call_site() -> str | None:
+    """現在実行中のSQLを発行した src 内の関数（service 等）を返す"""
+    call_site = _src_call_site(sys._getframe(1))
+    if call_site is not None:
+        return call_site
+
+    # AsyncSession の文は子グリーンレットで実行されるため、親（コルーチン側）のスタックを見る
+    parent = greenlet.getcurrent().parent
+    if parent is not None and parent.gr_frame is not None:
+        return _src_call_site(parent.gr_frame)
+    return None
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"<executemany: {len(parameters)} rows>"
+    text = repr(parameters)
+    if len(text) > MAX_PARAMETERS_LENGTH:
+        return text[:MAX_PARAMETERS_LENGTH] + "..."
+    return text
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    engine: str
+    statement: str
+    parameters: object
+    duration: float
+    call_site: str | None
+    route: str | None
+
+    @property
+    def shape(self) -> str:
+        return normalize_statement(self.statement)
+
+
+class SlowQueryLog:
+    """閾値を超えたSQLをログに出し、実行計画を非同期に取得してログに出す
+
+    実行計画の取得はリクエストの処理を待たせないよう、同期エンジンは専用スレッド、
+    非同期エンジンはイベントループ上のタスクで行う。同じ形の文は
+    explain_interval 秒に1回だけ EXPLAIN する。
+    """
+
+    def __init__(
+        self,
+        engine: Engine | AsyncEngine,
+        name: str,
+        threshold_seconds: float,
+        explain: bool = True,
+        explain_interval: float = 300.0,
+    ) -> None:
+        self.engine = engine
+        self.sync_engine = (
+            engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        )
+        self.name = name
+        self.threshold_seconds = threshold_seconds
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self._explained_at: dict[str, float] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._installed = False
+
+    def install(self) -> "SlowQueryLog":
+        self._installed = True
+        # 開始時刻はメトリクスと共通のフックが実行コンテキストに記録する
+        install_query_timer(self.sync_engine)
+        event.listen(self.sync_engine, "after_cursor_execute", self._after_execute)
+        return self
+
+    def remove(self) -> None:
+        """イベントを解除し、実行中の EXPLAIN（同期エンジン分）の完了を待つ"""
+        if self._installed:
+            self._installed = False
+            event.remove(self.sync_engine, "after_cursor_execute", self._after_execute)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, many):
+        duration = query_duration(context)
+        if (
+            duration is None
+            or duration < self.threshold_seconds
+            or conn.get_execution_options().get(_EXPLAIN_OPTION)
+        ):
+            return
+
+        query = SlowQuery(
+            engine=self.name,
+            statement=statement,
+            parameters=parameters,
+            duration=duration,
+            call_site=find_call_site(),
+            route=current_route(),
+        )
+        DB_SLOW_QUERIES.inc(self.name)
+        logger.warning(
+            "Slow query",
+            engine=query.engine,
+            duration_ms=round(duration * 1000, 1),
+            statement=query.shape,
+            parameters=_format_parameters(parameters, many),
+            call_site=query.call_site,
+            route=query.route,
+        )
+        if self.explain and not many and self._should_explain(query.shape):
+            self._schedule_explain(query)
+
+    def _should_explain(self, shape: str) -> bool:
+        if not _EXPLAINABLE.match(shape):
+            return False
+        now = time.monotonic()
+        explained_at = self._explained_at.get(shape)
+        if explained_at is not None and now - explained_at < self.explain_interval:
+            return False
+        if len(self._explained_at) >= MAX_EXPLAINED_SHAPES:
+            self._explained_at.clear()
+        self._explained_at[shape] = now
+        return True
+
+    def _explain_sql(self, statement: str) -> str:
+        if self.sync_engine.dialect.name == "sqlite":
+            return f"EXPLAIN QUERY PLAN {statement}"
+        return f"EXPLAIN {statement}"
+
+    def _schedule_explain(self, query: SlowQuery) -> None:
+        if isinstance(self.engine, AsyncEngine):
+            # 非同期エンジンの文はイベントループ上（子グリーンレット内）で実行されている
+            task = asyncio.get_running_loop().create_task(self._explain_async(query))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="slow-query-explain"
+            )
+        self._executor.submit(self._explain_sync, query)
+
+    def _explain_sync(self, query: SlowQuery) -> None:
+        try:
+            with self.sync_engine.connect() as conn:
+                conn = conn.execution_options(**{_EXPLAIN_OPTION: True})
+                rows = conn.exec_driver_sql(
+                    self._explain_sql(query.statement), query.parameters
+                ).all()
+        except Exception as e:
+            self._log_explain_failure(query, e)
+            return
+        self._log_plan(query, rows)
+
+    async def _explain_async(self, query: SlowQuery) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(**{_EXPLAIN_OPTION: True})
+                result = await conn.exec_driver_sql(
+                    self._explain_sql(query.statement), query.parameters
+                )
+                rows = result.all()
+        except Exception as e:
+            self._log_explain_failure(query, e)
+            return
+        self._log_plan(query, rows)
+
+    def _log_plan(self, query: SlowQuery, rows) -> None:
+        # PostgreSQL は1列、SQLite の EXPLAIN QUERY PLAN は最後の列が内容
+        logger.warning(
+            "Slow query plan",
+            engine=query.engine,
+            statement=query.shape,
+            call_site=query.call_site,
+            route=query.route,
+            plan="\n".join(str(row[-1]) for row in rows),
+        )
+
+    def _log_explain_failure(self, query: SlowQuery, error: Exception) -> None:
+        logger.info(
+            "Slow query plan unavailable",
+            engine=query.engine,
+            statement=query.shape,
+            error=str(error),
+        )
+
+
+def configure_slow_query_log(engines: dict[str, Engine | AsyncEngine]) -> None:
+    """SLOW_QUERY_LOG=true のときだけ各エンジンにスロークエリログを登録する"""
+    if os.getenv("SLOW_QUERY_LOG", "false").lower() != "true":
+        return
+
+    options = {
+        "threshold_seconds": float(os.getenv("SLOW_QUERY_SECONDS", "0.2")),
+        "explain": os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true",
+        "explain_interval": float(
+            os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "300")
+        ),
+    }
+    for name, engine in engines.items():
+        SlowQueryLog(engine, name, **options).install()
@@ -1,6 +1,8 @@
 import enum
+import secrets
 import uuid
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy import Boolean, DateTime, ForeignKey, String, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -38,6 +40,10 @@ class User(Base):
     last_login_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # アクセストークンに埋め込むセキュリティスタンプ（更新すると既存トークンが無効になる）
+    security_stamp: Mapped[str | None] = mapped_column(
+        String(64), nullable=True, default=lambda: secrets.token_hex(16)
+    )
 
     answers: Mapped[list["Answer"]] = relationship(
         back_populates="user", cascade="all, delete-orphan"
@@ -141,6 +147,9 @@ class Answer(Base):
     user_id: Mapped[str] = mapped_column(ForeignKey("users.user_id"))
     question_id: Mapped[int] = mapped_column(ForeignKey("questions.question_id"))
     answer_text: Mapped[str]
+    like_count: Mapped[int] = mapped_column(
+        default=0, server_default="0", nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -148,6 +157,10 @@ class Answer(Base):
     user: Mapped["User"] = relationship(back_populates="answers")
     question: Mapped["Question"] = relationship(back_populates="answers")
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "question_id", name="uq_answer_user_question"),
+    )
+
 
 class Visit(Base):
     __tablename__ = "visits"
@@ -171,6 +184,11 @@ class Visit(Base):
         "User", foreign_keys=[visited_user_id], back_populates="visits_received"
     )
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # 動的に設定される属性（DBには保存されない）: 一覧で公開する訪問者情報
+        self.visitor_info: Any = None
+
 
 class ReportTypeEnum(enum.Enum):
     spam = "spam"
@@ -310,3 +328,14 @@ class AnswerLike(Base):
         UniqueConstraint("answer_id", "user_id", name="uq_answer_user_like"),
         {"comment": "QA回答のいいね機能"},
     )
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    token_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+
+    __table_args__ = ({"comment": "失効済みトークン（SHA-256ダイジェスト）"},)
@@ -0,0 +1,10 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, entity):
+    # ON CONFLICT は方言ごとの insert() でしか組み立てられないため、
+    # 接続先（本番: PostgreSQL / テスト: SQLite）に合わせて切り替える
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(entity)
+    return postgresql.insert(entity)
@@ -1,28 +1,42 @@
 import os
+from contextlib import asynccontextmanager
 
+import anyio.to_thread
 import sentry_sdk
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
 from starlette.middleware.sessions import SessionMiddleware
 
+from src.config.env_config import READ_DATABASE_URL, READ_REPLICA_PIN_SECONDS
 from src.config.limiter import limiter
 from src.config.logging_config import configure_logging, get_logger
+from src.config.workers import ensure_worker_safety
+from src.db import routing
 from src.middleware.csrf import CSRFMiddleware
 from src.middleware.logging import LoggingMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.profiler import ProfilerMiddleware
+from src.middleware.read_your_writes import ReadYourWritesMiddleware
+from src.middleware.scoped import ScopedMiddleware
+from src.middleware.server_timing import ServerTimingMiddleware
 from src.router import auth
 from src.router.block_router import block_router
 from src.router.by_username_router import by_username_router
+from src.router.memory_router import memory_router
 from src.router.message_router import message_router
+from src.router.metrics_router import metrics_router
 from src.router.notification_router import notification_router
 from src.router.profile_router import profile_router
 from src.router.qna_router import answers_router, qna_router, questions_router
+from src.router.timed_route import TimedRoute
 from src.router.user_router import user_router
 from src.router.visit_router import visit_router
+from src.service import server_timing
+from src.service.loop_monitor import LoopMonitor
+from src.service.rate_limiter import get_remote_address
+from src.service.twitter_client import TwitterClient
 
 configure_logging()
 logger = get_logger(__name__)
@@ -43,7 +57,49 @@ else:
     logger.warning("Sentry DSN not provided, error monitoring disabled")
 
 
+OAUTH_SESSION_PATH_PREFIXES = ("/auth/login/", "/auth/callback/")
+
+# 同期ハンドラ・依存関係を実行するスレッドプールの上限（DB接続プールの上限と揃える）
+THREADPOOL_MAX_WORKERS = int(os.getenv("THREADPOOL_MAX_WORKERS", "40"))
+
+# 処理時間の内訳を Server-Timing ヘッダーで返す（内部の情報を含むため既定では無効）
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# X-Profile ヘッダー（値は PROFILER_TOKEN）か無作為抽出でリクエストをプロファイルする
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN")
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+
+# イベントループの遅延・スレッドプールの待ち時間の監視
+LOOP_MONITOR = os.getenv("LOOP_MONITOR", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn --workers で起動された場合も、共有できない状態を持つ設定なら起動しない
+    ensure_worker_safety()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        THREADPOOL_MAX_WORKERS
+    )
+    # Twitter API への接続をリクエスト間で使い回す
+    app.state.twitter_client = TwitterClient()
+    loop_monitor = None
+    if LOOP_MONITOR:
+        loop_monitor = LoopMonitor(
+            interval=float(os.getenv("LOOP_MONITOR_INTERVAL_SECONDS", "0.1")),
+            lag_threshold=float(os.getenv("LOOP_LAG_THRESHOLD_SECONDS", "0.5")),
+            probe_interval=float(os.getenv("THREADPOOL_PROBE_INTERVAL_SECONDS", "1")),
+        )
+        await loop_monitor.start()
+    try:
+        yield
+    finally:
+        if loop_monitor is not None:
+            await loop_monitor.stop()
+        await app.state.twitter_client.aclose()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="hitoQ API",
     description="Q&A-based profile viewer API with messaging functionality",
     version="0.1.0",
@@ -68,9 +124,7 @@ app = FastAPI(
         "url": "https://www.apache.org/licenses/LICENSE-2.0.html",
     },
 )
-
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.router.route_class = TimedRoute
 
 frontend_urls = os.getenv("FRONTEND_URLS", "http://localhost:5173").split(",")
 origins = [url.strip() for url in frontend_urls]
@@ -92,12 +146,35 @@ app.add_middleware(
     allow_headers=[header.strip() for header in allow_headers],
     expose_headers=["X-CSRFToken"],
 )
-app.add_middleware(SessionMiddleware, secret_key=os.getenv("SESSION_SECRET_KEY"))
+# セッションは OAuth の state / code_verifier の受け渡しにしか使わないため、
+# そのルート以外ではCookieの署名・検証を行わない
+app.add_middleware(
+    ScopedMiddleware,
+    path_prefixes=OAUTH_SESSION_PATH_PREFIXES,
+    middleware=SessionMiddleware,
+    secret_key=os.getenv("SESSION_SECRET_KEY"),
+)
 
 if os.getenv("ENVIRONMENT") != "test":
     app.add_middleware(CSRFMiddleware)
 
+if READ_DATABASE_URL:
+    routing.track_writes()
+    app.add_middleware(ReadYourWritesMiddleware, pin_seconds=READ_REPLICA_PIN_SECONDS)
 app.add_middleware(LoggingMiddleware)
+if SERVER_TIMING:
+    server_timing.instrument_orm()
+    app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+if PROFILER_TOKEN or PROFILER_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilerMiddleware,
+        output_dir=os.getenv("PROFILER_OUTPUT_DIR", "profiles"),
+        token=PROFILER_TOKEN,
+        sample_rate=PROFILER_SAMPLE_RATE,
+        mode=os.getenv("PROFILER_MODE", "sampling"),
+        sample_interval=float(os.getenv("PROFILER_SAMPLE_INTERVAL_MS", "1")) / 1000,
+    )
 
 app.include_router(user_router, tags=["Users"])
 app.include_router(by_username_router, tags=["By Username User Resources"])
@@ -110,6 +187,8 @@ app.include_router(answers_router, tags=["Answers"])
 app.include_router(visit_router, tags=["Visits"])
 app.include_router(block_router, tags=["Blocks"])
 app.include_router(auth.auth_router, prefix="/auth", tags=["Authentication"])
+app.include_router(metrics_router)
+app.include_router(memory_router)
 
 
 @app.get(
@@ -117,8 +196,8 @@ app.include_router(auth.auth_router, prefix="/auth", tags=["Authentication"])
     summary="Root endpoint",
     description="Returns welcome message for the hitoQ API",
     response_description="Welcome message",
+    dependencies=[Depends(limiter.limit("30/minute"))],
 )
-@limiter.limit("30/minute")
 def root(request: Request):
     logger.info("Root endpoint accessed", client_ip=get_remote_address(request))
     return {"message": "Welcome to hitoQ API!"}
@@ -1,52 +1,80 @@
 import time
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from src.config.logging_config import get_logger
+from src.config.logging_config import get_logger, get_request_log_sampler
+from src.service import server_timing
 
 logger = get_logger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+class LoggingMiddleware:
+    """リクエストの開始・完了をログに出し、X-Process-Time ヘッダーを付与する
 
-        logger.info(
-            "Request started",
-            method=request.method,
-            url=str(request.url),
-            client_ip=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent"),
-        )
+    BaseHTTPMiddleware と違いレスポンスをラップしないため、
+    ストリーミングレスポンスもそのまま流れる。
+    開始・完了ログは configure_logging で設定したルートごとの割合で間引く。
+    """
 
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        start_time = time.perf_counter()
+        sampler = get_request_log_sampler()
+        sampled = sampler.should_sample(scope["path"])
+        method = scope["method"]
+        client = scope.get("client")
+        client_ip = client[0] if client else None
+        status_code = None
+
+        if sampled:
             logger.info(
-                "Request completed",
-                method=request.method,
-                url=str(request.url),
-                status_code=response.status_code,
-                process_time=round(process_time, 4),
-                client_ip=request.client.host if request.client else None,
+                "Request started",
+                method=method,
+                url=str(URL(scope=scope)),
+                client_ip=client_ip,
+                user_agent=Headers(scope=scope).get("user-agent"),
             )
 
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(time.perf_counter() - start_time)
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            process_time = time.time() - start_time
-
             logger.error(
                 "Request failed",
-                method=request.method,
-                url=str(request.url),
+                method=method,
+                url=str(URL(scope=scope)),
                 error=str(e),
-                process_time=round(process_time, 4),
-                client_ip=request.client.host if request.client else None,
+                process_time=round(time.perf_counter() - start_time, 4),
+                client_ip=client_ip,
                 exc_info=True,
             )
             raise
+
+        process_time = time.perf_counter() - start_time
+        if sampler.should_keep(sampled, status_code, process_time):
+            # Server-Timing が有効な場合は処理時間の内訳（ミリ秒）も出す
+            timings = server_timing.request_timings.get()
+            logger.info(
+                "Request completed",
+                method=method,
+                url=str(URL(scope=scope)),
+                status_code=status_code,
+                process_time=round(process_time, 4),
+                client_ip=client_ip,
+                sampled=sampled,
+                **({"server_timing": timings.as_dict()} if timings else {}),
+            )
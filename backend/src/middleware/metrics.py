@@ -0,0 +1,42 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.service import metrics
+
+
+class MetricsMiddleware:
+    """ルートごとのレイテンシ・ステータス・DBクエリ数を記録する"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        db_stats = metrics.RequestDBStats()
+        token = metrics.request_db_stats.set(db_stats)
+        scope_token = metrics.request_scope.set(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.request_db_stats.reset(token)
+            metrics.request_scope.reset(scope_token)
+            metrics.observe_request(
+                scope["method"],
+                metrics.route_template(scope),
+                status_code,
+                time.perf_counter() - start_time,
+                db_stats,
+            )
@@ -0,0 +1,111 @@
+import hmac
+import random
+import time
+from pathlib import Path
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.logging_config import get_logger
+from src.service import profiler
+from src.service.metrics import route_template
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_MODE_HEADER = "x-profile-mode"
+
+
+class ProfilerMiddleware:
+    """指定されたリクエストだけをプロファイラの下で実行し、結果をファイルに保存する
+
+    - X-Profile ヘッダーに token と同じ値が付いたリクエスト（X-Profile-Mode で方式を選べる）
+    - sample_rate の割合で無作為に選んだリクエスト
+    保存先は output_dir/<時刻>_<メソッド>_<ルート>.speedscope.json（cprofile の場合は .prof）。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        output_dir: str = "profiles",
+        token: str | None = None,
+        sample_rate: float = 0.0,
+        mode: str = "sampling",
+        sample_interval: float = 0.001,
+    ) -> None:
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.token = token
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.sample_interval = sample_interval
+
+    def _requested_mode(self, scope: Scope) -> str | None:
+        if self.token:
+            headers = Headers(scope=scope)
+            value = headers.get(PROFILE_HEADER)
+            if value is not None and hmac.compare_digest(value, self.token):
+                mode = headers.get(PROFILE_MODE_HEADER, self.mode)
+                return mode if mode in ("sampling", "cprofile") else self.mode
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = self._requested_mode(scope)
+        if mode is None or not profiler.try_acquire():
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self._profile(scope, receive, send, mode)
+        finally:
+            profiler.release()
+
+    async def _profile(
+        self, scope: Scope, receive: Receive, send: Send, mode: str
+    ) -> None:
+        request_profiler = profiler.create_profiler(mode, self.sample_interval)
+        filename = None
+
+        def _filename() -> str:
+            # ルートはルーティング後にしか分からないため、レスポンス開始時に決める
+            return profiler.profile_filename(
+                scope["method"], route_template(scope), request_profiler.extension
+            )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal filename
+            if message["type"] == "http.response.start":
+                filename = _filename()
+                MutableHeaders(scope=message)["X-Profile-Id"] = filename
+            await send(message)
+
+        token = profiler.active_profiler.set(request_profiler)
+        started = time.perf_counter()
+        request_profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_profiler.stop()
+            profiler.active_profiler.reset(token)
+            path = self.output_dir / (filename or _filename())
+            await anyio.to_thread.run_sync(
+                self._save, request_profiler, path, f"{scope['method']} {scope['path']}"
+            )
+            logger.info(
+                "Request profiled",
+                mode=mode,
+                path=str(path),
+                route=route_template(scope),
+                duration=round(time.perf_counter() - started, 4),
+            )
+
+    def _save(self, request_profiler, path: Path, name: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        request_profiler.save(path, name)
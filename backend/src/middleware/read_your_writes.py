@@ -0,0 +1,61 @@
+import os
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db import routing
+
+
+def _pin_cookie(max_age: int) -> str:
+    # 属性は認証クッキーと揃える（フロントエンドは別オリジンのため SameSite=None）
+    cookie = SimpleCookie()
+    cookie[routing.PIN_COOKIE] = "1"
+    morsel = cookie[routing.PIN_COOKIE]
+    morsel["max-age"] = max_age
+    morsel["path"] = "/"
+    morsel["httponly"] = True
+    morsel["samesite"] = "none"
+    if os.getenv("ENVIRONMENT") == "production":
+        morsel["domain"] = ".hitoq.net"
+        morsel["secure"] = os.getenv("COOKIE_SECURE", "false").lower() == "true"
+    else:
+        morsel["secure"] = True
+    return morsel.OutputString()
+
+
+class ReadYourWritesMiddleware:
+    """書き込んだクライアントの読み取りを、しばらくの間プライマリに固定する
+
+    リクエスト中に書き込みがあればクッキーを付け、クッキーがある間は
+    get_read_db / get_async_read_db もプライマリの Session を返す。
+    クッキーで持つため、どのワーカー・ホストが受けても同じように振り分けられる。
+    """
+
+    def __init__(self, app: ASGIApp, pin_seconds: int = 5) -> None:
+        self.app = app
+        self.pin_seconds = pin_seconds
+        self._cookie = _pin_cookie(pin_seconds)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = routing.RequestRouting()
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                state.pinned = routing.PIN_COOKIE in cookie_parser(value.decode())
+                break
+        token = routing.request_routing.set(state)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.wrote:
+                MutableHeaders(scope=message).append("set-cookie", self._cookie)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            routing.request_routing.reset(token)
@@ -0,0 +1,33 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class ScopedMiddleware:
+    """指定したパス配下のリクエストにだけ別のミドルウェアを適用する
+
+    例: セッションCookieの署名・検証を OAuth フローのルートだけで行う
+        app.add_middleware(
+            ScopedMiddleware,
+            path_prefixes=("/auth/login/", "/auth/callback/"),
+            middleware=SessionMiddleware,
+            secret_key=...,
+        )
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: tuple[str, ...],
+        middleware: type,
+        **options,
+    ) -> None:
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.scoped_app = middleware(app, **options)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and scope["path"].startswith(
+            self.path_prefixes
+        ):
+            await self.scoped_app(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,48 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.service import metrics, server_timing
+
+
+class ServerTimingMiddleware:
+    """処理時間の内訳を Server-Timing ヘッダーで返す
+
+    auth / db / orm / serialize / app は各所のタイマーで積算し、
+    middleware はミドルウェアとルーティングにかかった残りの時間とする。
+    DB の集計は MetricsMiddleware のものを使うため、その内側に置く。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        db_stats = metrics.request_db_stats.get()
+        db_stats_token = None
+        if db_stats is None:
+            db_stats = metrics.RequestDBStats()
+            db_stats_token = metrics.request_db_stats.set(db_stats)
+        timings = server_timing.RequestTimings(db_stats)
+        token = server_timing.request_timings.set(timings)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - start_time
+                timings.add("total", total)
+                timings.add("middleware", total - timings.durations.get("app", 0.0))
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header_value())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            server_timing.request_timings.reset(token)
+            if db_stats_token is not None:
+                metrics.request_db_stats.reset(db_stats_token)
@@ -4,32 +4,36 @@ import os
 import secrets
 
 import httpx
-import jwt
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, RedirectResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.orm import Session
 
-from src.config.env_config import SECRET_KEY, TWITTER_CLIENT_ID, TWITTER_CLIENT_SECRET
+from src.config.env_config import TWITTER_CLIENT_ID
+from src.config.limiter import limiter
 from src.config.logging_config import get_logger
 from src.db.session import get_db
+from src.router.timed_route import TimedRoute
 from src.schema.user import UserCreate, UserRead
-from src.service import user_service
-from src.service.token_service import TokenService
+from src.service import server_timing, user_service
+from src.service.rate_limiter import get_remote_address
+from src.service.token_service import AUTH_CLAIMS_MODE, TokenService
+from src.service.twitter_client import (
+    TwitterAPIError,
+    TwitterClient,
+    get_twitter_client,
+)
+from src.service.user_cache import UserSnapshot
 
 logger = get_logger(__name__)
-limiter = Limiter(key_func=get_remote_address)
 
-auth_router = APIRouter()
+auth_router = APIRouter(route_class=TimedRoute)
 
 # Environment-based configuration
 REDIRECT_URI = os.getenv(
     "TWITTER_REDIRECT_URI", "http://localhost:8000/auth/callback/twitter"
 )
 TWITTER_AUTH_URL = "https://twitter.com/i/oauth2/authorize"
-TWITTER_TOKEN_URL = "https://api.twitter.com/2/oauth2/token"
-TWITTER_USER_ME_URL = "https://api.twitter.com/2/users/me"  # https://docs.x.com/x-api/users/user-lookup-me
 # Use first URL from FRONTEND_URLS as primary frontend URL
 FRONTEND_URL = os.getenv("FRONTEND_URLS", "http://localhost:5173").split(",")[0].strip()
 
@@ -67,46 +71,58 @@ def _set_csrf_cookie(response, csrf_token: str) -> None:
     )
 
 
-def _get_current_user(request: Request, db: Session = Depends(get_db)):
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    payload = TokenService.verify_token(token, "access")
+def _resolve_user(payload: dict, db: Session):
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = user_service.get_user(db, user_id=user_id)
+    claims_user = TokenService.get_claims_user(payload)
+    if (
+        AUTH_CLAIMS_MODE
+        and claims_user
+        and not TokenService.is_security_stamp_revoked(claims_user.security_stamp)
+    ):
+        return claims_user
+
+    user = user_service.get_user_snapshot(db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    if claims_user and claims_user.security_stamp != user.security_stamp:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
     return user
 
 
-def get_current_user_optional(request: Request, db: Session = Depends(get_db)):
-    try:
-        token = request.cookies.get("access_token")
-        if not token:
-            return None
+def _get_current_user(request: Request, db: Session = Depends(get_db)):
+    token = request.cookies.get("access_token")
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
 
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        if payload.get("type") != "access":
-            return None
+    with server_timing.timer("auth"):
+        payload = TokenService.verify_token(token, "access")
+        return _resolve_user(payload, db)
 
-        user_id = payload.get("sub")
-        if not user_id:
-            return None
 
-        user = user_service.get_user(db, user_id=user_id)
-        return user
-    except Exception:
+def get_current_user_optional(request: Request, db: Session = Depends(get_db)):
+    token = request.cookies.get("access_token")
+    if not token:
         return None
 
+    # 検証キャッシュを共有するため、必須認証と同じ TokenService.verify_token を通す
+    with server_timing.timer("auth"):
+        try:
+            payload = TokenService.verify_token(token, "access")
+            return _resolve_user(payload, db)
+        except HTTPException:
+            return None
+
 
 # https://docs.x.com/resources/fundamentals/authentication/oauth-2-0/user-access-token
-@auth_router.get("/login/twitter")
-@limiter.limit("10/minute")  # Prevent auth spam
+@auth_router.get(
+    "/login/twitter",
+    dependencies=[Depends(limiter.limit("10/minute"))],  # Prevent auth spam
+)
 async def login_twitter(request: Request):
     state = secrets.token_urlsafe(16)
     code_verifier = secrets.token_urlsafe(32)
@@ -133,14 +149,25 @@ async def login_twitter(request: Request):
     return RedirectResponse(url=str(auth_url))
 
 
+def _upsert_user_snapshot(db: Session, user_in: UserCreate) -> UserSnapshot:
+    user_service.upsert_user(db, user_in=user_in)
+    # upsert_user がキャッシュに入れたスナップショットを使い、コミット後の再読み込みを避ける
+    return user_service.get_user_snapshot(db, user_in.user_id)
+
+
 # This func requests an access token from Twitter's API using code passed from Twitter and redirects to the frontend
-@auth_router.get("/callback/twitter")
-@limiter.limit("20/minute")  # Higher limit for callback (legitimate flow)
+@auth_router.get(
+    "/callback/twitter",
+    dependencies=[
+        Depends(limiter.limit("20/minute"))
+    ],  # Higher limit for callback (legitimate flow)
+)
 async def auth_twitter_callback(
     request: Request,
     code: str | None = None,
     state: str | None = None,
     db: Session = Depends(get_db),
+    twitter_client: TwitterClient = Depends(get_twitter_client),
 ):
     if code is None:
         raise HTTPException(status_code=400, detail="Missing code parameter")
@@ -157,104 +184,89 @@ async def auth_twitter_callback(
             status_code=400, detail="Code verifier not found in session"
         )
 
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-    }
-    data = {
-        "code": code,
-        "grant_type": "authorization_code",
-        "client_id": TWITTER_CLIENT_ID,
-        "redirect_uri": REDIRECT_URI,
-        "code_verifier": code_verifier,
-    }
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            TWITTER_TOKEN_URL,
-            data=data,
-            auth=(TWITTER_CLIENT_ID, TWITTER_CLIENT_SECRET),
-            headers=headers,
-        )
-        if token_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid token response")
-
-        token_data = token_response.json()
-        access_token = token_data["access_token"]
-
-        user_response = await client.get(
-            TWITTER_USER_ME_URL,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-            },
-            params={"user.fields": "profile_image_url,description"},
+    try:
+        token_data = await twitter_client.exchange_code(
+            code, code_verifier, REDIRECT_URI
         )
+    except TwitterAPIError as e:
+        raise HTTPException(status_code=400, detail="Invalid token response") from e
+    except httpx.HTTPError as e:
+        logger.error("Twitter API token request failed", error=str(e))
+        raise HTTPException(status_code=503, detail="Twitter API unavailable") from e
 
-        if user_response.status_code != 200:
-            logger.error(
-                f"Twitter API user request failed. Status: {user_response.status_code}, "
-                f"Response: {user_response.text}"
-            )
-            if user_response.status_code == 429:
-                raise HTTPException(
-                    status_code=429,
-                    detail="Twitter API rate limit exceeded. Please try again later.",
-                )
-            else:
-                raise HTTPException(status_code=400, detail="Invalid user data")
-
-        user_response_json = user_response.json()
-        logger.info(f"Twitter API response: {user_response_json}")
-
-        if "data" not in user_response_json:
-            logger.error(
-                f"Missing 'data' field in Twitter response: {user_response_json}"
-            )
-            raise HTTPException(status_code=400, detail="Invalid user data structure")
-
-        user_data = user_response_json["data"]
-        profile_image_url = user_data.get("profile_image_url")
-
-        # By removing `_normal`, we got the original size URL
-        high_res_url = (
-            profile_image_url.replace("_normal", "") if profile_image_url else None
+    try:
+        user_response_json = await twitter_client.get_me(token_data["access_token"])
+    except TwitterAPIError as e:
+        logger.error(
+            f"Twitter API user request failed. Status: {e.status_code}, "
+            f"Response: {e.detail}"
         )
+        if e.status_code == 429:
+            raise HTTPException(
+                status_code=429,
+                detail="Twitter API rate limit exceeded. Please try again later.",
+            ) from e
+        raise HTTPException(status_code=400, detail="Invalid user data") from e
+    except httpx.HTTPError as e:
+        logger.error("Twitter API user request failed", error=str(e))
+        raise HTTPException(status_code=503, detail="Twitter API unavailable") from e
+
+    logger.info(f"Twitter API response: {user_response_json}")
+
+    if "data" not in user_response_json:
+        logger.error(f"Missing 'data' field in Twitter response: {user_response_json}")
+        raise HTTPException(status_code=400, detail="Invalid user data structure")
+
+    user_data = user_response_json["data"]
+    profile_image_url = user_data.get("profile_image_url")
+
+    # By removing `_normal`, we got the original size URL
+    high_res_url = (
+        profile_image_url.replace("_normal", "") if profile_image_url else None
+    )
 
-        user_in = UserCreate(
-            user_id=user_data["id"],
-            user_name=user_data["username"],
-            display_name=user_data["name"],
-            bio=user_data.get("description"),
-            icon_url=high_res_url,
-        )
-        user = user_service.upsert_user(db, user_in=user_in)
+    user_in = UserCreate(
+        user_id=user_data["id"],
+        user_name=user_data["username"],
+        display_name=user_data["name"],
+        bio=user_data.get("description"),
+        icon_url=high_res_url,
+    )
+    # 同期セッションでのDB操作はイベントループを塞がないようスレッドプールで行う
+    user = await run_in_threadpool(_upsert_user_snapshot, db, user_in)
 
-        logger.info(
-            "User authenticated successfully",
-            user_id=user.user_id,
-            username=user.user_name,
-            client_ip=get_remote_address(request),
-        )
+    logger.info(
+        "User authenticated successfully",
+        user_id=user.user_id,
+        username=user.user_name,
+        client_ip=get_remote_address(request),
+    )
 
-        access_token = TokenService.create_access_token(user.user_id)
-        refresh_token = TokenService.create_refresh_token(user.user_id)
+    access_token = TokenService.create_access_token(user.user_id, user)
+    refresh_token = TokenService.create_refresh_token(user.user_id)
 
-        response = RedirectResponse(url=f"{FRONTEND_URL}/{user.user_name}")
+    response = RedirectResponse(url=f"{FRONTEND_URL}/{user.user_name}")
 
-        _set_auth_cookie(
-            response, "access_token", access_token, ACCESS_TOKEN_EXPIRE_MINUTES * 60
-        )
-        _set_auth_cookie(
-            response,
-            "refresh_token",
-            refresh_token,
-            REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
-        )
+    _set_auth_cookie(
+        response, "access_token", access_token, ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+    _set_auth_cookie(
+        response,
+        "refresh_token",
+        refresh_token,
+        REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+    )
 
-        return response
+    return response
 
 
-@auth_router.post("/refresh-token")
-@limiter.limit("100/hour")  # Allow frequent refresh but prevent abuse
-async def refresh_token(request: Request, db: Session = Depends(get_db)):
+@auth_router.post(
+    "/refresh-token",
+    dependencies=[
+        Depends(limiter.limit("100/hour"))
+    ],  # Allow frequent refresh but prevent abuse
+)
+def refresh_token(request: Request, db: Session = Depends(get_db)):
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Refresh token not found")
@@ -264,11 +276,11 @@ async def refresh_token(request: Request, db: Session = Depends(get_db)):
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    user = user_service.get_user(db, user_id=user_id)
+    user = user_service.get_user_snapshot(db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    new_access_token = TokenService.create_access_token(user.user_id)
+    new_access_token = TokenService.create_access_token(user.user_id, user)
 
     response = JSONResponse(content={"message": "Token refreshed successfully"})
     _set_auth_cookie(
@@ -279,13 +291,23 @@ async def refresh_token(request: Request, db: Session = Depends(get_db)):
 
 
 @auth_router.get("/me", response_model=UserRead)
-async def get_current_user_info(current_user=Depends(_get_current_user)):
-    return current_user
+def get_current_user_info(
+    current_user=Depends(_get_current_user), db: Session = Depends(get_db)
+):
+    # クレームには表示用の項目が含まれないため、プロフィール全体を読み込む
+    user = user_service.get_user_snapshot(db, user_id=current_user.user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
 
 
-@auth_router.get("/csrf-token")
-@limiter.limit("50/minute")  # Allow frequent CSRF token requests
-async def get_csrf_token(request: Request):
+@auth_router.get(
+    "/csrf-token",
+    dependencies=[
+        Depends(limiter.limit("50/minute"))
+    ],  # Allow frequent CSRF token requests
+)
+async def get_csrf_token():
     csrf_token = TokenService.create_csrf_token()
 
     response = JSONResponse(content={"csrf_token": csrf_token})
@@ -294,9 +316,11 @@ async def get_csrf_token(request: Request):
     return response
 
 
-@auth_router.post("/logout")
-@limiter.limit("30/minute")  # Reasonable limit for logout
-async def logout(request: Request):
+@auth_router.post(
+    "/logout",
+    dependencies=[Depends(limiter.limit("30/minute"))],  # Reasonable limit for logout
+)
+def logout(request: Request):
     refresh_token = request.cookies.get("refresh_token")
 
     if refresh_token:
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from src.config.limiter import limiter
 from src.db.session import get_db
 from src.router.auth import _get_current_user
+from src.router.timed_route import TimedRoute
 from src.schema.block import (
     BlockCreate,
     BlockRead,
@@ -12,13 +13,15 @@ from src.schema.block import (
 )
 from src.service import block_service
 
-block_router = APIRouter()
+block_router = APIRouter(route_class=TimedRoute)
 
 
-@block_router.post("/block", response_model=BlockRead)
-@limiter.limit("10/minute")
-async def create_block(
-    request: Request,
+@block_router.post(
+    "/block",
+    response_model=BlockRead,
+    dependencies=[Depends(limiter.limit("10/minute", per="user"))],
+)
+def create_block(
     block_in: BlockCreate,
     current_user=Depends(_get_current_user),
     db: Session = Depends(get_db),
@@ -32,10 +35,12 @@ async def create_block(
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
-@block_router.delete("/block/{blocked_user_id}", status_code=status.HTTP_204_NO_CONTENT)
-@limiter.limit("10/minute")
-async def remove_block(
-    request: Request,
+@block_router.delete(
+    "/block/{blocked_user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limiter.limit("10/minute", per="user"))],
+)
+def remove_block(
     blocked_user_id: str,
     current_user=Depends(_get_current_user),
     db: Session = Depends(get_db),
@@ -45,10 +50,12 @@ async def remove_block(
         raise HTTPException(status_code=404, detail="Block not found")
 
 
-@block_router.post("/report", response_model=ReportRead)
-@limiter.limit("5/minute")
-async def create_report(
-    request: Request,
+@block_router.post(
+    "/report",
+    response_model=ReportRead,
+    dependencies=[Depends(limiter.limit("5/minute", per="user"))],
+)
+def create_report(
     report_in: ReportCreate,
     current_user=Depends(_get_current_user),
     db: Session = Depends(get_db),
@@ -63,7 +70,7 @@ async def create_report(
 
 
 @block_router.get("/is-blocked/{user_id}")
-async def check_is_blocked(
+def check_is_blocked(
     user_id: str,
     current_user=Depends(_get_current_user),
     db: Session = Depends(get_db),
@@ -1,79 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.db.session import get_db
-from src.schema.composite_schema import CategoryInfoRead
+from src.db.session import (
+    get_async_db,
+    get_async_read_db,
+    get_db,
+    get_read_db,
+)
+from src.db.tables import User
+from src.router.auth import get_current_user_optional
+from src.router.timed_route import TimedRoute
+from src.schema.composite_schema import CategoryInfoRead, UserPageData
 from src.schema.message import MessageRead
 from src.schema.profile_item import ProfileItemRead
+from src.schema.serialization import ORJSONResponse, dump_rows, orm_list_response
 from src.schema.user import Username, UserRead
 from src.service import message_service, qna_service, user_service
+from src.service.aio import message_service as aio_message_service
+from src.service.aio import user_service as aio_user_service
 from src.service.categories import get_all_categories
 
 by_username_router = APIRouter(
     prefix="/by-username",
     tags=["By Username User Resources"],
+    route_class=TimedRoute,
 )
 
 
+PageSection = Literal["profile_items", "qna", "messages"]
+
+
+def _get_categories_read() -> dict[str, CategoryInfoRead]:
+    # CategoryInfoをCategoryInfoReadスキーマに変換
+    return {
+        cat.id: CategoryInfoRead(id=cat.id, label=cat.name, description=cat.description)
+        for cat in get_all_categories()
+    }
+
+
 @by_username_router.get("/{user_name}", response_model=UserRead)
-def read_user_by_username(user_name: Username, db: Session = Depends(get_db)):
-    user = user_service.get_user_by_username(db, user_name=user_name)
+async def read_user_by_username(
+    user_name: Username, db: AsyncSession = Depends(get_async_read_db)
+):
+    user = await aio_user_service.get_user_snapshot_by_username(db, user_name=user_name)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @by_username_router.get("/{user_name}/messages", response_model=list[MessageRead])
-def read_messages_by_username(
+async def read_messages_by_username(
     user_name: Username,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = user_service.get_user_by_username(db, user_name=user_name)
+    user = await aio_user_service.get_user_snapshot_by_username(db, user_name=user_name)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    messages = message_service.get_messages_for_user(db, user.user_id)
-    return messages
+    messages = await aio_message_service.get_messages_for_user(db, user.user_id)
+    return orm_list_response(MessageRead, messages)
 
 
 @by_username_router.get("/{user_name}/qna")
 def read_qna_by_username(
     user_name: Username,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    current_user: User | None = Depends(get_current_user_optional),
 ):
-    user = user_service.get_user_by_username(db, user_name=user_name)
+    user = user_service.get_user_snapshot_by_username(db, user_name=user_name)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user_answer_groups = qna_service.get_user_qna(db, user.user_id)
-
-    # CategoryInfoをCategoryInfoReadスキーマに変換
-    category_list = get_all_categories()
-    categories = {}
-    for cat in category_list:
-        categories[cat.id] = CategoryInfoRead(
-            id=cat.id, label=cat.name, description=cat.description
-        )
+    # 閲覧者のいいね状態も同梱し、回答ごとの追加リクエストを不要にする
+    user_answer_groups = qna_service.get_user_qna(
+        db,
+        user.user_id,
+        viewer_user_id=current_user.user_id if current_user else None,
+    )
 
     return {
         "userAnswerGroups": user_answer_groups,
-        "categories": categories,
+        "categories": _get_categories_read(),
     }
 
 
 @by_username_router.get(
     "/{user_name}/profile-items", response_model=list[ProfileItemRead]
 )
-def read_profile_items_by_username(
+async def read_profile_items_by_username(
     user_name: Username,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    user = user_service.get_user_by_username(db, user_name=user_name)
+    user = await aio_user_service.get_user_snapshot_by_username(db, user_name=user_name)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user_with_items = user_service.get_user_with_profile_items(db, user.user_id)
-    if not user_with_items:
+    return await aio_user_service.get_profile_items(db, user.user_id)
+
+
+@by_username_router.get("/{user_name}/page", response_model=UserPageData)
+def read_page_by_username(
+    user_name: Username,
+    sections: list[PageSection] = Query(
+        ["profile_items", "qna", "messages"], description="Sections to include"
+    ),
+    db: Session = Depends(get_read_db),
+    primary_db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional),
+):
+    # ユーザー解決は1回だけ行い、各セクションを同じセッションでまとめて読み込む
+    user = user_service.get_user_snapshot_by_username(db, user_name=user_name)
+    if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return user_with_items.profile_items
+    page = UserPageData(profile=UserRead.model_validate(user))
+
+    if "profile_items" in sections:
+        page.profile_items = [
+            ProfileItemRead.model_validate(item)
+            for item in user_service.get_profile_items(db, user.user_id)
+        ]
+
+    if "qna" in sections:
+        page.user_answer_groups = qna_service.get_user_qna(
+            db,
+            user.user_id,
+            viewer_user_id=current_user.user_id if current_user else None,
+        )
+        page.categories = _get_categories_read()
+
+    content = page.model_dump(mode="json", by_alias=True)
+    if "messages" in sections:
+        # 受信一覧は /messages と同じくプライマリから読み、同じ高速パスでシリアライズする
+        messages = message_service.get_messages_for_user(primary_db, user.user_id)
+        content["messages"] = dump_rows(MessageRead, messages)
+
+    return ORJSONResponse(content)
@@ -0,0 +1,100 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from src.router.timed_route import TimedRoute
+from src.schema.memory import OrmInstanceCount, SnapshotDiff, SnapshotRead
+from src.service import memory_service
+
+# 未設定のときはエンドポイント自体を無効にする（Authorization: Bearer <ADMIN_TOKEN>）
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
+MEMORY_SNAPSHOT_LIMIT = int(os.getenv("MEMORY_SNAPSHOT_LIMIT", "5"))
+
+
+def _require_admin(request: Request) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+memory_router = APIRouter(
+    prefix="/debug/memory",
+    dependencies=[Depends(_require_admin)],
+    include_in_schema=False,
+    route_class=TimedRoute,
+)
+
+
+def _snapshot_read(stored, group_by: str, limit: int) -> SnapshotRead:
+    return SnapshotRead(
+        snapshot_id=stored.snapshot_id,
+        taken_at=stored.taken_at,
+        memory=memory_service.process_memory(),
+        top=memory_service.top_allocations(stored.snapshot, group_by, limit),
+    )
+
+
+def _get_snapshot(snapshot_id: int):
+    stored = memory_service.get_snapshot(snapshot_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return stored
+
+
+# スナップショットの取得・比較は重いため、同期関数としてスレッドプールで実行する
+@memory_router.post("/snapshots", response_model=SnapshotRead)
+def create_snapshot(
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    stored = memory_service.take_snapshot(TRACEMALLOC_FRAMES, MEMORY_SNAPSHOT_LIMIT)
+    return _snapshot_read(stored, group_by, limit)
+
+
+@memory_router.get("/snapshots/{snapshot_id}", response_model=SnapshotRead)
+def get_snapshot(
+    snapshot_id: int,
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    return _snapshot_read(_get_snapshot(snapshot_id), group_by, limit)
+
+
+@memory_router.get("/diff", response_model=SnapshotDiff)
+def diff_snapshots(
+    base: int = Query(..., description="Base snapshot id"),
+    target: int | None = Query(None, description="Defaults to a new snapshot"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    base_snapshot = _get_snapshot(base)
+    target_snapshot = (
+        _get_snapshot(target)
+        if target is not None
+        else memory_service.take_snapshot(TRACEMALLOC_FRAMES, MEMORY_SNAPSHOT_LIMIT)
+    )
+    size_diff_kib, top = memory_service.diff_allocations(
+        base_snapshot.snapshot, target_snapshot.snapshot, group_by, limit
+    )
+    return SnapshotDiff(
+        base_snapshot_id=base_snapshot.snapshot_id,
+        target_snapshot_id=target_snapshot.snapshot_id,
+        size_diff_kib=size_diff_kib,
+        top=top,
+    )
+
+
+@memory_router.delete("/tracing")
+def stop_tracing():
+    memory_service.stop_tracing()
+    return {"message": "tracemalloc stopped"}
+
+
+@memory_router.get("/orm-instances", response_model=list[OrmInstanceCount])
+def get_orm_instances():
+    return memory_service.live_orm_instances()
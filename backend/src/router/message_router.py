@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.db.session import get_db
+from src.db.session import get_async_db, get_db
 from src.db.tables import User
 from src.router.auth import _get_current_user
+from src.router.timed_route import TimedRoute
 from src.schema.message import (
     HeartReactionResponse,
     HeartStatesResponse,
@@ -11,39 +13,45 @@ from src.schema.message import (
     MessageRead,
     MessageUpdate,
 )
-from src.service import message_service, user_service
+from src.schema.serialization import orm_list_response
+from src.service import message_service
+from src.service.aio import message_service as aio_message_service
+from src.service.aio import user_service as aio_user_service
 
 message_router = APIRouter(
     prefix="/messages",
     tags=["Messages"],
+    route_class=TimedRoute,
 )
 
 
 @message_router.post("", response_model=MessageRead)
-def create_message(
+async def create_message(
     message: MessageCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(_get_current_user),
 ):
-    target_user = user_service.get_user(db, message.to_user_id)
+    target_user = await aio_user_service.get_user_snapshot(db, message.to_user_id)
     if not target_user:
         raise HTTPException(status_code=404, detail="Target user not found")
 
-    db_message = message_service.create_message(db, message, current_user.user_id)
+    db_message = await aio_message_service.create_message(
+        db, message, current_user.user_id
+    )
     return db_message
 
 
 @message_router.get("", response_model=list[MessageRead])
-def get_my_messages(
+async def get_my_messages(
     skip: int = Query(0, ge=0, description="Offset"),
     limit: int = Query(50, ge=1, le=100, description="Limit"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(_get_current_user),
 ):
-    messages = message_service.get_messages_with_replies(
+    messages = await aio_message_service.get_messages_with_replies(
         db, current_user.user_id, skip, limit
     )
-    return messages
+    return orm_list_response(MessageRead, messages)
 
 
 @message_router.patch("/{message_id}", response_model=MessageRead)
@@ -79,7 +87,7 @@ def get_message_thread(
         raise HTTPException(
             status_code=404, detail="Message thread not found or no access"
         )
-    return thread
+    return orm_list_response(MessageRead, thread)
 
 
 @message_router.delete("/{message_id}")
@@ -121,12 +129,12 @@ def toggle_heart_reaction(
 
 
 @message_router.post("/heart-states", response_model=HeartStatesResponse)
-def get_heart_states(
+async def get_heart_states(
     message_ids: list[str],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(_get_current_user),
 ):
-    heart_states = message_service.get_heart_states_for_messages(
+    heart_states = await aio_message_service.get_heart_states_for_messages(
         db, current_user.user_id, message_ids
     )
     return {"heart_states": heart_states}
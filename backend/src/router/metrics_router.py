@@ -0,0 +1,49 @@
+import os
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from src.config.logging_config import log_queue_stats
+from src.db.session import pools
+from src.router.timed_route import TimedRoute
+from src.service import metrics, user_cache
+from src.service.token_service import TokenService
+
+# 未設定のときはエンドポイント自体を無効にする（Authorization: Bearer <METRICS_TOKEN>）
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+metrics_router = APIRouter(route_class=TimedRoute)
+
+
+def _check_token(request: Request) -> None:
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request) -> Response:
+    _check_token(request)
+
+    caches = {
+        **user_cache.stats(),
+        "token_verification": TokenService.verification_cache_stats(),
+    }
+    twitter_client = getattr(request.app.state, "twitter_client", None)
+
+    families = [
+        metrics.render_registry(),
+        *metrics.render_pools(pools()),
+        *metrics.render_threadpool(),
+        *metrics.render_caches(caches),
+        *metrics.render_counters(
+            "twitter_api",
+            "endpoint",
+            twitter_client.stats() if twitter_client else {},
+        ),
+        *metrics.render_log_queue(log_queue_stats()),
+    ]
+    return Response("\n".join(families) + "\n", media_type=metrics.CONTENT_TYPE)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from src.db.session import get_db
+from src.db.session import get_db, get_read_db
+from src.router.timed_route import TimedRoute
 from src.schema.profile_item import (
     ProfileItemRead,
     ProfileItemUpdate,
@@ -11,13 +12,14 @@ from src.service import profile_service, user_service
 profile_router = APIRouter(
     prefix="/users/{user_id}",
     tags=["Profile Items"],
+    route_class=TimedRoute,
 )
 
 
 @profile_router.get("/profile-items", response_model=list[ProfileItemRead])
 def get_profile_items_endpoint(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     user_with_items = user_service.get_user_with_profile_items(db, user_id)
     if not user_with_items:
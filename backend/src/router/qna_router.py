@@ -1,25 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from src.db.session import get_db
-from src.schema.answer import AnswerCreate, AnswerRead
-from src.schema.composite_schema import QAWithDetails
+from src.db.session import get_db, get_read_db
+from src.db.tables import User
+from src.router.auth import _get_current_user
+from src.router.timed_route import TimedRoute
+from src.schema.answer import (
+    AnswerBulkUpsert,
+    AnswerCreate,
+    AnswerLikeResponse,
+    AnswerLikeStatesResponse,
+    AnswerRead,
+)
+from src.schema.composite_schema import QAWithDetails, UserAnswerGroupRead
 from src.schema.question import QuestionRead
 from src.service import qna_service
 
 qna_router = APIRouter(
     prefix="/users/{user_id}",
     tags=["Q&A"],
+    route_class=TimedRoute,
 )
 
 questions_router = APIRouter(
     prefix="/questions",
     tags=["Questions"],
+    route_class=TimedRoute,
 )
 
 answers_router = APIRouter(
     prefix="/answers",
     tags=["Answers"],
+    route_class=TimedRoute,
 )
 
 
@@ -42,16 +54,91 @@ def create_new_answer(
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+@qna_router.put("/categories/{category_id}/answers", response_model=UserAnswerGroupRead)
+def bulk_upsert_answers(
+    user_id: str,
+    category_id: str,
+    bulk_in: AnswerBulkUpsert,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_get_current_user),
+):
+    if current_user.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    try:
+        return qna_service.bulk_upsert_answers(
+            db=db, user_id=user_id, category_id=category_id, bulk_in=bulk_in
+        )
+    except ValueError as e:
+        if "User not found" in str(e):
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        if "Category not found" in str(e):
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 @questions_router.get("", response_model=list[QuestionRead])
-def read_all_questions(db: Session = Depends(get_db)):
+def read_all_questions(db: Session = Depends(get_read_db)):
     return qna_service.get_all_questions(db=db)
 
 
 @questions_router.get("/by-category/{category_id}", response_model=list[QuestionRead])
-def read_questions_by_category(category_id: str, db: Session = Depends(get_db)):
+def read_questions_by_category(category_id: str, db: Session = Depends(get_read_db)):
     return qna_service.get_questions_by_category(db=db, category_id=category_id)
 
 
 @answers_router.get("/{answer_id}/with-question", response_model=QAWithDetails)
-def read_answer_with_question(answer_id: int, db: Session = Depends(get_db)):
+def read_answer_with_question(answer_id: int, db: Session = Depends(get_read_db)):
     return qna_service.get_answer_with_question(db=db, answer_id=answer_id)
+
+
+@answers_router.post("/{answer_id}/like", response_model=AnswerLikeResponse)
+def toggle_answer_like(
+    answer_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_get_current_user),
+):
+    try:
+        return qna_service.toggle_answer_like(db, current_user.user_id, answer_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
+@answers_router.put("/{answer_id}/like", response_model=AnswerLikeResponse)
+def like_answer(
+    answer_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_get_current_user),
+):
+    try:
+        return qna_service.set_answer_like(
+            db, current_user.user_id, answer_id, liked=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
+@answers_router.delete("/{answer_id}/like", response_model=AnswerLikeResponse)
+def unlike_answer(
+    answer_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_get_current_user),
+):
+    try:
+        return qna_service.set_answer_like(
+            db, current_user.user_id, answer_id, liked=False
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
+@answers_router.post("/like-states", response_model=AnswerLikeStatesResponse)
+def get_answer_like_states(
+    answer_ids: list[int],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(_get_current_user),
+):
+    like_states = qna_service.get_answer_like_states(
+        db, current_user.user_id, answer_ids
+    )
+    return {"like_states": like_states}
@@ -0,0 +1,63 @@
+import functools
+import inspect
+import time
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from src.service import profiler, server_timing
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # シグネチャは __wrapped__ から解決されるため、依存関係の解決には影響しない
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                server_timing.mark_endpoint_finished()
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        # 同期エンドポイントはワーカースレッドで動くため、cProfile もそこで有効にする
+        try:
+            with profiler.profile_thread():
+                return endpoint(*args, **kwargs)
+        finally:
+            server_timing.mark_endpoint_finished()
+
+    return sync_wrapper
+
+
+class TimedRoute(APIRoute):
+    """ルートの処理時間（app）と、エンドポイント終了後のレスポンス生成時間（serialize）を計測する
+
+    serialize には response_model による検証・シリアライズと JSON への変換が含まれる。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request: Request) -> Response:
+            timings = server_timing.request_timings.get()
+            if timings is None:
+                return await route_handler(request)
+
+            started = time.perf_counter()
+            try:
+                return await route_handler(request)
+            finally:
+                finished = time.perf_counter()
+                timings.add("app", finished - started)
+                if timings.endpoint_finished_at is not None:
+                    timings.add("serialize", finished - timings.endpoint_finished_at)
+
+        return timed_route_handler
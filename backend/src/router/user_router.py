@@ -4,15 +4,17 @@ from typing import Literal
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from src.db.session import get_db
+from src.db.session import get_db, get_read_db
 from src.db.tables import User
 from src.router.auth import get_current_user_optional
+from src.router.timed_route import TimedRoute
 from src.schema.user import UserCreate, UserRead
 from src.service import user_service
 
 user_router = APIRouter(
     prefix="/users",
     tags=["Global User Resources"],
+    route_class=TimedRoute,
 )
 
 
@@ -25,7 +27,7 @@ def upsert_user_endpoint(user_in: UserCreate, db: Session = Depends(get_db)):
 def read_all_users_endpoint(
     skip: int = Query(0, ge=0, description="Offset"),
     limit: int = Query(100, ge=1, le=100, description="Limit"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return user_service.get_users(db, skip=skip, limit=limit)
 
@@ -37,7 +39,7 @@ def discover_users_endpoint(
     ),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User | None = Depends(get_current_user_optional),
 ):
     """
@@ -57,7 +59,7 @@ def discover_users_endpoint(
 
 
 @user_router.get("/{user_id}", response_model=UserRead)
-def read_user_by_id_endpoint(user_id: str, db: Session = Depends(get_db)):
+def read_user_by_id_endpoint(user_id: str, db: Session = Depends(get_read_db)):
     user = user_service.get_user(db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -68,7 +70,7 @@ def read_user_by_id_endpoint(user_id: str, db: Session = Depends(get_db)):
 def search_users_by_display_name(
     q: str = Query(..., min_length=1, description="Search query for display name"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     users = user_service.search_users_by_display_name(db, display_name=q, limit=limit)
     return users
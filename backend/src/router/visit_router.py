@@ -1,35 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.db.session import get_db
-from src.router.auth import _get_current_user
+from src.db.session import get_async_db, get_async_read_db, get_db
+from src.db.tables import User
+from src.router.auth import _get_current_user, get_current_user_optional
+from src.router.timed_route import TimedRoute
+from src.schema.serialization import orm_list_response
 from src.schema.visit import VisitorInfo, VisitRead, VisitsVisibilityUpdate
 from src.service import visit_service
+from src.service.aio import visit_service as aio_visit_service
 
 visit_router = APIRouter(
     prefix="/users/{user_id}",
     tags=["Visits"],
+    route_class=TimedRoute,
 )
 
+ANONYMOUS_VISITOR = VisitorInfo(is_anonymous=True)
+
 
 @visit_router.post("/visit", status_code=201)
-def record_visit_endpoint(
-    user_id: str, request: Request, db: Session = Depends(get_db)
+async def record_visit_endpoint(
+    user_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User | None = Depends(get_current_user_optional),
 ):
     try:
-        visitor_user_id = None
-        try:
-            current_user = _get_current_user(request, db)
-            visitor_user_id = current_user.user_id
-        except HTTPException:
-            pass
+        visitor_user_id = current_user.user_id if current_user else None
 
         if visitor_user_id == user_id:
             return {
                 "message": "Visit processed successfully"
             }  # Self-visit, no recording needed
 
-        recorded_visit = visit_service.record_visit(
+        recorded_visit = await aio_visit_service.record_visit(
             db=db, visited_user_id=user_id, visitor_user_id=visitor_user_id
         )
 
@@ -47,37 +52,23 @@ def record_visit_endpoint(
 
 
 @visit_router.get("/visits", response_model=list[VisitRead])
-def get_user_visits_endpoint(
-    user_id: str, limit: int = Query(50, ge=1, le=100), db: Session = Depends(get_db)
+async def get_user_visits_endpoint(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    visits = visit_service.get_user_visits(db=db, user_id=user_id, limit=limit)
+    visits = await aio_visit_service.get_user_visits(
+        db=db, user_id=user_id, limit=limit
+    )
 
-    visit_reads = []
+    # VisitorInfo は訪問者の User 行からそのまま作る（匿名なら共有のインスタンス）
     for visit in visits:
-        visitor_info = None
-        if visit.visitor_user and not visit.is_anonymous:
-            visitor_info = VisitorInfo(
-                user_id=visit.visitor_user.user_id,
-                user_name=visit.visitor_user.user_name,
-                display_name=visit.visitor_user.display_name,
-                icon_url=visit.visitor_user.icon_url,
-                is_anonymous=False,
-            )
-        elif visit.is_anonymous:
-            visitor_info = VisitorInfo(is_anonymous=True)
-
-        visit_reads.append(
-            VisitRead(
-                visit_id=visit.visit_id,
-                visitor_user_id=visit.visitor_user_id,
-                visited_user_id=visit.visited_user_id,
-                is_anonymous=visit.is_anonymous,
-                visited_at=visit.visited_at,
-                visitor_info=visitor_info,
-            )
-        )
+        if visit.is_anonymous:
+            visit.visitor_info = ANONYMOUS_VISITOR
+        else:
+            visit.visitor_info = visit.visitor_user
 
-    return visit_reads
+    return orm_list_response(VisitRead, visits)
 
 
 @visit_router.put("/visits-visibility", status_code=204)
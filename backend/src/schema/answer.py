@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from pydantic import Field
+
 from src.schema.common import OrmBaseModel
 
 
@@ -19,4 +21,22 @@ class AnswerRead(AnswerBase):
     answer_id: int
     user_id: str
     question_id: int
+    like_count: int = 0
     created_at: datetime
+
+
+class AnswerBulkItem(AnswerBase):
+    question_id: int
+
+
+class AnswerBulkUpsert(OrmBaseModel):
+    answers: list[AnswerBulkItem] = Field(..., min_length=1, max_length=100)
+
+
+class AnswerLikeResponse(OrmBaseModel):
+    user_liked: bool
+    like_count: int
+
+
+class AnswerLikeStatesResponse(OrmBaseModel):
+    like_states: dict[int, AnswerLikeResponse]
@@ -15,6 +15,8 @@ class AnsweredQARead(OrmBaseModel):
     answer_id: int
     answer_text: str
     question: QuestionRead
+    like_count: int = 0
+    user_liked: bool = False
 
 
 class UserAnswerGroupRead(OrmBaseModel):
@@ -40,6 +42,15 @@ class MessagesPageData(OrmBaseModel):
     messages: list[MessageRead]
 
 
+class UserPageData(ProfilePageData):
+    """プロフィールページ表示用の集約レスポンス（要求されたセクションのみ設定）"""
+
+    profile_items: list[ProfileItemRead] | None = None
+    user_answer_groups: list[UserAnswerGroupRead] | None = None
+    categories: dict[str, CategoryInfoRead] | None = None
+    messages: list[MessageRead] | None = None
+
+
 class QAWithDetails(OrmBaseModel):
     question: QuestionRead
     answer: AnswerRead
@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+
+from .common import OrmBaseModel
+
+
+class AllocationSite(OrmBaseModel):
+    # group_by=traceback のときは呼び出し元を含めた複数フレーム
+    frames: list[str]
+    size_kib: float
+    count: int
+    size_diff_kib: Optional[float] = None
+    count_diff: Optional[int] = None
+
+
+class ProcessMemory(OrmBaseModel):
+    rss_kib: Optional[int] = None
+    traced_current_kib: float
+    traced_peak_kib: float
+    tracing: bool
+
+
+class SnapshotRead(OrmBaseModel):
+    snapshot_id: int
+    taken_at: datetime
+    memory: ProcessMemory
+    top: list[AllocationSite]
+
+
+class SnapshotDiff(OrmBaseModel):
+    base_snapshot_id: int
+    target_snapshot_id: int
+    size_diff_kib: float
+    top: list[AllocationSite]
+
+
+class OrmInstanceCount(OrmBaseModel):
+    class_name: str
+    count: int
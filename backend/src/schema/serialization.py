@@ -0,0 +1,101 @@
+"""一覧レスポンスの高速なシリアライズ
+
+response_model による変換は、ORM の行ごとにレスポンスモデル（入れ子のモデルを含む）を
+from_attributes で検証・生成してから JSON にする。100件のメッセージ一覧ではこの検証が
+シリアライズ時間の大半を占める。
+
+ここではレスポンスモデルのフィールド定義から「どの属性をどのキー名で出すか」を事前に
+組み立てておき、ORM の行を直接 dict にして orjson でバイト列にする。DB から読んだ値は
+検証済みとみなすため、モデルの検証は行わない（出力は response_model を通した場合と同じ）。
+"""
+
+import enum
+import types
+from datetime import date, datetime
+from functools import cache
+from typing import Any, Callable, Iterable, Union, get_args, get_origin
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# 値をそのまま orjson に渡せる型（pydantic の JSON 出力と同じ表現になるもの）
+_PASSTHROUGH_TYPES = (str, int, bool, float, datetime, date, enum.Enum)
+
+Dumper = Callable[[Any], dict[str, Any]]
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson でシリアライズする JSONResponse（UTC の日時は pydantic と同じく Z で出力する）"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def _resolve(annotation: Any) -> tuple[type[BaseModel] | None, bool]:
+    """フィールドの型から（入れ子のモデル, リストかどうか）を取り出す"""
+    origin = get_origin(annotation)
+    if origin is list:
+        model, _ = _resolve(get_args(annotation)[0])
+        return model, True
+    if origin is Union or origin is types.UnionType:
+        members = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(members) == 1:
+            return _resolve(members[0])
+    elif isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return annotation, False
+        if issubclass(annotation, _PASSTHROUGH_TYPES):
+            return None, False
+    raise TypeError(f"Unsupported field type for fast serialization: {annotation!r}")
+
+
+@cache
+def compile_dumper(model: type[BaseModel]) -> Dumper:
+    """ORM の行（または属性を持つ任意のオブジェクト）を model の JSON と同じ形の dict にする関数を返す"""
+    # 検証・シリアライズで値を変換するモデルは、属性をそのまま出すと結果が変わる
+    decorators = model.__pydantic_decorators__
+    if (
+        decorators.field_validators
+        or decorators.model_validators
+        or decorators.field_serializers
+        or decorators.model_serializers
+        or decorators.computed_fields
+    ):
+        raise TypeError(f"{model.__name__} customizes validation or serialization")
+
+    fields = []
+    for name, field in model.model_fields.items():
+        nested, many = _resolve(field.annotation)
+        key = field.serialization_alias or field.alias or name
+        fields.append(
+            (
+                key,
+                name,
+                field.get_default(call_default_factory=True),
+                compile_dumper(nested) if nested else None,
+                many,
+            )
+        )
+
+    def dump(obj: Any) -> dict[str, Any]:
+        data = {}
+        for key, name, default, nested, many in fields:
+            # from_attributes と同じく、属性がなければ既定値を使う
+            value = getattr(obj, name, default)
+            if nested is not None and value is not None:
+                value = [nested(item) for item in value] if many else nested(value)
+            data[key] = value
+        return data
+
+    return dump
+
+
+def dump_rows(model: type[BaseModel], rows: Iterable[Any]) -> list[dict[str, Any]]:
+    dump = compile_dumper(model)
+    return [dump(row) for row in rows]
+
+
+def orm_list_response(model: type[BaseModel], rows: Iterable[Any]) -> ORJSONResponse:
+    """ORM の行の一覧を list[model] の JSON として返す（response_model の検証を通さない）"""
+    return ORJSONResponse(dump_rows(model, rows))
@@ -0,0 +1,159 @@
+"""本番用の起動スクリプト: python -m src.server
+
+WEB_CONCURRENCY が2以上なら、親プロセスでアプリを読み込んでからワーカーをフォークする
+（プリフォーク）。読み取り専用のカタログ（質問テンプレート・カテゴリ・ラベル）は
+フォーク前に読み込んでおき、コピーオンライトで全ワーカーから共有する。
+"""
+
+import gc
+import os
+import signal
+import sys
+import time
+
+import uvicorn
+
+from src.config.logging_config import get_logger, stop_log_writer
+from src.config.workers import WEB_CONCURRENCY, ensure_worker_safety
+from src.service import metrics
+
+logger = get_logger(__name__)
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# 異常終了したワーカーを起動し直す間隔の下限（起動直後に落ち続ける場合の連続再起動を防ぐ）
+WORKER_RESTART_INTERVAL_SECONDS = float(
+    os.getenv("WORKER_RESTART_INTERVAL_SECONDS", "1")
+)
+
+# uvicorn が起動に失敗したときの終了コード
+STARTUP_FAILURE = 3
+
+
+def preload_catalogs() -> None:
+    """初回アクセス時に読み込まれるファイル由来のデータを、フォーク前に読み込んでおく"""
+    from src.service.config_manager import get_config_manager
+    from src.service.yaml_loader import get_yaml_loader, load_default_labels
+
+    get_yaml_loader().get_templates()
+    get_config_manager().load_versions()
+    load_default_labels()
+
+
+def _run_worker(config: uvicorn.Config, sockets: list, worker_id: int) -> None:
+    # 親のシグナルハンドラを引き継がない（uvicorn が自分のハンドラを設定する）
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # /metrics は応答したワーカー自身の値のみを返すため、ワーカー番号をラベルに付ける
+    metrics.set_worker(worker_id)
+    code = 0
+    try:
+        server = uvicorn.Server(config)
+        server.run(sockets=sockets)
+        if not server.started:
+            code = STARTUP_FAILURE
+    except BaseException:
+        logger.exception("Worker crashed", pid=os.getpid())
+        code = 1
+    finally:
+        stop_log_writer()
+        # 親から引き継いだ atexit 処理などを実行せずに終了する
+        os._exit(code)
+
+
+class PreforkServer:
+    """listen したソケットを共有するワーカーをフォークし、終了したものは起動し直す"""
+
+    def __init__(self, config: uvicorn.Config, workers: int) -> None:
+        self.config = config
+        self.workers = workers
+        # pid -> ワーカー番号（再起動したワーカーは同じ番号を引き継ぐ）
+        self.children: dict[int, int] = {}
+        self.stopping = False
+        self._last_spawned_at = 0.0
+
+    def _spawn(self, sockets: list, worker_id: int) -> None:
+        self._last_spawned_at = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self.config, sockets, worker_id)
+        self.children[pid] = worker_id
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        sockets = [self.config.bind_socket()]
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        # 読み込み済みのオブジェクトをGCの走査対象から外し、ワーカー側での
+        # 参照カウント以外の書き込み（= ページのコピー）を減らす
+        gc.freeze()
+        for worker_id in range(self.workers):
+            self._spawn(sockets, worker_id)
+        logger.info("Workers started", workers=self.workers, pid=os.getpid())
+
+        exit_code = 0
+        while self.children:
+            pid, status = os.wait()
+            worker_id = self.children.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+            if code == STARTUP_FAILURE:
+                logger.error("Worker failed to start, shutting down", pid=pid)
+                exit_code = STARTUP_FAILURE
+                self._stop(None, None)
+                continue
+
+            logger.warning("Worker exited, restarting", pid=pid, exit_code=code)
+            wait = WORKER_RESTART_INTERVAL_SECONDS - (
+                time.monotonic() - self._last_spawned_at
+            )
+            if wait > 0:
+                time.sleep(wait)
+            if not self.stopping:
+                self._spawn(sockets, worker_id)
+
+        for sock in sockets:
+            sock.close()
+        logger.info("Workers stopped")
+        return exit_code
+
+
+def main() -> int:
+    workers = WEB_CONCURRENCY
+    try:
+        ensure_worker_safety(workers)
+    except RuntimeError as e:
+        logger.error("Refusing to start", error=str(e))
+        return 1
+
+    # アプリの読み込み（DB エンジンや各種設定の初期化を含む）をフォーク前に済ませる
+    from src.main import app
+
+    config = uvicorn.Config(
+        app,
+        host=HOST,
+        port=PORT,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS"),
+    )
+    if workers <= 1:
+        server = uvicorn.Server(config)
+        server.run()
+        return 0 if server.started else STARTUP_FAILURE
+
+    preload_catalogs()
+    return PreforkServer(config, workers).run()
+
+
+if __name__ == "__main__":
+    code = main()
+    stop_log_writer()
+    sys.exit(code)
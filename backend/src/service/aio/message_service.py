@@ -0,0 +1,137 @@
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.tables import Message, MessageLike, MessageStatusEnum, UserBlock
+from src.schema.message import MessageCreate
+
+# 非同期セッションでは遅延ロードできないため、同期版と同じ関連を先読みする
+from src.service.message_service import MESSAGE_READ_OPTIONS, THREAD_COUNTS_SQL
+
+
+async def get_message(db: AsyncSession, message_id: str) -> Message | None:
+    return await db.scalar(
+        select(Message)
+        .options(*MESSAGE_READ_OPTIONS)
+        .where(Message.message_id == message_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def create_message(
+    db: AsyncSession, message: MessageCreate, from_user_id: str
+) -> Message:
+    is_blocked = (
+        await db.scalar(
+            select(UserBlock.block_id).where(
+                UserBlock.blocker_user_id == message.to_user_id,
+                UserBlock.blocked_user_id == from_user_id,
+            )
+        )
+        is not None
+    )
+
+    if is_blocked:
+        raise ValueError("Cannot send message to user who has blocked you")
+
+    db_message = Message(
+        message_id=str(uuid.uuid4()),
+        from_user_id=from_user_id,
+        to_user_id=message.to_user_id,
+        message_type=message.message_type,
+        content=message.content,
+        reference_answer_id=message.reference_answer_id,
+        parent_message_id=message.parent_message_id,
+        status=MessageStatusEnum.unread,
+    )
+    db.add(db_message)
+    await db.commit()
+    return await get_message(db, db_message.message_id)
+
+
+async def get_messages_for_user(
+    db: AsyncSession, user_id: str, skip: int = 0, limit: int = 50
+) -> list[Message]:
+    blocked_user_ids = select(UserBlock.blocked_user_id).where(
+        UserBlock.blocker_user_id == user_id
+    )
+
+    result = await db.scalars(
+        select(Message)
+        .options(*MESSAGE_READ_OPTIONS)
+        .where(
+            Message.to_user_id == user_id,
+            ~Message.from_user_id.in_(blocked_user_ids),
+        )
+        .order_by(Message.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result)
+
+
+async def get_messages_with_replies(
+    db: AsyncSession, user_id: str, skip: int = 0, limit: int = 50
+) -> list[Message]:
+    result = await db.scalars(
+        select(Message)
+        .options(*MESSAGE_READ_OPTIONS)
+        .where(
+            Message.to_user_id == user_id,
+            Message.parent_message_id.is_(None),
+        )
+        .order_by(Message.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    messages = list(result)
+    if not messages:
+        return messages
+
+    thread_counts = dict(
+        (
+            await db.execute(
+                THREAD_COUNTS_SQL,
+                {"root_ids": [message.message_id for message in messages]},
+            )
+        ).all()
+    )
+    for message in messages:
+        message.reply_count = thread_counts.get(message.message_id, 0)
+
+    return messages
+
+
+async def get_heart_states_for_messages(
+    db: AsyncSession, user_id: str, message_ids: list[str]
+) -> dict:
+    if not message_ids:
+        return {}
+
+    user_liked_messages = set(
+        await db.scalars(
+            select(MessageLike.message_id).where(
+                MessageLike.user_id == user_id,
+                MessageLike.message_id.in_(message_ids),
+            )
+        )
+    )
+
+    like_counts = dict(
+        (
+            await db.execute(
+                select(MessageLike.message_id, func.count(MessageLike.like_id))
+                .where(MessageLike.message_id.in_(message_ids))
+                .group_by(MessageLike.message_id)
+            )
+        ).all()
+    )
+
+    return {
+        message_id: {
+            "user_liked": message_id in user_liked_messages,
+            "like_count": like_counts.get(message_id, 0),
+        }
+        for message_id in message_ids
+    }
@@ -0,0 +1,65 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from src.db.tables import (
+    Message,
+    MessageStatusEnum,
+    MessageTypeEnum,
+    NotificationLevelEnum,
+)
+from src.service.aio import user_service
+
+
+async def get_notifications_for_user(
+    db: AsyncSession, user_id: str, skip: int = 0, limit: int = 50
+) -> list[Message]:
+    user = await user_service.get_user_snapshot(db, user_id)
+    if not user:
+        return []
+
+    if user.notification_level == NotificationLevelEnum.none:
+        return []
+
+    # 非同期セッションでは遅延ロードできないため、レスポンスで使う関連を先読みする
+    stmt = (
+        select(Message)
+        .options(
+            joinedload(Message.from_user),
+            joinedload(Message.to_user),
+            joinedload(Message.parent_message).joinedload(Message.from_user),
+        )
+        .where(Message.to_user_id == user_id)
+    )
+
+    if user.notification_level == NotificationLevelEnum.important:
+        stmt = stmt.where(Message.message_type == MessageTypeEnum.comment)
+
+    result = await db.scalars(
+        stmt.order_by(Message.created_at.desc()).offset(skip).limit(limit)
+    )
+    return list(result)
+
+
+async def mark_all_notifications_as_read(db: AsyncSession, user_id: str) -> int:
+    user = await user_service.get_user_snapshot(db, user_id)
+    if not user:
+        return 0
+
+    if user.notification_level == NotificationLevelEnum.none:
+        return 0
+
+    stmt = update(Message).where(
+        Message.to_user_id == user_id, Message.status == MessageStatusEnum.unread
+    )
+
+    if user.notification_level == NotificationLevelEnum.important:
+        stmt = stmt.where(Message.message_type == MessageTypeEnum.comment)
+
+    result = await db.execute(
+        stmt.values(status=MessageStatusEnum.read).execution_options(
+            synchronize_session=False
+        )
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,57 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.tables import ProfileItem, User
+from src.service import user_cache
+from src.service.user_cache import UserSnapshot
+
+
+async def get_user(db: AsyncSession, user_id: str) -> User | None:
+    return await db.get(User, user_id)
+
+
+async def get_user_by_username(db: AsyncSession, user_name: str) -> User | None:
+    return await db.scalar(select(User).where(User.user_name == user_name))
+
+
+async def get_user_snapshot(db: AsyncSession, user_id: str) -> UserSnapshot | None:
+    snapshot = user_cache.snapshot_by_id.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    user = await get_user(db, user_id)
+    if not user:
+        return None
+
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.put(snapshot)
+    return snapshot
+
+
+async def get_user_snapshot_by_username(
+    db: AsyncSession, user_name: str
+) -> UserSnapshot | None:
+    user_id = user_cache.user_id_by_name.get(user_name)
+    if user_id is not None:
+        snapshot = await get_user_snapshot(db, user_id)
+        # ユーザー名が変更されていた場合はDBから引き直す
+        if snapshot is not None and snapshot.user_name == user_name:
+            return snapshot
+        user_cache.user_id_by_name.pop(user_name)
+
+    user = await get_user_by_username(db, user_name)
+    if not user:
+        return None
+
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.put(snapshot)
+    return snapshot
+
+
+async def get_profile_items(db: AsyncSession, user_id: str) -> list[ProfileItem]:
+    result = await db.scalars(
+        select(ProfileItem)
+        .where(ProfileItem.user_id == user_id)
+        .order_by(ProfileItem.display_order)
+    )
+    return list(result)
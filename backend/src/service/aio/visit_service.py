@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from src.config.logging_config import get_logger
+from src.db.tables import User, Visit
+from src.service.aio import user_service
+
+logger = get_logger(__name__)
+
+
+async def record_visit(
+    db: AsyncSession, visited_user_id: str, visitor_user_id: str | None = None
+) -> Visit | None:
+    if visitor_user_id == visited_user_id:
+        return None
+
+    if not await user_service.get_user_snapshot(db, visited_user_id):
+        return None
+
+    # Check for recent visit (within last 24 hours) to avoid spam
+    now = datetime.now(timezone.utc)
+    existing_visit = await db.scalar(
+        select(Visit)
+        .where(
+            Visit.visited_user_id == visited_user_id,
+            Visit.visitor_user_id == visitor_user_id,
+            Visit.visited_at > now - timedelta(hours=24),
+        )
+        .limit(1)
+    )
+
+    visit = existing_visit or Visit(
+        visitor_user_id=visitor_user_id,
+        visited_user_id=visited_user_id,
+        is_anonymous=(visitor_user_id is None),
+    )
+    visit.visited_at = now
+
+    try:
+        db.add(visit)
+        await db.commit()
+        return visit
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.warning("Failed to record visit", error=str(e))
+        return None
+
+
+async def get_user_visits(
+    db: AsyncSession, user_id: str, limit: int = 50
+) -> list[Visit]:
+    if not await user_service.get_user_snapshot(db, user_id):
+        return []
+
+    # Subquery to get the latest visit_id for each visitor
+    latest_visits_subquery = (
+        select(func.max(Visit.visit_id).label("max_visit_id"))
+        .where(Visit.visited_user_id == user_id)
+        .group_by(Visit.visitor_user_id)
+        .subquery()
+    )
+
+    result = await db.scalars(
+        select(Visit)
+        .options(joinedload(Visit.visitor_user))
+        .join(
+            latest_visits_subquery,
+            Visit.visit_id == latest_visits_subquery.c.max_visit_id,
+        )
+        .outerjoin(User, Visit.visitor_user_id == User.user_id)
+        .where(
+            # Show anonymous visits or visits from users who have visits_visible=True
+            (Visit.visitor_user_id.is_(None)) | (User.visits_visible)
+        )
+        .order_by(Visit.visited_at.desc())
+        .limit(limit)
+    )
+    return list(result)
+
+
+async def get_visit_count(db: AsyncSession, user_id: str) -> int:
+    count = await db.scalar(
+        select(func.count()).select_from(Visit).where(Visit.visited_user_id == user_id)
+    )
+    return count or 0
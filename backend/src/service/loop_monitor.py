@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+import anyio.to_thread
+
+from src.config.logging_config import get_logger
+from src.service.metrics import (
+    EVENT_LOOP_BLOCKED,
+    EVENT_LOOP_LAG,
+    THREADPOOL_QUEUE_WAIT,
+)
+
+logger = get_logger(__name__)
+
+MAX_STACK_FRAMES = 30
+
+
+def _format_stack(thread_id: int) -> str | None:
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    return "".join(traceback.format_stack(frame, limit=MAX_STACK_FRAMES))
+
+
+class LoopMonitor:
+    """イベントループの遅延とスレッドプールの待ち時間を計測する
+
+    - イベントループ上のタスクが interval ごとに起床し、予定からの遅れを記録する
+    - probe_interval ごとに空の処理をスレッドプールに投入し、実行開始までの待ち時間を記録する
+    - 別スレッドの監視役が、ループの応答が lag_threshold 以上途絶えたときに
+      ループのスレッドが実行中のスタックをログに出す（ループ自身はブロック中に報告できないため）
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        lag_threshold: float = 0.5,
+        probe_interval: float = 1.0,
+    ) -> None:
+        self.interval = interval
+        self.lag_threshold = lag_threshold
+        self.probe_interval = probe_interval
+        self._loop_thread_id: int | None = None
+        self._last_beat = time.perf_counter()
+        self._tasks: list[asyncio.Task] = []
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    async def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._tasks = [
+            asyncio.create_task(self._heartbeat()),
+            asyncio.create_task(self._probe_threadpool()),
+        ]
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._watchdog is not None:
+            await anyio.to_thread.run_sync(self._watchdog.join)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._last_beat = time.perf_counter()
+            EVENT_LOOP_LAG.observe(max(self._last_beat - started - self.interval, 0.0))
+
+    async def _probe_threadpool(self) -> None:
+        while True:
+            submitted = time.perf_counter()
+            started = await anyio.to_thread.run_sync(time.perf_counter)
+            THREADPOOL_QUEUE_WAIT.observe(started - submitted)
+            await asyncio.sleep(self.probe_interval)
+
+    def _watch(self) -> None:
+        blocked_since: float | None = None
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            stalled = time.perf_counter() - last_beat
+            if stalled >= self.lag_threshold + self.interval:
+                if blocked_since != last_beat:
+                    # 1回のブロックにつき1度だけスタックを出す
+                    blocked_since = last_beat
+                    EVENT_LOOP_BLOCKED.inc()
+                    logger.warning(
+                        "Event loop blocked",
+                        blocked_seconds=round(stalled - self.interval, 3),
+                        stack=_format_stack(self._loop_thread_id),
+                    )
+            elif blocked_since is not None and last_beat != blocked_since:
+                logger.info(
+                    "Event loop recovered",
+                    blocked_seconds=round(last_beat - blocked_since - self.interval, 3),
+                )
+                blocked_since = None
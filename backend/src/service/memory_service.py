@@ -0,0 +1,137 @@
+import gc
+import itertools
+import linecache
+import os
+import tracemalloc
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from src.db.tables import Base
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+# tracemalloc 自身と import 処理による確保は除外する
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass(frozen=True)
+class StoredSnapshot:
+    snapshot_id: int
+    taken_at: datetime
+    snapshot: tracemalloc.Snapshot
+
+
+_snapshots: "OrderedDict[int, StoredSnapshot]" = OrderedDict()
+_snapshot_ids = itertools.count(1)
+
+
+def take_snapshot(frames: int, max_snapshots: int) -> StoredSnapshot:
+    """スナップショットを取って保持する（未開始なら tracemalloc を開始してから取る）
+
+    開始直後のスナップショットには開始後の確保しか含まれないため、
+    基準とするスナップショットは開始後しばらくしてから取ること。
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+    stored = StoredSnapshot(
+        snapshot_id=next(_snapshot_ids),
+        taken_at=datetime.now(timezone.utc),
+        snapshot=tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS),
+    )
+    _snapshots[stored.snapshot_id] = stored
+    while len(_snapshots) > max_snapshots:
+        _snapshots.popitem(last=False)
+    return stored
+
+
+def get_snapshot(snapshot_id: int) -> StoredSnapshot | None:
+    return _snapshots.get(snapshot_id)
+
+
+def list_snapshots() -> list[StoredSnapshot]:
+    return list(_snapshots.values())
+
+
+def stop_tracing() -> None:
+    tracemalloc.stop()
+    _snapshots.clear()
+
+
+def _frames(traceback: tracemalloc.Traceback) -> list[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+def top_allocations(
+    snapshot: tracemalloc.Snapshot, group_by: str, limit: int
+) -> list[dict]:
+    if group_by not in GROUP_BY:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+
+    return [
+        {
+            "frames": _frames(stat.traceback),
+            "size_kib": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics(group_by)[:limit]
+    ]
+
+
+def diff_allocations(
+    base: tracemalloc.Snapshot,
+    target: tracemalloc.Snapshot,
+    group_by: str,
+    limit: int,
+) -> tuple[float, list[dict]]:
+    """base からの増減が大きい順の確保箇所と、全体の増減（KiB）を返す"""
+    if group_by not in GROUP_BY:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+
+    stats = target.compare_to(base, group_by)
+    total_diff = sum(stat.size_diff for stat in stats)
+    return round(total_diff / 1024, 1), [
+        {
+            "frames": _frames(stat.traceback),
+            "size_kib": round(stat.size / 1024, 1),
+            "count": stat.count,
+            "size_diff_kib": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def process_memory() -> dict:
+    rss_kib = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss_kib = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        pass
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "rss_kib": rss_kib,
+        "traced_current_kib": round(current / 1024, 1),
+        "traced_peak_kib": round(peak / 1024, 1),
+        "tracing": tracemalloc.is_tracing(),
+    }
+
+
+def live_orm_instances() -> list[dict]:
+    """GC が追跡している ORM インスタンスのクラスごとの件数（ヒープ全体を走査するため重い）"""
+    counts = Counter(
+        type(obj).__name__ for obj in gc.get_objects() if isinstance(obj, Base)
+    )
+    return [
+        {"class_name": class_name, "count": count}
+        for class_name, count in counts.most_common()
+    ]
@@ -1,7 +1,7 @@
 import uuid
 
-from sqlalchemy import func, text
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, func, text
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from src.db.tables import (
     Message,
@@ -12,6 +12,50 @@ from src.db.tables import (
 )
 from src.schema.message import MessageCreate, MessageUpdate
 
+# MessageRead のシリアライズ時に遅延ロードが走らないよう、参照する関連を先読みする
+MESSAGE_READ_OPTIONS = (
+    joinedload(Message.from_user),
+    joinedload(Message.to_user),
+    joinedload(Message.parent_message).joinedload(Message.from_user),
+    selectinload(Message.replies).joinedload(Message.from_user),
+)
+
+# ルートメッセージごとのスレッド件数（ハートリアクションを除く）を1回で数える
+THREAD_COUNTS_SQL = text("""
+    WITH RECURSIVE thread_tree AS (
+        SELECT m.message_id, m.parent_message_id AS root_id
+        FROM messages m
+        WHERE m.parent_message_id IN :root_ids
+        AND NOT (m.message_type = 'like' AND m.content = '❤️')
+
+        UNION ALL
+
+        SELECT m.message_id, tt.root_id
+        FROM messages m
+        INNER JOIN thread_tree tt ON m.parent_message_id = tt.message_id
+        WHERE NOT (m.message_type = 'like' AND m.content = '❤️')
+    )
+    SELECT root_id, count(*) FROM thread_tree GROUP BY root_id
+    """).bindparams(bindparam("root_ids", expanding=True))
+
+# 任意のメッセージからスレッドのルートを辿る
+_THREAD_ROOT_SQL = text("""
+    WITH RECURSIVE ancestors AS (
+        SELECT message_id, parent_message_id, from_user_id, to_user_id
+        FROM messages
+        WHERE message_id = :message_id
+
+        UNION ALL
+
+        SELECT m.message_id, m.parent_message_id, m.from_user_id, m.to_user_id
+        FROM messages m
+        INNER JOIN ancestors a ON m.message_id = a.parent_message_id
+    )
+    SELECT message_id, from_user_id, to_user_id
+    FROM ancestors
+    WHERE parent_message_id IS NULL
+    """)
+
 
 def create_message(db: Session, message: MessageCreate, from_user_id: str) -> Message:
     is_blocked = (
@@ -52,7 +96,7 @@ def get_messages_for_user(
 
     return (
         db.query(Message)
-        .options(joinedload(Message.from_user))
+        .options(*MESSAGE_READ_OPTIONS)
         .filter(
             Message.to_user_id == user_id,
             ~Message.from_user_id.in_(blocked_user_ids_subquery),
@@ -85,19 +129,10 @@ def update_message_status(
 
 
 def get_message_thread(db: Session, message_id: str, user_id: str) -> list[Message]:
-    root_message = db.query(Message).filter(Message.message_id == message_id).first()
+    root_message = db.execute(_THREAD_ROOT_SQL, {"message_id": message_id}).first()
     if not root_message:
         return []
 
-    while root_message.parent_message_id:
-        root_message = (
-            db.query(Message)
-            .filter(Message.message_id == root_message.parent_message_id)
-            .first()
-        )
-        if not root_message:
-            return []
-
     if root_message.from_user_id != user_id and root_message.to_user_id != user_id:
         return []
 
@@ -132,7 +167,7 @@ def get_message_thread(db: Session, message_id: str, user_id: str) -> list[Messa
 
     thread_messages = (
         db.query(Message)
-        .options(joinedload(Message.from_user), joinedload(Message.to_user))
+        .options(*MESSAGE_READ_OPTIONS)
         .filter(Message.message_id.in_(message_ids))
         .all()
     )
@@ -174,28 +209,18 @@ def get_message_thread(db: Session, message_id: str, user_id: str) -> list[Messa
     return sort_messages_hierarchically(thread_messages)
 
 
-def _get_full_thread_count(db: Session, root_message_id: str) -> int:
-    thread_count_data = db.execute(
-        text("""
-            WITH RECURSIVE thread_tree AS (
-                SELECT m.message_id
-                FROM messages m 
-                WHERE m.parent_message_id = :root_id
-                AND NOT (m.message_type = 'like' AND m.content = '❤️')
-                
-                UNION ALL
-                
-                SELECT m.message_id
-                FROM messages m
-                INNER JOIN thread_tree tt ON m.parent_message_id = tt.message_id
-                WHERE NOT (m.message_type = 'like' AND m.content = '❤️')
-            )
-            SELECT count(*) FROM thread_tree
-            """),
-        {"root_id": root_message_id},
-    ).scalar_one_or_none()
+def _set_thread_counts(db: Session, messages: list[Message]) -> None:
+    if not messages:
+        return
 
-    return thread_count_data if thread_count_data is not None else 0
+    thread_counts = dict(
+        db.execute(
+            THREAD_COUNTS_SQL,
+            {"root_ids": [message.message_id for message in messages]},
+        ).all()
+    )
+    for message in messages:
+        message.reply_count = thread_counts.get(message.message_id, 0)
 
 
 def get_messages_with_replies(
@@ -203,7 +228,7 @@ def get_messages_with_replies(
 ) -> list[Message]:
     messages = (
         db.query(Message)
-        .options(joinedload(Message.from_user))
+        .options(*MESSAGE_READ_OPTIONS)
         .filter(
             Message.to_user_id == user_id,
             Message.parent_message_id.is_(None),
@@ -213,10 +238,7 @@ def get_messages_with_replies(
         .limit(limit)
         .all()
     )
-
-    for message in messages:
-        message.reply_count = _get_full_thread_count(db, message.message_id)
-
+    _set_thread_counts(db, messages)
     return messages
 
 
@@ -225,7 +247,7 @@ def get_conversation_messages_for_user(
 ) -> list[Message]:
     messages = (
         db.query(Message)
-        .options(joinedload(Message.from_user), joinedload(Message.to_user))
+        .options(*MESSAGE_READ_OPTIONS)
         .filter(
             ((Message.to_user_id == user_id) | (Message.from_user_id == user_id)),
             Message.parent_message_id.is_(None),
@@ -235,9 +257,7 @@ def get_conversation_messages_for_user(
         .limit(limit)
         .all()
     )
-    for message in messages:
-        message.reply_count = _get_full_thread_count(db, message.message_id)
-
+    _set_thread_counts(db, messages)
     return messages
 
 
@@ -0,0 +1,434 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterable
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+from starlette.types import Scope
+
+# Prometheus のテキスト形式（0.0.4）
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Sample = tuple[str, dict[str, str], float]
+
+# プリフォーク時に全サンプルへ付けるラベル。値はワーカーごとに集計されるため、
+# どのワーカーの値かを区別できるようにする（合計は sum without (worker) で取る）
+_worker_labels: dict[str, str] = {}
+
+
+def set_worker(worker_id: int) -> None:
+    _worker_labels["worker"] = str(worker_id)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if _worker_labels:
+        labels = {**_worker_labels, **labels}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def format_family(
+    name: str, kind: str, help_text: str, samples: Iterable[Sample]
+) -> str:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for sample_name, labels, value in samples:
+        lines.append(f"{sample_name}{_format_labels(labels)} {value}")
+    return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            items = list(self._values.items())
+        return format_family(
+            self.name,
+            "counter",
+            self.help_text,
+            (
+                (self.name, dict(zip(self.labelnames, labelvalues, strict=True)), value)
+                for labelvalues, value in items
+            ),
+        )
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # ラベルごとに [各バケットの件数..., +Inf の件数, 合計値]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(labelvalues)
+            if data is None:
+                data = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+            data[index] += 1
+            data[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        data = self._values.get(labelvalues)
+        return int(sum(data[:-1])) if data else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = [
+                (labelvalues, list(data)) for labelvalues, data in self._values.items()
+            ]
+        for labelvalues, data in items:
+            labels = dict(zip(self.labelnames, labelvalues, strict=True))
+            cumulative = 0
+            for bound, bucket_count in zip(
+                (*self.buckets, "+Inf"), data[:-1], strict=True
+            ):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": str(bound)}, cumulative
+            yield f"{self.name}_sum", labels, data[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+    def render(self) -> str:
+        return format_family(self.name, "histogram", self.help_text, self._samples())
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route"),
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ("method", "route", "status"),
+)
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total",
+    "HTTP requests that raised or returned 5xx",
+    ("method", "route"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of DB queries executed per request",
+    ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Total DB query time per request",
+    ("route",),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "DB query latency",
+    ("engine",),
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total",
+    "DB queries slower than SLOW_QUERY_SECONDS",
+    ("engine",),
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection",
+    ("engine",),
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of a periodic event loop wake-up beyond its schedule",
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total",
+    "Times the event loop stopped responding for longer than LOOP_LAG_THRESHOLD_SECONDS",
+)
+THREADPOOL_QUEUE_WAIT = Histogram(
+    "threadpool_queue_wait_seconds",
+    "Time a probe task waited for a worker thread",
+)
+RATE_LIMITED = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected by the rate limiter",
+    ("method", "route"),
+)
+
+REGISTRY = (
+    REQUEST_DURATION,
+    REQUESTS_TOTAL,
+    REQUEST_ERRORS,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_SECONDS,
+    DB_QUERY_DURATION,
+    DB_SLOW_QUERIES,
+    DB_POOL_CHECKOUT_WAIT,
+    EVENT_LOOP_LAG,
+    EVENT_LOOP_BLOCKED,
+    THREADPOOL_QUEUE_WAIT,
+    RATE_LIMITED,
+)
+
+
+@dataclass
+class RequestDBStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+# リクエスト単位のDB集計（スレッドプールにもコンテキストごと引き継がれる）
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+# 処理中のリクエストの scope（ルーティング後は scope["route"] からテンプレートが取れる）
+request_scope: ContextVar[Scope | None] = ContextVar("request_scope", default=None)
+
+
+def route_template(scope: Scope) -> str:
+    # 実際のパスではなくルートのテンプレートを使い、ラベルの種類数を抑える
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def current_route() -> str | None:
+    scope = request_scope.get()
+    return route_template(scope) if scope is not None else None
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, many):
+    # 開始時刻は文ごとの実行コンテキストに持たせる（接続に積むと、失敗した文の分が
+    # after_cursor_execute で取り除かれずにプールの接続に残り続ける）
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def install_query_timer(engine: Engine) -> None:
+    """文の実行開始時刻を記録するイベントを登録する（何度呼んでも1つだけ）"""
+    if not event.contains(engine, "before_cursor_execute", _start_query_timer):
+        event.listen(engine, "before_cursor_execute", _start_query_timer)
+
+
+def query_duration(context) -> float | None:
+    """install_query_timer を登録したエンジンで、after_cursor_execute から呼ぶ"""
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return None
+    return time.perf_counter() - started_at
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """クエリの件数・時間を集計するイベントを登録する（AsyncEngine は sync_engine を渡す）"""
+    install_query_timer(engine)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = query_duration(context)
+        if elapsed is None:
+            return
+        DB_QUERY_DURATION.observe(elapsed, name)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+
+def observe_request(
+    method: str,
+    route: str,
+    status_code: int,
+    duration: float,
+    db_stats: RequestDBStats,
+) -> None:
+    REQUEST_DURATION.observe(duration, method, route)
+    REQUESTS_TOTAL.inc(method, route, str(status_code))
+    if status_code >= 500:
+        REQUEST_ERRORS.inc(method, route)
+    REQUEST_DB_QUERIES.observe(db_stats.queries, route)
+    REQUEST_DB_SECONDS.observe(db_stats.seconds, route)
+
+
+def render_registry() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY)
+
+
+def _gauge(
+    name: str, help_text: str, samples: Iterable[tuple[dict[str, str], float]]
+) -> str:
+    return format_family(
+        name, "gauge", help_text, ((name, labels, value) for labels, value in samples)
+    )
+
+
+def _counter(
+    name: str, help_text: str, samples: Iterable[tuple[dict[str, str], float]]
+) -> str:
+    return format_family(
+        name, "counter", help_text, ((name, labels, value) for labels, value in samples)
+    )
+
+
+# 以下はスクレイプ時に現在値を読み取って出力する
+
+
+def render_pools(pools: dict[str, Pool]) -> list[str]:
+    queue_pools = {
+        name: pool for name, pool in pools.items() if isinstance(pool, QueuePool)
+    }
+    capacity = {
+        name: pool.size() + max(pool._max_overflow, 0)
+        for name, pool in queue_pools.items()
+    }
+    return [
+        _gauge(
+            "db_pool_size",
+            "Configured pool size",
+            (({"engine": n}, p.size()) for n, p in queue_pools.items()),
+        ),
+        _gauge(
+            "db_pool_checked_out",
+            "Connections currently checked out",
+            (({"engine": n}, p.checkedout()) for n, p in queue_pools.items()),
+        ),
+        _gauge(
+            "db_pool_overflow",
+            "Connections opened beyond pool_size",
+            (({"engine": n}, max(p.overflow(), 0)) for n, p in queue_pools.items()),
+        ),
+        _gauge(
+            "db_pool_saturation",
+            "Checked out connections / (pool_size + max_overflow)",
+            (
+                ({"engine": n}, round(p.checkedout() / capacity[n], 4))
+                for n, p in queue_pools.items()
+                if capacity[n] > 0
+            ),
+        ),
+    ]
+
+
+def render_threadpool() -> list[str]:
+    # イベントループ上から呼ぶこと
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return [
+        _gauge(
+            "threadpool_workers_max",
+            "Worker thread limit",
+            [({}, limiter.total_tokens)],
+        ),
+        _gauge(
+            "threadpool_workers_busy",
+            "Worker threads in use",
+            [({}, statistics.borrowed_tokens)],
+        ),
+        _gauge(
+            "threadpool_queue_depth",
+            "Tasks waiting for a worker thread",
+            [({}, statistics.tasks_waiting)],
+        ),
+    ]
+
+
+def render_caches(caches: dict[str, dict]) -> list[str]:
+    return [
+        _counter(
+            "cache_hits_total",
+            "Cache hits",
+            (({"cache": n}, s["hits"]) for n, s in caches.items()),
+        ),
+        _counter(
+            "cache_misses_total",
+            "Cache misses",
+            (({"cache": n}, s["misses"]) for n, s in caches.items()),
+        ),
+        _gauge(
+            "cache_hit_ratio",
+            "Cache hit ratio since start",
+            (({"cache": n}, s["hit_ratio"]) for n, s in caches.items()),
+        ),
+        _gauge(
+            "cache_entries",
+            "Cache entries",
+            (({"cache": n}, s["size"]) for n, s in caches.items()),
+        ),
+    ]
+
+
+def render_counters(
+    prefix: str, label: str, stats: dict[str, dict[str, float]]
+) -> list[str]:
+    """{ラベル値: {指標名: 値}} 形式の累積値をカウンターとして出力する"""
+    keys = sorted({key for values in stats.values() for key in values})
+    return [
+        _counter(
+            f"{prefix}_{key.removeprefix('total_')}_total",
+            f"{prefix} {key}",
+            (({label: name}, values.get(key, 0)) for name, values in stats.items()),
+        )
+        for key in keys
+    ]
+
+
+def reset() -> None:
+    for metric in REGISTRY:
+        metric.clear()
+
+
+def render_log_queue(stats: dict) -> list[str]:
+    if not stats:
+        return []
+    return [
+        _gauge(
+            "log_queue_depth",
+            "Log records waiting to be written",
+            [({}, stats["queued"])],
+        ),
+        _counter(
+            "log_records_dropped_total",
+            "Log records dropped because the queue was full",
+            [({}, stats["dropped"])],
+        ),
+        _counter(
+            "log_batches_written_total", "Batched log writes", [({}, stats["batches"])]
+        ),
+    ]
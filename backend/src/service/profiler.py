@@ -0,0 +1,206 @@
+import cProfile
+import json
+import pstats
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+WORKER_THREAD_NAME = "AnyIO worker thread"
+
+# 同時にプロファイルするのは1リクエストだけ（cProfile は入れ子にできず、サンプリングも混ざるため）
+_capture_lock = threading.Lock()
+
+
+def _is_idle_worker(frame) -> bool:
+    # AnyIO のワーカースレッドは待機中 queue.get でブロックしている
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "get" and code.co_filename.endswith("queue.py"):
+            return True
+        frame = frame.f_back
+    return False
+
+
+class SamplingProfiler:
+    """別スレッドから一定間隔でスタックを採取する統計的プロファイラ
+
+    イベントループのスレッドと、処理中のスレッドプールのワーカーを対象にする。
+    同時に処理されている他のリクエストのスタックも含まれる点に注意。
+    出力は speedscope（https://www.speedscope.app/）の sampled 形式。
+    """
+
+    extension = ".speedscope.json"
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.loop_thread_id = threading.get_ident()
+        self._frames: list[dict] = []
+        self._frame_index: dict[tuple, int] = {}
+        # スレッドごとの (スタック, 重み)
+        self._samples: dict[int, list[tuple[list[int], float]]] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started_at = 0.0
+        self._duration = 0.0
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._duration = time.perf_counter() - self._started_at
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+
+    def _sample(self, weight: float) -> None:
+        workers = {
+            thread.ident
+            for thread in threading.enumerate()
+            if thread.name == WORKER_THREAD_NAME
+        }
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != self.loop_thread_id and (
+                thread_id not in workers or _is_idle_worker(frame)
+            ):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self._samples.setdefault(thread_id, []).append((stack, weight))
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_filename, code.co_firstlineno, code.co_qualname)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self._frames)
+            self._frames.append(
+                {
+                    "name": code.co_qualname,
+                    "file": code.co_filename,
+                    "line": code.co_firstlineno,
+                }
+            )
+        return index
+
+    def to_speedscope(self, name: str) -> dict:
+        profiles = []
+        for thread_id, samples in self._samples.items():
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": "event loop"
+                    if thread_id == self.loop_thread_id
+                    else f"worker {thread_id}",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self._duration,
+                    "samples": [stack for stack, _ in samples],
+                    "weights": [weight for _, weight in samples],
+                }
+            )
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "hitoq",
+            "shared": {"frames": self._frames},
+            "profiles": profiles,
+        }
+
+    def save(self, path: Path, name: str) -> None:
+        path.write_text(json.dumps(self.to_speedscope(name)))
+
+
+class DeterministicProfiler:
+    """cProfile による決定的プロファイラ（出力は pstats 形式）
+
+    cProfile はスレッド単位でしか有効にできないため、イベントループのスレッドに加えて、
+    同期エンドポイントの本体を実行するワーカースレッドでも profile_thread() で計測する。
+    """
+
+    extension = ".prof"
+
+    def __init__(self) -> None:
+        self._loop_profile = cProfile.Profile()
+        self._thread_profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._loop_profile.enable()
+
+    def stop(self) -> None:
+        self._loop_profile.disable()
+
+    @contextmanager
+    def profile_thread(self) -> Iterator[None]:
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._thread_profiles.append(profile)
+
+    def save(self, path: Path, name: str) -> None:
+        stats = pstats.Stats(self._loop_profile)
+        for profile in self._thread_profiles:
+            stats.add(profile)
+        stats.dump_stats(path)
+
+
+active_profiler: ContextVar[DeterministicProfiler | SamplingProfiler | None] = (
+    ContextVar("active_profiler", default=None)
+)
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """ワーカースレッドで実行される処理を、リクエストの cProfile に含める"""
+    profiler = active_profiler.get()
+    if isinstance(profiler, DeterministicProfiler):
+        with profiler.profile_thread():
+            yield
+    else:
+        yield
+
+
+def try_acquire() -> bool:
+    return _capture_lock.acquire(blocking=False)
+
+
+def release() -> None:
+    _capture_lock.release()
+
+
+def create_profiler(
+    mode: str, sample_interval: float
+) -> DeterministicProfiler | SamplingProfiler:
+    if mode == "cprofile":
+        return DeterministicProfiler()
+    return SamplingProfiler(interval=sample_interval)
+
+
+def profile_filename(method: str, route: str, extension: str) -> str:
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    return f"{timestamp}_{method}_{slug}{extension}"
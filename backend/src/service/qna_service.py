@@ -1,9 +1,12 @@
+import uuid
 from collections import defaultdict
 
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session, joinedload
 
-from src.db.tables import Answer, Question, User
-from src.schema.answer import AnswerCreate, AnswerRead
+from src.db.tables import Answer, AnswerLike, Question, User
+from src.db.upsert import dialect_insert
+from src.schema.answer import AnswerBulkUpsert, AnswerCreate, AnswerRead
 from src.schema.composite_schema import (
     AnsweredQARead,
     QAWithDetails,
@@ -14,7 +17,9 @@ from src.service.categories import get_category_by_id
 from src.service.yaml_loader import get_yaml_loader
 
 
-def get_user_qna(db: Session, user_id: str) -> list[UserAnswerGroupRead]:
+def get_user_qna(
+    db: Session, user_id: str, viewer_user_id: str | None = None
+) -> list[UserAnswerGroupRead]:
     user_answers = (
         db.query(Answer)
         .options(joinedload(Answer.question))
@@ -23,47 +28,78 @@ def get_user_qna(db: Session, user_id: str) -> list[UserAnswerGroupRead]:
     )
 
     answers_by_question_id = {answer.question_id: answer for answer in user_answers}
+    liked_answer_ids = _get_liked_answer_ids(
+        db, viewer_user_id, [answer.answer_id for answer in user_answers]
+    )
 
     answered_categories = set()
     for answer in user_answers:
         if answer.question:
             answered_categories.add(answer.question.category_id)
 
+    # 回答のあるカテゴリの質問はまとめて1回で取得する
+    questions_by_category: dict[str, list[Question]] = defaultdict(list)
+    if answered_categories:
+        for question in (
+            db.query(Question)
+            .filter(Question.category_id.in_(answered_categories))
+            .order_by(Question.display_order)
+            .all()
+        ):
+            questions_by_category[question.category_id].append(question)
+
     user_answer_groups = []
     for category_id in answered_categories:
         category_info = get_category_by_id(category_id)
         if not category_info:
             continue
 
-        category_questions = (
-            db.query(Question)
-            .filter(Question.category_id == category_id)
-            .order_by(Question.display_order)
-            .all()
-        )
-
-        answers = []
-        for question in category_questions:
-            user_answer = answers_by_question_id.get(question.question_id)
-            answers.append(
-                AnsweredQARead(
-                    answer_id=user_answer.answer_id if user_answer else 0,
-                    answer_text=user_answer.answer_text if user_answer else "",
-                    question=QuestionRead.model_validate(question),
-                )
-            )
+        category_questions = questions_by_category[category_id]
 
         user_answer_groups.append(
-            UserAnswerGroupRead(
-                template_id=category_id,
-                template_title=category_info.name,
-                answers=answers,
+            _build_answer_group(
+                category_id,
+                category_info.name,
+                category_questions,
+                answers_by_question_id,
+                liked_answer_ids,
             )
         )
 
     return user_answer_groups
 
 
+def _build_answer_group(
+    category_id: str,
+    category_title: str,
+    category_questions: list[Question],
+    answers_by_question_id: dict[int, Answer],
+    liked_answer_ids: set[int] | None = None,
+) -> UserAnswerGroupRead:
+    liked_answer_ids = liked_answer_ids or set()
+    answers = []
+    for question in category_questions:
+        user_answer = answers_by_question_id.get(question.question_id)
+        answers.append(
+            AnsweredQARead(
+                answer_id=user_answer.answer_id if user_answer else 0,
+                answer_text=user_answer.answer_text if user_answer else "",
+                question=QuestionRead.model_validate(question),
+                like_count=user_answer.like_count if user_answer else 0,
+                user_liked=(
+                    user_answer is not None
+                    and user_answer.answer_id in liked_answer_ids
+                ),
+            )
+        )
+
+    return UserAnswerGroupRead(
+        template_id=category_id,
+        template_title=category_title,
+        answers=answers,
+    )
+
+
 def get_all_questions_grouped(
     db: Session,
 ) -> dict[str, list[Question]]:
@@ -98,15 +134,78 @@ def create_answer(
     if not question:
         raise ValueError("Question not found")
 
-    db_answer = Answer(
+    stmt = dialect_insert(db, Answer).values(
         user_id=user_id, question_id=question_id, **answer_in.model_dump()
     )
-    db.add(db_answer)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Answer.user_id, Answer.question_id],
+        # created_at は最終編集時刻を表す（回答一覧の表示や重複行の整理がこの意味に依存する）
+        set_={"answer_text": stmt.excluded.answer_text, "created_at": func.now()},
+    ).returning(Answer)
+    db_answer = db.scalars(stmt, execution_options={"populate_existing": True}).one()
     db.commit()
     db.refresh(db_answer)
     return db_answer
 
 
+def bulk_upsert_answers(
+    db: Session, user_id: str, category_id: str, bulk_in: AnswerBulkUpsert
+) -> UserAnswerGroupRead:
+    category_info = get_category_by_id(category_id)
+    if not category_info:
+        raise ValueError("Category not found")
+
+    user_exists = db.query(User.user_id).filter(User.user_id == user_id).first()
+    if not user_exists:
+        raise ValueError("User not found")
+
+    # カテゴリの質問一覧で一括バリデーションし、レスポンス構築にも使い回す
+    category_questions = (
+        db.query(Question)
+        .filter(Question.category_id == category_id)
+        .order_by(Question.display_order)
+        .all()
+    )
+    category_question_ids = {q.question_id for q in category_questions}
+
+    # 同じ質問が複数回送られた場合は後勝ち
+    submitted = {item.question_id: item.answer_text for item in bulk_in.answers}
+    invalid_ids = sorted(set(submitted) - category_question_ids)
+    if invalid_ids:
+        raise ValueError(f"Question not found in category: {invalid_ids}")
+
+    rows = [
+        {"user_id": user_id, "question_id": question_id, "answer_text": text}
+        for question_id, text in submitted.items()
+    ]
+    stmt = dialect_insert(db, Answer).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Answer.user_id, Answer.question_id],
+        set_={"answer_text": stmt.excluded.answer_text, "created_at": func.now()},
+    )
+
+    try:
+        db.execute(stmt)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    category_answers = (
+        db.query(Answer)
+        .filter(
+            Answer.user_id == user_id,
+            Answer.question_id.in_(list(category_question_ids)),
+        )
+        .all()
+    )
+    answers_by_question_id = {a.question_id: a for a in category_answers}
+
+    return _build_answer_group(
+        category_id, category_info.name, category_questions, answers_by_question_id
+    )
+
+
 def get_answer_with_question(db: Session, answer_id: int) -> QAWithDetails:
     answer = (
         db.query(Answer)
@@ -127,7 +226,100 @@ def get_answer_with_question(db: Session, answer_id: int) -> QAWithDetails:
     )
 
 
-def initialize_default_questions(db: Session) -> None:
+def _get_liked_answer_ids(
+    db: Session, user_id: str | None, answer_ids: list[int]
+) -> set[int]:
+    if not user_id or not answer_ids:
+        return set()
+
+    liked = (
+        db.query(AnswerLike.answer_id)
+        .filter(
+            AnswerLike.user_id == user_id,
+            AnswerLike.answer_id.in_(answer_ids),
+        )
+        .all()
+    )
+    return {row[0] for row in liked}
+
+
+def set_answer_like(db: Session, user_id: str, answer_id: int, liked: bool) -> dict:
+    # いいね行の追加/削除と like_count の増減を同一トランザクションで行う。
+    # 実際に行が変化したときだけカウンタを動かすので、同じ操作の再送は冪等になる
+    answer_exists = (
+        db.query(Answer.answer_id).filter(Answer.answer_id == answer_id).first()
+    )
+    if not answer_exists:
+        raise ValueError("Answer not found")
+
+    if liked:
+        stmt = (
+            dialect_insert(db, AnswerLike)
+            .values(like_id=uuid.uuid4(), answer_id=answer_id, user_id=user_id)
+            .on_conflict_do_nothing(
+                index_elements=[AnswerLike.answer_id, AnswerLike.user_id]
+            )
+            .returning(AnswerLike.like_id)
+        )
+    else:
+        stmt = (
+            delete(AnswerLike)
+            .where(
+                AnswerLike.answer_id == answer_id,
+                AnswerLike.user_id == user_id,
+            )
+            .returning(AnswerLike.like_id)
+        )
+
+    try:
+        changed = db.execute(stmt).first() is not None
+        if changed:
+            like_count = db.execute(
+                update(Answer)
+                .where(Answer.answer_id == answer_id)
+                .values(like_count=Answer.like_count + (1 if liked else -1))
+                .returning(Answer.like_count)
+            ).scalar_one()
+        else:
+            like_count = db.execute(
+                select(Answer.like_count).where(Answer.answer_id == answer_id)
+            ).scalar_one()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"user_liked": liked, "like_count": like_count}
+
+
+def toggle_answer_like(db: Session, user_id: str, answer_id: int) -> dict:
+    already_liked = answer_id in _get_liked_answer_ids(db, user_id, [answer_id])
+    return set_answer_like(db, user_id, answer_id, not already_liked)
+
+
+def get_answer_like_states(
+    db: Session, user_id: str | None, answer_ids: list[int]
+) -> dict:
+    if not answer_ids:
+        return {}
+
+    like_counts = dict(
+        db.query(Answer.answer_id, Answer.like_count)
+        .filter(Answer.answer_id.in_(answer_ids))
+        .all()
+    )
+    liked_answer_ids = _get_liked_answer_ids(db, user_id, answer_ids)
+
+    return {
+        answer_id: {
+            "user_liked": answer_id in liked_answer_ids,
+            "like_count": like_counts.get(answer_id, 0),
+        }
+        for answer_id in answer_ids
+    }
+
+
+def initialize_default_questions(db: Session, commit: bool = True) -> None:
     existing_questions = db.query(Question).first()
     if existing_questions:
         return
@@ -141,4 +333,5 @@ def initialize_default_questions(db: Session) -> None:
             )
             db.add(question)
 
-    db.commit()
+    if commit:
+        db.commit()
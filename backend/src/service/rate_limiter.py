@@ -0,0 +1,313 @@
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Protocol
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from src.config.logging_config import get_logger
+from src.service.metrics import RATE_LIMITED
+from src.service.token_service import TokenService
+
+logger = get_logger(__name__)
+
+# memory: ワーカーごと / sqlite: 同一ホストの全ワーカーで共有 / redis: 複数ホストで共有
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = os.getenv(
+    "RATE_LIMIT_SQLITE_PATH",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+        "hitoq_rate_limit.sqlite3",
+    ),
+)
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class Rate:
+    """ "10/minute" のような表記。容量 count のバケツに count/period で補充する"""
+
+    count: int
+    period: int
+    text: str
+
+    @classmethod
+    def parse(cls, text: str) -> "Rate":
+        match = _RATE.match(text)
+        if not match or int(match.group(1)) < 1:
+            raise ValueError(f"Invalid rate limit: {text!r}")
+        return cls(int(match.group(1)), _PERIODS[match.group(2)], text)
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.count / self.period
+
+
+def get_remote_address(request: Request) -> str:
+    return request.client.host if request.client else "127.0.0.1"
+
+
+class RateLimitBackend(Protocol):
+    # True の場合はI/Oを伴うため、イベントループを塞がないようスレッドプールで呼ぶ
+    blocking: bool
+
+    def consume(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """トークンを1つ消費する。許可なら 0、拒否なら次に許可されるまでの秒数を返す"""
+        ...
+
+    def reset(self) -> None: ...
+
+
+class MemoryRateLimitBackend:
+    """プロセス内のトークンバケツ（単一ワーカー・テスト用）"""
+
+    blocking = False
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill_per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # 溢れた場合は最も長く使われていないバケツ（満杯に戻っている可能性が高い）から捨てる
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    bucket_key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    allowed INTEGER NOT NULL
+)
+"""
+
+# 補充・消費・判定を1文で行う（UPDATE の SET 句は更新前の値を参照する）
+_SQLITE_CONSUME = """
+INSERT INTO rate_limit_buckets (bucket_key, tokens, updated_at, expires_at, allowed)
+VALUES (:key, :capacity - 1, :now, :expires_at, 1)
+ON CONFLICT (bucket_key) DO UPDATE SET
+    tokens = CASE
+        WHEN MIN(:capacity, tokens + MAX(:now - updated_at, 0) * :rate) >= 1
+        THEN MIN(:capacity, tokens + MAX(:now - updated_at, 0) * :rate) - 1
+        ELSE MIN(:capacity, tokens + MAX(:now - updated_at, 0) * :rate)
+    END,
+    updated_at = :now,
+    expires_at = :expires_at,
+    allowed = MIN(:capacity, tokens + MAX(:now - updated_at, 0) * :rate) >= 1
+RETURNING tokens, allowed
+"""
+
+
+class SQLiteRateLimitBackend:
+    """SQLite ファイル上のトークンバケツ（同一ホストのワーカー間で共有する）
+
+    既定では /dev/shm（共有メモリ上のファイル）に置く。
+    """
+
+    blocking = True
+    # 満杯に戻ったバケツを消す頻度（consume の呼び出し回数）
+    CLEANUP_EVERY = 10000
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        self._connect().execute(_SQLITE_SCHEMA)
+        # フォークしたワーカーが親の接続を使い回さないようにする
+        os.register_at_fork(after_in_child=self._reset_connections)
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.time()
+        conn = self._connect()
+        tokens, allowed = conn.execute(
+            _SQLITE_CONSUME,
+            {
+                "key": key,
+                "capacity": capacity,
+                "rate": refill_per_second,
+                "now": now,
+                "expires_at": now + capacity / refill_per_second,
+            },
+        ).fetchone()
+
+        self._calls += 1
+        if self._calls % self.CLEANUP_EVERY == 0:
+            conn.execute("DELETE FROM rate_limit_buckets WHERE expires_at < ?", (now,))
+
+        return 0.0 if allowed else (1 - tokens) / refill_per_second
+
+    def reset(self) -> None:
+        self._connect().execute("DELETE FROM rate_limit_buckets")
+
+
+# 補充・消費・判定をサーバー側で不可分に行う
+_REDIS_CONSUME = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Redis 互換サーバー上のトークンバケツ（複数ホストで共有する）
+
+    client は redis-py 互換（register_script / scan_iter / delete）であればよい。
+    """
+
+    blocking = True
+    KEY_PREFIX = "rate_limit:"
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self._consume = client.register_script(_REDIS_CONSUME)
+
+    def consume(self, key: str, capacity: int, refill_per_second: float) -> float:
+        allowed, tokens = self._consume(
+            keys=[self.KEY_PREFIX + key],
+            args=[capacity, refill_per_second, time.time()],
+        )
+        return 0.0 if int(allowed) else (1 - float(tokens)) / refill_per_second
+
+    def reset(self) -> None:
+        keys = list(self.client.scan_iter(match=self.KEY_PREFIX + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class RateLimiter:
+    """ルートごとのトークンバケツで流量を制限する
+
+    @router.post("/block", dependencies=[Depends(limiter.limit("10/minute", per="user"))])
+
+    per="ip" はクライアントのIPアドレス、per="user" はログイン中ならユーザーID
+    （未ログインならIPアドレス）ごとに数える。バックエンドの障害時は制限せずに通す。
+    """
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True) -> None:
+        self.backend = backend
+        self.enabled = enabled
+
+    def limit(self, rate: str, per: str = "ip") -> Callable[[Request], Awaitable[None]]:
+        if per not in ("ip", "user"):
+            raise ValueError(f"Unknown rate limit key: {per!r}")
+        parsed = Rate.parse(rate)
+
+        async def check_rate_limit(request: Request) -> None:
+            if not self.enabled:
+                return
+            route = request.scope.get("route")
+            path = getattr(route, "path", request.url.path)
+            key = f"{request.method}:{path}:{_identity(request, per)}"
+            try:
+                if self.backend.blocking:
+                    retry_after = await run_in_threadpool(
+                        self.backend.consume,
+                        key,
+                        parsed.count,
+                        parsed.refill_per_second,
+                    )
+                else:
+                    retry_after = self.backend.consume(
+                        key, parsed.count, parsed.refill_per_second
+                    )
+            except Exception as e:
+                logger.warning("Rate limit backend unavailable", error=str(e))
+                return
+
+            if retry_after > 0:
+                RATE_LIMITED.inc(request.method, path)
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Rate limit exceeded: {parsed.text}",
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+        return check_rate_limit
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+
+def _identity(request: Request, per: str) -> str:
+    if per == "user":
+        token = request.cookies.get("access_token")
+        if token:
+            try:
+                # 検証結果はトークンごとにキャッシュされている
+                payload = TokenService.verify_token(token, "access")
+                return f"user:{payload['sub']}"
+            except HTTPException:
+                pass
+    return f"ip:{get_remote_address(request)}"
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteRateLimitBackend(RATE_LIMIT_SQLITE_PATH)
+
+    if RATE_LIMIT_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise ValueError(
+                "RATE_LIMIT_BACKEND=redis requires the redis package"
+            ) from e
+        return RedisRateLimitBackend(redis.Redis.from_url(RATE_LIMIT_REDIS_URL))
+
+    if RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND}")
+    return MemoryRateLimitBackend()
@@ -0,0 +1,242 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Protocol
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from src.config.env_config import DATABASE_URL
+from src.config.logging_config import get_logger
+from src.db.tables import RevokedToken
+from src.db.upsert import dialect_insert
+from src.service.cache import TTLCache
+
+logger = get_logger(__name__)
+
+# memory: ワーカーごとのインメモリ / database: 全ワーカーで共有するDBテーブル
+TOKEN_REVOCATION_BACKEND = os.getenv("TOKEN_REVOCATION_BACKEND", "memory")
+TOKEN_REVOCATION_DATABASE_URL = os.getenv("TOKEN_REVOCATION_DATABASE_URL")
+# 失効ストア用エンジンの接続プール（DATABASE_URL を共有する場合はプライマリの接続数に含まれる）
+TOKEN_REVOCATION_POOL_SIZE = int(os.getenv("TOKEN_REVOCATION_POOL_SIZE", "5"))
+TOKEN_REVOCATION_MAX_OVERFLOW = int(os.getenv("TOKEN_REVOCATION_MAX_OVERFLOW", "10"))
+TOKEN_REVOCATION_MAX_SIZE = int(os.getenv("TOKEN_REVOCATION_MAX_SIZE", "100000"))
+# 他ワーカーでの失効をブルームフィルタに取り込む間隔（秒）。他ワーカーで失効したトークンは
+# この間（＋再構築にかかる時間）はまだ受け付けられうる
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5"))
+
+
+def hash_token(token: str) -> str:
+    # トークン本体は保存せず、SHA-256 ダイジェストのみを扱う
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationStore(Protocol):
+    def revoke(self, token_hash: str, expires_at: datetime) -> None: ...
+
+    def is_revoked(self, token_hash: str) -> bool: ...
+
+    def active_hashes(self) -> Iterable[str]: ...
+
+
+class MemoryRevocationStore:
+    """プロセス内のTTL付きストア（単一ワーカー・テスト用）"""
+
+    def __init__(self, maxsize: int = TOKEN_REVOCATION_MAX_SIZE) -> None:
+        self._cache = TTLCache(maxsize=maxsize, ttl=0)
+
+    def revoke(self, token_hash: str, expires_at: datetime) -> None:
+        ttl = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if ttl > 0:
+            self._cache.set(token_hash, True, ttl=ttl)
+
+    def is_revoked(self, token_hash: str) -> bool:
+        return self._cache.get(token_hash, False)
+
+    def active_hashes(self) -> Iterable[str]:
+        return self._cache.keys()
+
+
+class DatabaseRevocationStore:
+    """revoked_tokens テーブルに保存し、全ワーカーで共有するストア"""
+
+    def __init__(self, engine: Engine) -> None:
+        self._session_factory = sessionmaker(bind=engine)
+
+    def revoke(self, token_hash: str, expires_at: datetime) -> None:
+        now = datetime.now(timezone.utc)
+        with self._session_factory() as db:
+            stmt = (
+                dialect_insert(db, RevokedToken)
+                .values(token_hash=token_hash, expires_at=expires_at)
+                .on_conflict_do_nothing(index_elements=[RevokedToken.token_hash])
+            )
+            db.execute(stmt)
+            # 失効操作は稀なので、ついでに期限切れの行を掃除する
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            db.commit()
+
+    def is_revoked(self, token_hash: str) -> bool:
+        now = datetime.now(timezone.utc)
+        with self._session_factory() as db:
+            return (
+                db.query(RevokedToken.token_hash)
+                .filter(
+                    RevokedToken.token_hash == token_hash,
+                    RevokedToken.expires_at > now,
+                )
+                .first()
+                is not None
+            )
+
+    def active_hashes(self) -> Iterable[str]:
+        now = datetime.now(timezone.utc)
+        with self._session_factory() as db:
+            rows = (
+                db.query(RevokedToken.token_hash)
+                .filter(RevokedToken.expires_at > now)
+                .all()
+            )
+            return [row[0] for row in rows]
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+
+class BloomFilteredRevocationStore:
+    """ブルームフィルタで「未失効」を即答し、候補のみバックエンドへ問い合わせる
+
+    他ワーカーでの失効は sync_interval ごとにバックグラウンドのスレッドでフィルタを
+    作り直して取り込む（リクエストの処理中にバックエンドを全件走査しない）。そのため
+    他ワーカーで失効したトークンは、最大で sync_interval と再構築にかかる時間の間は
+    このワーカーで受け付けられる。同じワーカーでの失効は即座に反映される。
+    """
+
+    def __init__(
+        self,
+        backend: RevocationStore,
+        capacity: int = TOKEN_REVOCATION_MAX_SIZE,
+        sync_interval: float = TOKEN_REVOCATION_SYNC_SECONDS,
+    ) -> None:
+        self.backend = backend
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self.backend_lookups = 0
+        self._filter = BloomFilter(capacity)
+        self._synced_at = float("-inf")
+        self._refreshing = False
+        # 再構築中に失効したハッシュ（新しいフィルタへ引き継ぐ）
+        self._revoked_during_refresh: list[str] | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """バックエンドの全件からフィルタを作り直し、差し替える"""
+        with self._lock:
+            self._revoked_during_refresh = []
+        try:
+            hashes = list(self.backend.active_hashes())
+        except Exception as e:
+            logger.warning("Failed to sync token revocation filter", error=str(e))
+            hashes = None
+
+        with self._lock:
+            if hashes is not None:
+                bloom = BloomFilter(max(self.capacity, len(hashes)))
+                for token_hash in hashes:
+                    bloom.add(token_hash)
+                for token_hash in self._revoked_during_refresh:
+                    bloom.add(token_hash)
+                self._filter = bloom
+            self._revoked_during_refresh = None
+            self._synced_at = time.monotonic()
+            self._refreshing = False
+
+    def _maybe_sync(self) -> None:
+        if self._refreshing or time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            first_sync = self._synced_at == float("-inf")
+            self._refreshing = True
+        if first_sync:
+            # 起動直後は既存の失効を取り込むまで待つ（1プロセスにつき1回だけ）
+            self.refresh()
+            return
+        threading.Thread(
+            target=self.refresh, name="revocation-filter-sync", daemon=True
+        ).start()
+
+    def reset_after_fork(self) -> None:
+        # フォーク先には再構築中のスレッドが存在しないため、その状態を引き継がない
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._revoked_during_refresh = None
+
+    def revoke(self, token_hash: str, expires_at: datetime) -> None:
+        self.backend.revoke(token_hash, expires_at)
+        with self._lock:
+            self._filter.add(token_hash)
+            if self._revoked_during_refresh is not None:
+                self._revoked_during_refresh.append(token_hash)
+
+    def is_revoked(self, token_hash: str) -> bool:
+        self._maybe_sync()
+        if token_hash not in self._filter:
+            return False
+        self.backend_lookups += 1
+        return self.backend.is_revoked(token_hash)
+
+    def active_hashes(self) -> Iterable[str]:
+        return self.backend.active_hashes()
+
+
+def create_revocation_store() -> RevocationStore:
+    if TOKEN_REVOCATION_BACKEND == "database":
+        engine = create_engine(
+            TOKEN_REVOCATION_DATABASE_URL or DATABASE_URL,
+            pool_pre_ping=True,
+            pool_size=TOKEN_REVOCATION_POOL_SIZE,
+            max_overflow=TOKEN_REVOCATION_MAX_OVERFLOW,
+        )
+        if engine.dialect.name == "sqlite":
+            # ローカル検証用のSQLiteファイルにはマイグレーションを流さないため直接作成する
+            RevokedToken.__table__.create(engine, checkfirst=True)
+        store = BloomFilteredRevocationStore(DatabaseRevocationStore(engine))
+
+        def _reset_in_child() -> None:
+            # フォークしたワーカーが親の接続を使い回さないようにする
+            engine.dispose(close=False)
+            store.reset_after_fork()
+
+        os.register_at_fork(after_in_child=_reset_in_child)
+        return store
+
+    if TOKEN_REVOCATION_BACKEND != "memory":
+        raise ValueError(
+            f"Unknown TOKEN_REVOCATION_BACKEND: {TOKEN_REVOCATION_BACKEND}"
+        )
+    return MemoryRevocationStore()
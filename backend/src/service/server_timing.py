@@ -0,0 +1,111 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from src.service.metrics import RequestDBStats
+
+# Server-Timing に出す順序（ブラウザの開発者ツールではこの順に並ぶ）
+PHASES = ("auth", "db", "orm", "serialize", "app", "middleware", "total")
+
+
+class RequestTimings:
+    """1リクエスト内の処理時間をフェーズごとに積算する"""
+
+    def __init__(self, db_stats: RequestDBStats) -> None:
+        self.db_stats = db_stats
+        self.durations: dict[str, float] = {}
+        self.endpoint_finished_at: float | None = None
+        self._orm_depth = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """ミリ秒単位の {フェーズ: 時間}（DB は db_stats から取る）"""
+        durations = {**self.durations, "db": self.db_stats.seconds}
+        return {
+            name: round(durations[name] * 1000, 2)
+            for name in PHASES
+            if name in durations
+        }
+
+    def header_value(self) -> str:
+        entries = []
+        for name, duration in self.as_dict().items():
+            entry = f"{name};dur={duration}"
+            if name == "db":
+                entry += f';desc="{self.db_stats.queries} queries"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """Server-Timing が有効なリクエストの中でだけ処理時間を積算する
+
+    中で実行されたクエリの時間は db / orm に計上されるため、ここからは差し引く
+    （各フェーズが重ならないようにする）。
+    """
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+
+    db_seconds = timings.db_stats.seconds
+    orm_seconds = timings.durations.get("orm", 0.0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = (timings.db_stats.seconds - db_seconds) + (
+            timings.durations.get("orm", 0.0) - orm_seconds
+        )
+        timings.add(name, max(elapsed - nested, 0))
+
+
+def mark_endpoint_finished() -> None:
+    timings = request_timings.get()
+    if timings is not None:
+        timings.endpoint_finished_at = time.perf_counter()
+
+
+def _do_orm_execute(orm_execute_state: ORMExecuteState):
+    timings = request_timings.get()
+    if (
+        timings is None
+        or timings._orm_depth
+        or not orm_execute_state.is_select
+        or orm_execute_state.is_relationship_load
+        or orm_execute_state.execution_options.get("yield_per")
+        or orm_execute_state.execution_options.get("stream_results")
+    ):
+        return None
+
+    # 結果を freeze して行の取得とオブジェクト生成をこの中で済ませ、
+    # 経過時間から SQL の実行時間を引いたものを ORM のハイドレーション時間とする
+    timings._orm_depth += 1
+    db_seconds = timings.db_stats.seconds
+    started = time.perf_counter()
+    try:
+        frozen = orm_execute_state.invoke_statement().freeze()
+    finally:
+        timings._orm_depth -= 1
+        elapsed = time.perf_counter() - started
+        timings.add("orm", max(elapsed - (timings.db_stats.seconds - db_seconds), 0))
+    return frozen()
+
+
+def instrument_orm() -> None:
+    """すべての Session（AsyncSession の内部のものを含む）で ORM の処理時間を計測する"""
+    if not event.contains(Session, "do_orm_execute", _do_orm_execute):
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
@@ -1,12 +1,18 @@
+import os
 import secrets
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional
 
 import jwt
 from fastapi import HTTPException
 
 from src.config.env_config import SECRET_KEY
 from src.config.logging_config import get_logger
+from src.db.tables import NotificationLevelEnum
+from src.service.cache import TTLCache
+from src.service.revocation_store import create_revocation_store, hash_token
 
 logger = get_logger(__name__)
 
@@ -15,16 +21,54 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 120  # 2 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 180  # 6 months
 CSRF_TOKEN_EXPIRE_HOURS = 24
 
-# リフレッシュトークンのブラックリスト（本番環境ではRedisなどを使用）
-blacklisted_tokens = set()
+# Trust the user snapshot embedded in access tokens instead of loading the user
+AUTH_CLAIMS_MODE = os.getenv("AUTH_CLAIMS_MODE", "false").lower() == "true"
+USER_CLAIMS_VERSION = 1
+
+# 失効させたリフレッシュトークンとセキュリティスタンプ（TOKEN_REVOCATION_BACKEND で切替）
+revocation_store = create_revocation_store()
+
+# 検証済みトークンのペイロード（キーはトークンのダイジェスト、exp まで保持）
+TOKEN_VERIFY_CACHE_MAX_SIZE = int(os.getenv("TOKEN_VERIFY_CACHE_MAX_SIZE", "10000"))
+verified_tokens = TTLCache(maxsize=TOKEN_VERIFY_CACHE_MAX_SIZE, ttl=0)
+
+
+def _decode_token(token_hash: str, token: str) -> dict:
+    # キャッシュしたペイロードは共有されるため、呼び出し側で変更しないこと
+    payload = verified_tokens.get(token_hash)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        verified_tokens.set(token_hash, payload, ttl=ttl)
+    return payload
+
+
+@dataclass(frozen=True)
+class ClaimsUser:
+    """アクセストークンの usr クレームから復元したユーザー"""
+
+    user_id: str
+    user_name: str
+    notification_level: NotificationLevelEnum
+    security_stamp: str
 
 
 class TokenService:
     @staticmethod
-    def create_access_token(user_id: str) -> str:
+    def create_access_token(user_id: str, user: Any = None) -> str:
         now = datetime.now(timezone.utc)
         expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        payload = {"sub": user_id, "type": "access", "exp": expire}
+        payload: dict[str, Any] = {"sub": user_id, "type": "access", "exp": expire}
+        if user is not None:
+            payload["usr"] = {
+                "v": USER_CLAIMS_VERSION,
+                "name": user.user_name,
+                "nl": user.notification_level.value,
+                "ss": user.security_stamp or "",
+            }
         return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
 
     @staticmethod
@@ -52,8 +96,9 @@ class TokenService:
 
     @staticmethod
     def verify_token(token: str, token_type: str = "access"):
+        token_hash = hash_token(token)
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+            payload = _decode_token(token_hash, token)
 
             if token_type == "csrf":
                 return "csrf" in payload
@@ -61,7 +106,7 @@ class TokenService:
             if payload.get("type") != token_type:
                 raise HTTPException(status_code=401, detail="Invalid token type")
 
-            if token_type == "refresh" and token in blacklisted_tokens:
+            if token_type == "refresh" and revocation_store.is_revoked(token_hash):
                 raise HTTPException(status_code=401, detail="Token has been revoked")
 
             return payload
@@ -78,9 +123,52 @@ class TokenService:
     def verify_csrf_token(token: str) -> bool:
         return TokenService.verify_token(token, "csrf")
 
+    @staticmethod
+    def verification_cache_stats() -> dict:
+        return verified_tokens.stats()
+
     @staticmethod
     def blacklist_refresh_token(token: str) -> None:
-        blacklisted_tokens.add(token)
+        # 失効情報はトークン自体の有効期限まで保持すれば十分
+        try:
+            payload = jwt.decode(
+                token, SECRET_KEY, algorithms=["HS256"], options={"verify_exp": False}
+            )
+            expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+        except (jwt.InvalidTokenError, KeyError):
+            return
+        revocation_store.revoke(hash_token(token), expires_at)
+
+    @staticmethod
+    def get_claims_user(payload: dict) -> Optional[ClaimsUser]:
+        claims = payload.get("usr")
+        if not isinstance(claims, dict) or claims.get("v") != USER_CLAIMS_VERSION:
+            return None
+        # スタンプ未発行のユーザーは失効できないため、クレームを信用しない
+        if not claims.get("ss"):
+            return None
+        try:
+            return ClaimsUser(
+                user_id=payload["sub"],
+                user_name=claims["name"],
+                notification_level=NotificationLevelEnum(claims["nl"]),
+                security_stamp=claims["ss"],
+            )
+        except (KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def revoke_security_stamp(security_stamp: str | None) -> None:
+        if security_stamp:
+            # スタンプを含むアクセストークンの有効期間だけ保持すれば十分
+            expires_at = datetime.now(timezone.utc) + timedelta(
+                minutes=ACCESS_TOKEN_EXPIRE_MINUTES
+            )
+            revocation_store.revoke(hash_token(f"stamp:{security_stamp}"), expires_at)
+
+    @staticmethod
+    def is_security_stamp_revoked(security_stamp: str) -> bool:
+        return revocation_store.is_revoked(hash_token(f"stamp:{security_stamp}"))
 
     @staticmethod
     def get_user_id_from_token(token: str, token_type: str = "access") -> Optional[str]:
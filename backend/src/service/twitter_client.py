@@ -0,0 +1,197 @@
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+
+import httpx
+from fastapi import Request
+
+from src.config.env_config import TWITTER_CLIENT_ID, TWITTER_CLIENT_SECRET
+from src.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TWITTER_TOKEN_URL = "https://api.twitter.com/2/oauth2/token"
+TWITTER_USER_ME_URL = "https://api.twitter.com/2/users/me"  # https://docs.x.com/x-api/users/user-lookup-me
+
+TWITTER_HTTP_TIMEOUT_SECONDS = float(os.getenv("TWITTER_HTTP_TIMEOUT_SECONDS", "10"))
+TWITTER_HTTP_CONNECT_TIMEOUT_SECONDS = float(
+    os.getenv("TWITTER_HTTP_CONNECT_TIMEOUT_SECONDS", "5")
+)
+TWITTER_HTTP_MAX_CONNECTIONS = int(os.getenv("TWITTER_HTTP_MAX_CONNECTIONS", "20"))
+TWITTER_HTTP_MAX_RETRIES = int(os.getenv("TWITTER_HTTP_MAX_RETRIES", "2"))
+# Retry-After がこれより長い場合は待たずに 429 を返す
+TWITTER_HTTP_MAX_BACKOFF_SECONDS = float(
+    os.getenv("TWITTER_HTTP_MAX_BACKOFF_SECONDS", "5")
+)
+# HTTP/2 を使う（h2 は httpx[http2] として依存関係に含まれる）
+TWITTER_HTTP2 = os.getenv("TWITTER_HTTP2", "true").lower() == "true"
+
+# リクエストが送信されていないことが確実で、再送しても安全な例外
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class TwitterAPIError(Exception):
+    def __init__(self, status_code: int, detail: str = "") -> None:
+        super().__init__(f"Twitter API returned {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=TWITTER_HTTP2,
+        timeout=httpx.Timeout(
+            TWITTER_HTTP_TIMEOUT_SECONDS, connect=TWITTER_HTTP_CONNECT_TIMEOUT_SECONDS
+        ),
+        limits=httpx.Limits(
+            max_connections=TWITTER_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=TWITTER_HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=60,
+        ),
+    )
+
+
+class TwitterClient:
+    """Twitter OAuth 用の HTTP クライアント（接続を使い回し、アプリ終了時に閉じる）"""
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient | None = None,
+        max_retries: int = TWITTER_HTTP_MAX_RETRIES,
+        max_backoff: float = TWITTER_HTTP_MAX_BACKOFF_SECONDS,
+    ) -> None:
+        self._http_client = http_client
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._metrics: dict[str, dict[str, float]] = defaultdict(
+            lambda: {
+                "requests": 0,
+                "errors": 0,
+                "retries": 0,
+                "rate_limited": 0,
+                "total_seconds": 0.0,
+            }
+        )
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        # SSLコンテキストの生成は重いため、最初のリクエスト時に作る
+        if self._http_client is None:
+            self._http_client = _create_http_client()
+        return self._http_client
+
+    def _record(self, endpoint: str, **increments: float) -> None:
+        with self._metrics_lock:
+            metrics = self._metrics[endpoint]
+            for key, value in increments.items():
+                metrics[key] += value
+
+    def _backoff_seconds(self, response: httpx.Response | None, attempt: int) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after is not None and retry_after.isdigit():
+                return float(retry_after)
+            reset_at = response.headers.get("x-rate-limit-reset")
+            if reset_at is not None and reset_at.isdigit():
+                return max(0.0, float(reset_at) - time.time())
+        return 0.5 * 2**attempt
+
+    async def _request(
+        self, endpoint: str, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = await self.http_client.request(method, url, **kwargs)
+            except _RETRYABLE_ERRORS as e:
+                error = e
+                self._record(
+                    endpoint,
+                    requests=1,
+                    errors=1,
+                    total_seconds=time.perf_counter() - started,
+                )
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                self._record(
+                    endpoint, requests=1, total_seconds=time.perf_counter() - started
+                )
+                if response.status_code != 429:
+                    if response.status_code >= 400:
+                        self._record(endpoint, errors=1)
+                    return response
+                self._record(endpoint, rate_limited=1)
+                if attempt >= self.max_retries:
+                    return response
+
+            delay = self._backoff_seconds(response, attempt)
+            if delay > self.max_backoff:
+                if response is None:
+                    raise error
+                return response
+
+            logger.warning(
+                "Retrying Twitter API request",
+                endpoint=endpoint,
+                attempt=attempt + 1,
+                delay_seconds=delay,
+            )
+            self._record(endpoint, retries=1)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def exchange_code(
+        self, code: str, code_verifier: str, redirect_uri: str
+    ) -> dict:
+        response = await self._request(
+            "token",
+            "POST",
+            TWITTER_TOKEN_URL,
+            data={
+                "code": code,
+                "grant_type": "authorization_code",
+                "client_id": TWITTER_CLIENT_ID,
+                "redirect_uri": redirect_uri,
+                "code_verifier": code_verifier,
+            },
+            auth=(TWITTER_CLIENT_ID, TWITTER_CLIENT_SECRET),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        if response.status_code != 200:
+            raise TwitterAPIError(response.status_code, response.text)
+        return response.json()
+
+    async def get_me(self, access_token: str) -> dict:
+        response = await self._request(
+            "users_me",
+            "GET",
+            TWITTER_USER_ME_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+            params={"user.fields": "profile_image_url,description"},
+        )
+        if response.status_code != 200:
+            raise TwitterAPIError(response.status_code, response.text)
+        return response.json()
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            return {endpoint: dict(m) for endpoint, m in self._metrics.items()}
+
+    async def aclose(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+
+def get_twitter_client(request: Request) -> TwitterClient:
+    client = getattr(request.app.state, "twitter_client", None)
+    if client is None:
+        # lifespan を経ずに起動された場合（テストクライアント等）は初回に生成する
+        client = TwitterClient()
+        request.app.state.twitter_client = client
+    return client
@@ -0,0 +1,69 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.db.tables import NotificationLevelEnum, User
+from src.service.cache import TTLCache
+
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+# 他ワーカーでの更新はTTL経過まで反映されないため短めにしておく
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """セッションに紐付かない不変のユーザー情報（UserRead と同じ属性を持つ）"""
+
+    user_id: str
+    user_name: str
+    display_name: str
+    bio: str | None
+    icon_url: str | None
+    visits_visible: bool
+    notification_level: NotificationLevelEnum
+    created_at: datetime
+    last_login_at: datetime | None
+    security_stamp: str | None = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            user_id=user.user_id,
+            user_name=user.user_name,
+            display_name=user.display_name,
+            bio=user.bio,
+            icon_url=user.icon_url,
+            visits_visible=user.visits_visible,
+            notification_level=user.notification_level,
+            created_at=user.created_at,
+            last_login_at=user.last_login_at,
+            security_stamp=user.security_stamp,
+        )
+
+
+user_id_by_name = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+snapshot_by_id = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+
+def put(snapshot: UserSnapshot) -> None:
+    user_id_by_name.set(snapshot.user_name, snapshot.user_id)
+    snapshot_by_id.set(snapshot.user_id, snapshot)
+
+
+def invalidate_user(user_id: str, *user_names: str | None) -> None:
+    snapshot_by_id.pop(user_id)
+    for user_name in user_names:
+        if user_name is not None:
+            user_id_by_name.pop(user_name)
+
+
+def clear() -> None:
+    user_id_by_name.clear()
+    snapshot_by_id.clear()
+
+
+def stats() -> dict:
+    return {
+        "user_name": user_id_by_name.stats(),
+        "user_snapshot": snapshot_by_id.stats(),
+    }
@@ -1,13 +1,19 @@
+import secrets
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Literal
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, insert, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
 from src.db.tables import Answer, AnswerLike, Message, MessageLike, ProfileItem, User
+from src.db.upsert import dialect_insert
 from src.schema.user import UserCreate
+from src.service import user_cache
 from src.service.qna_service import initialize_default_questions
+from src.service.token_service import TokenService
+from src.service.user_cache import UserSnapshot
 from src.service.yaml_loader import load_default_labels
 
 
@@ -15,6 +21,47 @@ def get_user(db: Session, user_id: str) -> User | None:
     return db.query(User).filter(User.user_id == user_id).first()
 
 
+def get_user_snapshot(db: Session, user_id: str) -> UserSnapshot | None:
+    snapshot = user_cache.snapshot_by_id.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    user = get_user(db, user_id)
+    if not user:
+        return None
+
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.put(snapshot)
+    return snapshot
+
+
+def get_user_snapshot_by_username(db: Session, user_name: str) -> UserSnapshot | None:
+    user_id = user_cache.user_id_by_name.get(user_name)
+    if user_id is not None:
+        snapshot = get_user_snapshot(db, user_id)
+        # ユーザー名が変更されていた場合はDBから引き直す
+        if snapshot is not None and snapshot.user_name == user_name:
+            return snapshot
+        user_cache.user_id_by_name.pop(user_name)
+
+    user = get_user_by_username(db, user_name)
+    if not user:
+        return None
+
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.put(snapshot)
+    return snapshot
+
+
+def get_profile_items(db: Session, user_id: str) -> list[ProfileItem]:
+    return (
+        db.query(ProfileItem)
+        .filter(ProfileItem.user_id == user_id)
+        .order_by(ProfileItem.display_order)
+        .all()
+    )
+
+
 def get_user_with_profile_items(db: Session, user_id: str) -> User | None:
     return (
         db.query(User)
@@ -52,20 +99,30 @@ def search_users_by_display_name(
     )
 
 
-def create_default_profile_items(db: Session, user_id: str) -> None:
+def create_default_profile_items(
+    db: Session, user_id: str, commit: bool = True
+) -> None:
     default_labels = load_default_labels()
-
-    for i, label in enumerate(default_labels, 1):
-        profile_item = ProfileItem(
-            profile_item_id=uuid.uuid4(),
-            user_id=user_id,
-            label=label,
-            value="",
-            display_order=i,
+    if not default_labels:
+        return
+
+    db.execute(
+        insert(ProfileItem).values(
+            [
+                {
+                    "profile_item_id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "label": label,
+                    "value": "",
+                    "display_order": i,
+                }
+                for i, label in enumerate(default_labels, 1)
+            ]
         )
-        db.add(profile_item)
+    )
 
-    db.commit()
+    if commit:
+        db.commit()
 
 
 def delete_user(db: Session, user_id: str) -> bool:
@@ -93,39 +150,106 @@ def delete_user(db: Session, user_id: str) -> bool:
     db.query(MessageLike).filter(MessageLike.user_id == user_id).delete(
         synchronize_session=False
     )
+    liked_answer_ids = db.query(AnswerLike.answer_id).filter(
+        AnswerLike.user_id == user_id
+    )
+    db.query(Answer).filter(Answer.answer_id.in_(liked_answer_ids)).update(
+        {Answer.like_count: Answer.like_count - 1}, synchronize_session=False
+    )
     db.query(AnswerLike).filter(AnswerLike.user_id == user_id).delete(
         synchronize_session=False
     )
 
     # Now delete the user (cascade will handle messages, answers, etc.)
+    user_name = db_user.user_name
+    security_stamp = db_user.security_stamp
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate_user(user_id, user_name)
+    TokenService.revoke_security_stamp(security_stamp)
     return True
 
 
-def upsert_user(db: Session, user_in: UserCreate) -> User:
-    # Initialize default questions if they don't exist
-    initialize_default_questions(db)
-
-    db_user = get_user_by_username(db, user_in.user_name)
-    is_new_user = db_user is None
-
-    if db_user:
-        update_data = user_in.model_dump(exclude_unset=True)
+def _upsert_user_row(db: Session, user_in: UserCreate) -> User:
+    now = datetime.now(timezone.utc)
+    update_fields = user_in.model_dump(exclude_unset=True).keys() - {"user_id"}
+
+    # ログイン時の取得・更新・最終ログイン時刻の記録を1文で行う
+    stmt = dialect_insert(db, User).values(
+        **user_in.model_dump(),
+        security_stamp=secrets.token_hex(16),
+        created_at=now,
+        last_login_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.user_id],
+        set_={
+            **{field: stmt.excluded[field] for field in update_fields},
+            "security_stamp": func.coalesce(
+                User.security_stamp, stmt.excluded.security_stamp
+            ),
+            "last_login_at": stmt.excluded.last_login_at,
+        },
+    ).returning(User)
+    return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+
+def _release_user_name(db: Session, user_in: UserCreate) -> str | None:
+    """別のユーザーが持っている user_name を外し、そのユーザーの ID を返す
+
+    Twitter のユーザー名は手放されると別のアカウントが取得できるため、ログインした
+    アカウントを正とし、古い持ち主はユーザー名として使えない "~<user_id>" に置き換える
+    （次回ログイン時に現在のユーザー名で上書きされる）。
+    """
+    holder = (
+        db.query(User)
+        .filter(User.user_name == user_in.user_name, User.user_id != user_in.user_id)
+        .first()
+    )
+    if not holder:
+        return None
+    holder.user_name = f"~{holder.user_id}"
+    db.flush()
+    return holder.user_id
 
-        for key, value in update_data.items():
-            setattr(db_user, key, value)
-    else:
-        db_user = User(**user_in.model_dump())
 
-    db.add(db_user)
+def upsert_user(db: Session, user_in: UserCreate) -> User:
+    released_from = None
+    try:
+        db_user = _upsert_user_row(db, user_in)
+    except IntegrityError:
+        # user_id 以外の一意制約（user_name）に当たった場合のみ、名前を外してやり直す
+        db.rollback()
+        released_from = _release_user_name(db, user_in)
+        if released_from is None:
+            raise
+        db_user = _upsert_user_row(db, user_in)
+
+    # 新規作成時のみ created_at と last_login_at が同じ値になる
+    if db_user.created_at == db_user.last_login_at:
+        initialize_default_questions(db, commit=False)
+        create_default_profile_items(db, db_user.user_id, commit=False)
+
+    # コミットで属性が失効する前に、書き込んだ内容をキャッシュへ入れておく
+    snapshot = UserSnapshot.from_user(db_user)
     db.commit()
-    db.refresh(db_user)
+    if released_from is not None:
+        user_cache.invalidate_user(released_from, user_in.user_name)
+    user_cache.put(snapshot)
+    return db_user
 
-    if is_new_user:
-        create_default_profile_items(db, db_user.user_id)
 
-    return db_user
+def rotate_security_stamp(db: Session, user_id: str) -> bool:
+    db_user = get_user(db, user_id)
+    if not db_user:
+        return False
+
+    old_stamp = db_user.security_stamp
+    db_user.security_stamp = secrets.token_hex(16)
+    db.commit()
+    user_cache.invalidate_user(user_id, db_user.user_name)
+    TokenService.revoke_security_stamp(old_stamp)
+    return True
 
 
 def update_last_login(db: Session, user_id: str) -> None:
@@ -133,6 +257,7 @@ def update_last_login(db: Session, user_id: str) -> None:
     if db_user:
         db_user.last_login_at = datetime.now(timezone.utc)
         db.commit()
+        user_cache.invalidate_user(user_id)
 
 
 def _get_activity_based_users(
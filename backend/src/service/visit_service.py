@@ -4,6 +4,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from src.db.tables import User, Visit
+from src.service import user_cache
 
 
 def record_visit(
@@ -104,6 +105,7 @@ def update_visits_visibility(db: Session, user_id: str, visible: bool) -> bool:
 
     user.visits_visible = visible
     db.commit()
+    user_cache.invalidate_user(user_id)
     return True
 
 
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
 
 import yaml
@@ -91,15 +92,21 @@ def get_yaml_loader() -> YamlTemplateLoader:
 
 
 def load_default_labels() -> list[str]:
+    # 呼び出し側で変更されても共有の内容が変わらないようコピーを返す
+    return list(_read_default_labels())
+
+
+@cache
+def _read_default_labels() -> tuple[str, ...]:
     current_dir = Path(__file__).parent.parent
     config_file = current_dir / "config" / "default_labels.yaml"
 
     try:
         with open(config_file, "r", encoding="utf-8") as file:
             data = yaml.safe_load(file)
-            return data.get("profile_labels", [])
+            return tuple(data.get("profile_labels", []))
     except Exception:
-        return [
+        return (
             "自己紹介",
             "趣味・今ハマっていること",
             "好きなコンテンツ",
@@ -109,4 +116,4 @@ def load_default_labels() -> list[str]:
             "子供の頃の夢",
             "座右の銘",
             "もし１つだけ願いが叶うなら？",
-        ]
+        )
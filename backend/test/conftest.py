@@ -1,31 +1,54 @@
+import asyncio
+import logging
 import os
 import tempfile
+import time
 import uuid
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
-from src.db.session import get_db
+from src.db.session import get_async_db, get_async_read_db, get_db, get_read_db
 from src.db.tables import Answer, Base, ProfileItem, Question, User
 from src.main import app
+from src.service import user_cache
 from src.service.config_manager import ConfigManager
+from src.service.metrics import instrument_engine
 from src.service.token_service import TokenService
+from test.helpers.query_recorder import QueryRecorder
 
 
 @pytest.fixture(scope="session")
-def test_db_engine():
-    # テスト用インメモリSQLiteでPostgreSQLの振る舞いをエミュレート
+def test_db_path() -> Generator[Path, None, None]:
+    # 同期・非同期の両エンジンから同じデータを参照できるよう、一時ファイルのSQLiteを使う
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield Path(tmp_dir) / "test.db"
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    # テスト用途のため耐久性よりも速度を優先する
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.close()
+
+
+@pytest.fixture(scope="session")
+def test_db_engine(test_db_path):
+    # テスト用SQLiteでPostgreSQLの振る舞いをエミュレート
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{test_db_path}",
         echo=False,
         connect_args={"check_same_thread": False},
-        # PostgreSQLとの互換性を高めるためのPRAGMA設定
-        poolclass=None,
     )
+    event.listen(engine, "connect", _configure_sqlite)
+    instrument_engine(engine, "sync")
 
     Base.metadata.create_all(engine)
 
@@ -34,27 +57,68 @@ def test_db_engine():
     engine.dispose()
 
 
+@pytest.fixture(scope="session")
+def test_async_engine(test_db_engine, test_db_path):
+    # テストごとにイベントループが変わるため、接続はプールせず都度開く
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{test_db_path}", echo=False, poolclass=NullPool
+    )
+    instrument_engine(engine.sync_engine, "async")
+
+    yield engine
+
+    asyncio.run(engine.dispose())
+
+
 @pytest.fixture(scope="function")
 def test_db_session(test_db_engine) -> Generator[Session, None, None]:
     TestingSessionLocal = sessionmaker(
         autocommit=False, autoflush=False, bind=test_db_engine
     )
 
-    # トランザクションベースのテストセッション
-    connection = test_db_engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    session = TestingSessionLocal()
 
     try:
         yield session
     finally:
         session.close()
-        transaction.rollback()
-        connection.close()
+        # 非同期エンジンからのコミットも含めて消すため、ロールバックではなく全行削除する
+        with test_db_engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture(scope="function")
+def async_session_factory(test_db_session, test_async_engine):
+    return async_sessionmaker(
+        bind=test_async_engine, autoflush=False, expire_on_commit=False
+    )
 
 
 @pytest.fixture(scope="function")
-def client(test_db_session) -> Generator[TestClient, None, None]:
+def run_async_db(async_session_factory):
+    # 非同期サービス関数を新しいイベントループ上で AsyncSession とともに実行する
+    def _run(func, *args, **kwargs):
+        async def _call():
+            async with async_session_factory() as db:
+                return await func(db, *args, **kwargs)
+
+        return asyncio.run(_call())
+
+    return _run
+
+
+@pytest.fixture
+def query_recorder(test_db_engine, test_async_engine):
+    # with query_recorder() as queries: ... で同期・非同期の両エンジンの文を記録する
+    def _record() -> QueryRecorder:
+        return QueryRecorder(test_db_engine, test_async_engine.sync_engine)
+
+    return _record
+
+
+@pytest.fixture(scope="function")
+def client(test_db_session, async_session_factory) -> Generator[TestClient, None, None]:
     # router テストでは実際のAPIエンドポイントをテストするため、
     # 環境変数を事前に設定してからアプリをインポートする
 
@@ -78,7 +142,15 @@ def client(test_db_session) -> Generator[TestClient, None, None]:
         finally:
             pass
 
+    async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
+        async with async_session_factory() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # レプリカへの振り分けは test/unit/db/test_routing.py で検証する
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
 
     with TestClient(app) as test_client:
         yield test_client
@@ -233,6 +305,67 @@ def clean_environment():
     os.environ.update(original_env)
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    # テストごとにDBをロールバックするため、ユーザーキャッシュも毎回空にする
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+# イベントループを塞いだとみなす1コールバックあたりの実行時間（初回のみ通るコードの
+# CPU 時間で誤検出しないよう、注入する DB の遅延はこの2倍にしている）
+LOOP_BLOCK_THRESHOLD_SECONDS = 0.08
+
+
+class LoopBlockingDetector(logging.Handler):
+    """asyncio のデバッグモードが出す低速コールバックの警告を記録する"""
+
+    def __init__(self, portal) -> None:
+        super().__init__(level=logging.WARNING)
+        self.portal = portal
+        self._blocked_calls: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if str(record.msg).startswith("Executing"):
+            self._blocked_calls.append(record.getMessage())
+
+    @property
+    def blocked_calls(self) -> list[str]:
+        # 警告はコールバックの終了後に出るため、ループを一周させてから読む
+        self.portal.call(asyncio.sleep, 0)
+        return list(self._blocked_calls)
+
+
+@pytest.fixture
+def loop_blocking_detector(client, test_db_engine):
+    # イベントループのスレッドから実行されたDB呼び出しにだけ閾値を超える遅延を入れ、
+    # 実DBでのI/O待ちと同様に検出されるようにする（スレッドプール上の実行は対象外）
+    def slow_cursor_execute(*args):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        time.sleep(LOOP_BLOCK_THRESHOLD_SECONDS * 2)
+
+    async def enable_debug(enabled: bool) -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(enabled)
+        loop.slow_callback_duration = LOOP_BLOCK_THRESHOLD_SECONDS
+
+    detector = LoopBlockingDetector(client.portal)
+    asyncio_logger = logging.getLogger("asyncio")
+    asyncio_logger.addHandler(detector)
+    event.listen(test_db_engine, "before_cursor_execute", slow_cursor_execute)
+    client.portal.call(enable_debug, True)
+    try:
+        yield detector
+    finally:
+        client.portal.call(enable_debug, False)
+        event.remove(test_db_engine, "before_cursor_execute", slow_cursor_execute)
+        asyncio_logger.removeHandler(detector)
+
+
 @pytest.fixture
 def config_manager():
     return ConfigManager()
@@ -0,0 +1,96 @@
+"""テスト用のSQLクエリ記録・N+1検出ヘルパー"""
+
+import traceback
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.db.slow_query import find_call_site, normalize_statement
+
+
+def _fallback_call_site(frames) -> str:
+    # src 外（レスポンスのシリアライズ等）で発生した遅延ロードは、その呼び出し元を示す
+    lazy = any("sqlalchemy/orm/strategies.py" in f.filename for f in frames)
+    for frame in reversed(frames):
+        if "sqlalchemy" in frame.filename or frame.filename == __file__:
+            continue
+        site = f"{Path(frame.filename).name}:{frame.lineno} in {frame.name}"
+        return f"lazy load from {site}" if lazy else site
+    return "<unknown>"
+
+
+def _call_site() -> str:
+    return find_call_site() or _fallback_call_site(traceback.extract_stack())
+
+
+@dataclass
+class RecordedQuery:
+    statement: str
+    shape: str
+    call_site: str
+
+
+class QueryRecorder:
+    """with ブロック内で実行されたSQLを記録する
+
+    with QueryRecorder(engine) as queries:
+        client.get("/messages")
+    queries.assert_budget(5)
+    """
+
+    def __init__(self, *engines: Engine) -> None:
+        self.engines = engines
+        self.queries: list[RecordedQuery] = []
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.queries.append(
+            RecordedQuery(statement, normalize_statement(statement), _call_site())
+        )
+
+    def __enter__(self) -> "QueryRecorder":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def repeated_shapes(self, threshold: int = 3) -> dict[str, list[RecordedQuery]]:
+        """同じ形の文が threshold 回以上実行されたもの（N+1 の疑い）"""
+        by_shape: dict[str, list[RecordedQuery]] = defaultdict(list)
+        for query in self.queries:
+            by_shape[query.shape].append(query)
+        return {
+            shape: queries
+            for shape, queries in by_shape.items()
+            if len(queries) >= threshold
+        }
+
+    def report(self, threshold: int = 3) -> str:
+        lines = [f"{self.count} queries executed:"]
+        lines.extend(f"  [{q.call_site}] {q.shape[:160]}" for q in self.queries)
+        for shape, queries in self.repeated_shapes(threshold).items():
+            call_sites = sorted({q.call_site for q in queries})
+            lines.append(f"N+1 suspect ({len(queries)}x): {shape[:160]}")
+            lines.extend(f"    from {call_site}" for call_site in call_sites)
+        return "\n".join(lines)
+
+    def assert_no_n_plus_one(self, threshold: int = 3) -> None:
+        assert not self.repeated_shapes(threshold), self.report(threshold)
+
+    def assert_budget(self, max_queries: int, n_plus_one_threshold: int = 3) -> None:
+        assert self.count <= max_queries, (
+            f"query budget exceeded ({self.count} > {max_queries})\n"
+            + self.report(n_plus_one_threshold)
+        )
+        self.assert_no_n_plus_one(n_plus_one_threshold)
@@ -1,11 +1,19 @@
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 from urllib.parse import parse_qs, urlparse
 
+import httpx
 import pytest
 from fastapi import status
 
 from src.main import app
 from src.router.auth import _get_current_user
+from src.service import user_service
+from src.service.token_service import TokenService
+from src.service.twitter_client import (
+    TWITTER_TOKEN_URL,
+    TwitterClient,
+    get_twitter_client,
+)
 
 
 @pytest.mark.integration
@@ -31,50 +39,106 @@ class TestAuthRouter:
         assert "code_challenge" in query_params
         assert "code_challenge_method" in query_params
 
-    @patch("src.router.auth.httpx.AsyncClient.post")
-    @patch("src.router.auth.httpx.AsyncClient.get")
-    def test_twitter_callback_success(self, mock_get, mock_post, client):
-        mock_post.return_value = Mock(
-            status_code=200,
-            json=lambda: {
-                "access_token": "twitter_access_token",
-                "token_type": "bearer",
-                "scope": "users.read",
-            },
+    @staticmethod
+    def _login_with_stub_twitter(client, handler):
+        twitter_client = TwitterClient(
+            httpx.AsyncClient(transport=httpx.MockTransport(handler)), max_backoff=0
         )
+        app.dependency_overrides[get_twitter_client] = lambda: twitter_client
+        try:
+            with client as c:
+                # First, initiate login to set up session state
+                login_response = c.get("/auth/login/twitter", follow_redirects=False)
+
+                assert login_response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+
+                # Extract state from login redirect URL for callback
+                redirect_url = login_response.headers["location"]
+
+                parsed_url = urlparse(redirect_url)
+                query_params = parse_qs(parsed_url.query)
+                state = query_params["state"][0]
+
+                return c.get(
+                    f"/auth/callback/twitter?code=auth_code&state={state}",
+                    follow_redirects=False,
+                )
+        finally:
+            app.dependency_overrides.pop(get_twitter_client, None)
+
+    def test_twitter_callback_success(self, client):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url == TWITTER_TOKEN_URL:
+                return httpx.Response(
+                    200,
+                    json={
+                        "access_token": "twitter_access_token",
+                        "token_type": "bearer",
+                        "scope": "users.read",
+                    },
+                )
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "id": "1234567890",
+                        "name": "Test User",
+                        "username": "testuser",
+                        "profile_image_url": "https://example.com/avatar.jpg",
+                    }
+                },
+            )
+
+        callback_response = self._login_with_stub_twitter(client, handler)
+
+        assert callback_response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+        assert "localhost:5173" in callback_response.headers["location"]
+
+    def test_twitter_callback_takes_over_released_user_name(
+        self, client, test_db_session, create_user
+    ):
+        # Twitter 上で手放されたユーザー名を、別のアカウントがログインして使う
+        create_user(user_id="old_account", user_name="testuser")
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url == TWITTER_TOKEN_URL:
+                return httpx.Response(200, json={"access_token": "token"})
+            return httpx.Response(
+                200,
+                json={
+                    "data": {"id": "1234567890", "name": "New", "username": "testuser"}
+                },
+            )
 
-        mock_get.return_value = Mock(
-            status_code=200,
-            json=lambda: {
-                "data": {
-                    "id": "1234567890",
-                    "name": "Test User",
-                    "username": "testuser",
-                    "profile_image_url": "https://example.com/avatar.jpg",
-                }
-            },
+        callback_response = self._login_with_stub_twitter(client, handler)
+
+        assert callback_response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+        assert callback_response.headers["location"].endswith("/testuser")
+        test_db_session.expire_all()
+        assert (
+            user_service.get_user(test_db_session, "1234567890").user_name == "testuser"
+        )
+        assert user_service.get_user(test_db_session, "old_account").user_name == (
+            "~old_account"
         )
 
-        with client as c:
-            # First, initiate login to set up session state
-            login_response = c.get("/auth/login/twitter", follow_redirects=False)
+    def test_twitter_callback_rate_limited(self, client):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url == TWITTER_TOKEN_URL:
+                return httpx.Response(200, json={"access_token": "token"})
+            return httpx.Response(429, headers={"Retry-After": "900"})
 
-            assert login_response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+        callback_response = self._login_with_stub_twitter(client, handler)
 
-            # Extract state from login redirect URL for callback
-            redirect_url = login_response.headers["location"]
+        assert callback_response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
 
-            parsed_url = urlparse(redirect_url)
-            query_params = parse_qs(parsed_url.query)
-            state = query_params["state"][0]
+    def test_twitter_callback_twitter_unreachable(self, client):
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("connection refused", request=request)
 
-            callback_response = c.get(
-                f"/auth/callback/twitter?code=auth_code&state={state}",
-                follow_redirects=False,
-            )
+        callback_response = self._login_with_stub_twitter(client, handler)
 
-            assert callback_response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
-            assert "localhost:5173" in callback_response.headers["location"]
+        assert callback_response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
 
     def test_twitter_callback_missing_code(self, client):
         response = client.get("/auth/callback/twitter?state=some_state")
@@ -157,3 +221,69 @@ class TestAuthRouter:
 
         # 少なくとも1つは成功している（制限がかからない可能性もあるのでテストは緩く）
         assert len(success_responses) >= 1
+
+    @patch("src.router.auth.AUTH_CLAIMS_MODE", True)
+    def test_claims_mode_skips_user_lookup(self, client, create_user):
+        user = create_user(user_id="claims_user", user_name="claimsuser")
+        client.cookies.set(
+            "access_token", TokenService.create_access_token(user.user_id, user)
+        )
+
+        with patch(
+            "src.router.auth.user_service.get_user_snapshot"
+        ) as mock_get_snapshot:
+            response = client.get(f"/is-blocked/{user.user_id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_get_snapshot.assert_not_called()
+
+    @pytest.mark.parametrize("claims_mode", [True, False])
+    def test_rotated_security_stamp_revokes_access_token(
+        self, client, test_db_session, create_user, claims_mode
+    ):
+        user = create_user(user_id="stamp_user", user_name="stampuser")
+        client.cookies.set(
+            "access_token", TokenService.create_access_token(user.user_id, user)
+        )
+
+        user_service.rotate_security_stamp(test_db_session, user.user_id)
+        with patch("src.router.auth.AUTH_CLAIMS_MODE", claims_mode):
+            response = client.get(f"/is-blocked/{user.user_id}")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["detail"] == "Token has been revoked"
+
+    def test_access_token_without_claims_uses_user_lookup(self, client, create_user):
+        user = create_user(user_id="legacy_user", user_name="legacyuser")
+        client.cookies.set(
+            "access_token", TokenService.create_access_token(user.user_id)
+        )
+
+        with patch("src.router.auth.AUTH_CLAIMS_MODE", True):
+            response = client.get("/auth/me")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["userName"] == "legacyuser"
+
+    def test_optional_auth_uses_verification_cache(self, client, create_user):
+        user = create_user(user_id="optional_user", user_name="optionaluser")
+        client.cookies.set(
+            "access_token", TokenService.create_access_token(user.user_id, user)
+        )
+
+        before = TokenService.verification_cache_stats()
+        for _ in range(2):
+            response = client.get("/by-username/optionaluser/qna")
+            assert response.status_code == status.HTTP_200_OK
+        stats = TokenService.verification_cache_stats()
+
+        assert stats["misses"] == before["misses"] + 1
+        assert stats["hits"] == before["hits"] + 1
+
+    def test_optional_auth_treats_invalid_token_as_anonymous(self, client, create_user):
+        create_user(user_id="public_user", user_name="publicuser")
+        client.cookies.set("access_token", "not-a-jwt")
+
+        response = client.get("/by-username/publicuser/qna")
+
+        assert response.status_code == status.HTTP_200_OK
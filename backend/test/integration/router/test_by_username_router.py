@@ -1,5 +1,15 @@
+from unittest.mock import patch
+from uuid import uuid4
+
 import pytest
 from fastapi import status
+from sqlalchemy.orm import Session
+
+from src.db.session import get_read_db
+from src.db.tables import Message, MessageTypeEnum
+from src.main import app
+from src.router.auth import get_current_user_optional
+from src.service import message_service, qna_service
 
 
 @pytest.mark.integration
@@ -93,6 +103,26 @@ class TestByUsernameRouter:
         assert isinstance(response_data["userAnswerGroups"], list)
         assert isinstance(response_data["categories"], dict)
 
+    def test_read_qna_by_username_includes_like_states(
+        self, client, test_db_session, create_user, create_question, create_answer
+    ):
+        owner = create_user(user_id="qna_owner", user_name="qnaowner")
+        viewer = create_user(user_id="qna_viewer", user_name="qnaviewer")
+        question = create_question(text="Test question", category_id="personality")
+        answer = create_answer(owner.user_id, question.question_id, "Test answer")
+        qna_service.set_answer_like(
+            test_db_session, viewer.user_id, answer.answer_id, True
+        )
+
+        app.dependency_overrides[get_current_user_optional] = lambda: viewer
+        response = client.get("/by-username/qnaowner/qna")
+        app.dependency_overrides.pop(get_current_user_optional)
+
+        assert response.status_code == status.HTTP_200_OK
+        qa = response.json()["userAnswerGroups"][0]["answers"][0]
+        assert qa["likeCount"] == 1
+        assert qa["userLiked"] is True
+
     def test_read_qna_by_username_user_not_found(self, client):
         response = client.get("/by-username/nonexistentuser/qna")
 
@@ -149,3 +179,121 @@ class TestByUsernameRouter:
 
         assert isinstance(response_data, list)
         assert len(response_data) == 0
+
+    def test_read_page_by_username_all_sections(
+        self,
+        client,
+        test_db_session,
+        create_user,
+        create_profile_item,
+        create_question,
+        create_answer,
+    ):
+        user = create_user(
+            user_id="page_user", user_name="pageuser", display_name="Page User"
+        )
+        sender = create_user(user_id="page_sender", user_name="pagesender")
+        create_profile_item(user.user_id, "Test Label", "Test Value", 1)
+        question = create_question(text="Test question", category_id="personality")
+        create_answer(user.user_id, question.question_id, "Test answer")
+        test_db_session.add(
+            Message(
+                message_id=str(uuid4()),
+                from_user_id=sender.user_id,
+                to_user_id=user.user_id,
+                message_type=MessageTypeEnum.comment,
+                content="Hello",
+            )
+        )
+        test_db_session.commit()
+
+        response = client.get("/by-username/pageuser/page")
+
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        assert response_data["profile"]["userName"] == "pageuser"
+        assert response_data["profileItems"][0]["label"] == "Test Label"
+        assert response_data["userAnswerGroups"][0]["templateId"] == "personality"
+        assert "personality" in response_data["categories"]
+        assert response_data["messages"][0]["content"] == "Hello"
+
+    def _add_thread(self, test_db_session, owner_id, sender_id):
+        root = Message(
+            message_id=str(uuid4()),
+            from_user_id=sender_id,
+            to_user_id=owner_id,
+            message_type=MessageTypeEnum.comment,
+            content="Hello",
+        )
+        reply = Message(
+            message_id=str(uuid4()),
+            from_user_id=owner_id,
+            to_user_id=sender_id,
+            message_type=MessageTypeEnum.comment,
+            content="Reply",
+            parent_message_id=root.message_id,
+        )
+        test_db_session.add_all([root, reply])
+        test_db_session.commit()
+
+    def test_read_page_messages_match_messages_endpoint(
+        self, client, test_db_session, create_user
+    ):
+        user = create_user(user_id="page_user", user_name="pageuser")
+        sender = create_user(user_id="page_sender", user_name="pagesender")
+        self._add_thread(test_db_session, user.user_id, sender.user_id)
+
+        page = client.get("/by-username/pageuser/page?sections=messages")
+        messages = client.get("/by-username/pageuser/messages")
+
+        assert page.status_code == status.HTTP_200_OK
+        assert page.json()["messages"] == messages.json()
+        assert page.json()["messages"][0]["replies"][0]["content"] == "Reply"
+
+    def test_read_page_messages_come_from_primary(
+        self, client, test_db_session, test_db_engine, create_user
+    ):
+        user = create_user(user_id="page_user", user_name="pageuser")
+        sender = create_user(user_id="page_sender", user_name="pagesender")
+        self._add_thread(test_db_session, user.user_id, sender.user_id)
+        read_session = Session(bind=test_db_engine)
+        app.dependency_overrides[get_read_db] = lambda: read_session
+
+        try:
+            with patch.object(
+                message_service,
+                "get_messages_for_user",
+                wraps=message_service.get_messages_for_user,
+            ) as get_messages:
+                response = client.get("/by-username/pageuser/page")
+        finally:
+            read_session.close()
+
+        assert response.status_code == status.HTTP_200_OK
+        # /messages と同じくプライマリ（get_db）のセッションで読み込む
+        assert get_messages.call_args.args[0] is test_db_session
+
+    def test_read_page_by_username_selected_sections(self, client, create_user):
+        create_user(user_id="page_user", user_name="pageuser")
+
+        response = client.get("/by-username/pageuser/page?sections=qna")
+
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        assert response_data["profile"]["userId"] == "page_user"
+        assert response_data["userAnswerGroups"] == []
+        assert response_data["profileItems"] is None
+        assert response_data["messages"] is None
+
+    def test_read_page_by_username_invalid_section(self, client, create_user):
+        create_user(user_id="page_user", user_name="pageuser")
+
+        response = client.get("/by-username/pageuser/page?sections=unknown")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_read_page_by_username_user_not_found(self, client):
+        response = client.get("/by-username/nonexistentuser/page")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"] == "User not found"
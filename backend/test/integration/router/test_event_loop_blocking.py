@@ -0,0 +1,111 @@
+import time
+
+import httpx
+import pytest
+from fastapi import status
+
+from src.config.limiter import limiter
+from src.main import app
+from src.service.token_service import TokenService
+from src.service.twitter_client import (
+    TWITTER_TOKEN_URL,
+    TwitterClient,
+    get_twitter_client,
+)
+
+
+@pytest.mark.integration
+class TestEventLoopBlocking:
+    @pytest.fixture(autouse=True)
+    def reset_limiter(self):
+        limiter.reset()
+
+    def _login(self, client, user):
+        client.cookies.set(
+            "access_token", TokenService.create_access_token(user.user_id, user)
+        )
+
+    def test_detector_flags_blocking_calls(self, client, loop_blocking_detector):
+        async def blocking():
+            time.sleep(0.1)
+
+        client.portal.call(blocking)
+
+        assert len(loop_blocking_detector.blocked_calls) == 1
+
+    def test_block_endpoints_do_not_block_loop(
+        self, client, csrf_headers, create_user, loop_blocking_detector
+    ):
+        blocker = create_user(user_id="loop_blocker", user_name="loopblocker")
+        blocked = create_user(user_id="loop_blocked", user_name="loopblocked")
+        self._login(client, blocker)
+
+        responses = [
+            client.post(
+                "/block",
+                json={"blocked_user_id": blocked.user_id},
+                headers=csrf_headers,
+            ),
+            client.get(f"/is-blocked/{blocked.user_id}"),
+            client.delete(f"/block/{blocked.user_id}", headers=csrf_headers),
+            client.post(
+                "/report",
+                json={
+                    "reported_user_id": blocked.user_id,
+                    "report_type": "spam",
+                    "description": "spam",
+                },
+                headers=csrf_headers,
+            ),
+        ]
+
+        assert [r.status_code for r in responses] == [
+            status.HTTP_200_OK,
+            status.HTTP_200_OK,
+            status.HTTP_204_NO_CONTENT,
+            status.HTTP_200_OK,
+        ]
+        assert loop_blocking_detector.blocked_calls == []
+
+    def test_refresh_and_logout_do_not_block_loop(
+        self, client, csrf_headers, create_user, loop_blocking_detector
+    ):
+        user = create_user(user_id="loop_refresh", user_name="looprefresh")
+        client.cookies.set(
+            "refresh_token", TokenService.create_refresh_token(user.user_id)
+        )
+
+        refresh_response = client.post("/auth/refresh-token", headers=csrf_headers)
+        logout_response = client.post("/auth/logout", headers=csrf_headers)
+
+        assert refresh_response.status_code == status.HTTP_200_OK
+        assert logout_response.status_code == status.HTTP_200_OK
+        assert loop_blocking_detector.blocked_calls == []
+
+    def test_twitter_callback_does_not_block_loop(self, client, loop_blocking_detector):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url == TWITTER_TOKEN_URL:
+                return httpx.Response(200, json={"access_token": "token"})
+            return httpx.Response(
+                200,
+                json={
+                    "data": {"id": "loop_login", "name": "L", "username": "looplogin"}
+                },
+            )
+
+        twitter_client = TwitterClient(
+            httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        app.dependency_overrides[get_twitter_client] = lambda: twitter_client
+        try:
+            login_response = client.get("/auth/login/twitter", follow_redirects=False)
+            state = httpx.URL(login_response.headers["location"]).params["state"]
+            callback_response = client.get(
+                f"/auth/callback/twitter?code=auth_code&state={state}",
+                follow_redirects=False,
+            )
+        finally:
+            app.dependency_overrides.pop(get_twitter_client, None)
+
+        assert callback_response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+        assert loop_blocking_detector.blocked_calls == []
@@ -0,0 +1,97 @@
+import tracemalloc
+
+import pytest
+from fastapi import status
+
+TOKEN = "admin_secret"
+HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+
+# 比較で確実に検出できるよう、テスト中に意図的に確保して保持する
+_retained: list[bytes] = []
+
+
+def allocate_retained_buffers():
+    _retained.extend(bytes(1024) for _ in range(2000))
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr("src.router.memory_router.ADMIN_TOKEN", TOKEN)
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _retained.clear()
+
+
+@pytest.mark.integration
+class TestMemoryRouter:
+    def test_disabled_without_admin_token(self, client):
+        response = client.post("/debug/memory/snapshots", headers=HEADERS)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_rejects_wrong_token(self, client, admin_token):
+        response = client.post(
+            "/debug/memory/snapshots", headers={"Authorization": "Bearer guess"}
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_snapshot_and_diff_show_new_allocations(self, client, admin_token):
+        base = client.post("/debug/memory/snapshots", headers=HEADERS)
+        assert base.status_code == status.HTTP_200_OK
+        base_body = base.json()
+        assert base_body["memory"]["tracing"] is True
+
+        allocate_retained_buffers()
+        response = client.get(
+            "/debug/memory/diff",
+            params={"base": base_body["snapshotId"], "limit": 5},
+            headers=HEADERS,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        diff = response.json()
+        assert diff["targetSnapshotId"] == base_body["snapshotId"] + 1
+        assert diff["sizeDiffKib"] >= 2000
+        top = diff["top"][0]
+        assert top["frames"][0].endswith(
+            f"test_memory_router.py:{allocate_retained_buffers.__code__.co_firstlineno + 1}"
+        )
+        assert top["sizeDiffKib"] >= 2000
+        assert top["countDiff"] >= 2000
+
+        stored = client.get(
+            f"/debug/memory/snapshots/{diff['targetSnapshotId']}",
+            params={"group_by": "filename", "limit": 3},
+            headers=HEADERS,
+        )
+        assert stored.status_code == status.HTTP_200_OK
+        assert len(stored.json()["top"]) == 3
+
+    def test_unknown_snapshot_returns_404(self, client, admin_token):
+        response = client.get("/debug/memory/diff?base=999999", headers=HEADERS)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_counts_live_orm_instances(
+        self, client, admin_token, create_user, test_db_session
+    ):
+        users = [
+            create_user(user_id=f"mem_user_{i}", user_name=f"memuser{i}")
+            for i in range(3)
+        ]
+
+        response = client.get("/debug/memory/orm-instances", headers=HEADERS)
+
+        assert response.status_code == status.HTTP_200_OK
+        counts = {item["className"]: item["count"] for item in response.json()}
+        assert counts["User"] >= len(users)
+
+    def test_stop_tracing(self, client, admin_token):
+        client.post("/debug/memory/snapshots", headers=HEADERS)
+
+        response = client.delete("/debug/memory/tracing", headers=HEADERS)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not tracemalloc.is_tracing()
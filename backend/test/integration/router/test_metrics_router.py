@@ -0,0 +1,67 @@
+import pytest
+from fastapi import status
+
+from src.service import metrics
+
+METRICS_HEADERS = {"Authorization": "Bearer secret"}
+
+
+@pytest.mark.integration
+class TestMetricsRouter:
+    @pytest.fixture(autouse=True)
+    def metrics_token(self, monkeypatch):
+        monkeypatch.setattr("src.router.metrics_router.METRICS_TOKEN", "secret")
+
+    def test_metrics_exposes_route_latency_and_db_queries(self, client, create_user):
+        metrics.reset()
+        create_user(user_id="metrics_user", user_name="metricsuser")
+
+        assert client.get("/by-username/metricsuser").status_code == status.HTTP_200_OK
+        response = client.get("/metrics", headers=METRICS_HEADERS)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/by-username/{user_name}"} 1'
+            in body
+        )
+        assert (
+            'http_requests_total{method="GET",route="/by-username/{user_name}",status="200"} 1'
+            in body
+        )
+        assert 'http_request_db_queries_sum{route="/by-username/{user_name}"} 1' in body
+        assert "threadpool_queue_depth" in body
+        assert 'cache_hit_ratio{cache="token_verification"}' in body
+
+    def test_unmatched_routes_share_one_label(self, client):
+        metrics.reset()
+
+        client.get("/no/such/path/1")
+        client.get("/no/such/path/2")
+
+        assert (
+            'http_requests_total{method="GET",route="unmatched",status="404"} 2'
+            in client.get("/metrics", headers=METRICS_HEADERS).text
+        )
+
+    def test_metrics_token_required(self, client):
+        assert client.get("/metrics").status_code == status.HTTP_401_UNAUTHORIZED
+        assert (
+            client.get(
+                "/metrics", headers={"Authorization": "Bearer wrong"}
+            ).status_code
+            == status.HTTP_401_UNAUTHORIZED
+        )
+        assert (
+            client.get("/metrics", headers=METRICS_HEADERS).status_code
+            == status.HTTP_200_OK
+        )
+
+    def test_disabled_without_metrics_token(self, client, monkeypatch):
+        monkeypatch.setattr("src.router.metrics_router.METRICS_TOKEN", None)
+
+        assert (
+            client.get("/metrics", headers=METRICS_HEADERS).status_code
+            == status.HTTP_404_NOT_FOUND
+        )
@@ -1,6 +1,9 @@
 import pytest
 from fastapi import status
 
+from src.main import app
+from src.router.auth import _get_current_user
+
 # Answer クラスのimportは不要（create_answerヘルパーを使用）
 
 
@@ -167,3 +170,191 @@ class TestQnARouter:
             status.HTTP_422_UNPROCESSABLE_ENTITY,
             status.HTTP_200_OK,
         ]
+
+    def test_bulk_upsert_answers_success(
+        self, client, create_user, create_question, create_answer, csrf_headers
+    ):
+        user = create_user(user_id="bulk_answer_user", user_name="bulkansweruser")
+        question1 = create_question(text="一括質問1", category_id="personality")
+        question2 = create_question(
+            text="一括質問2", category_id="personality", display_order=2
+        )
+        create_answer(user.user_id, question1.question_id, "古い回答")
+
+        app.dependency_overrides[_get_current_user] = lambda: user
+        response = client.put(
+            f"/users/{user.user_id}/categories/personality/answers",
+            json={
+                "answers": [
+                    {"question_id": question1.question_id, "answer_text": "回答1"},
+                    {"question_id": question2.question_id, "answer_text": "回答2"},
+                ]
+            },
+            headers=csrf_headers,
+        )
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        assert response_data["templateId"] == "personality"
+        assert [a["answerText"] for a in response_data["answers"]] == [
+            "回答1",
+            "回答2",
+        ]
+
+    def test_bulk_upsert_answers_invalid_question(
+        self, client, create_user, create_question, csrf_headers
+    ):
+        user = create_user(user_id="bulk_invalid_user", user_name="bulkinvalid")
+        question = create_question(text="別カテゴリ", category_id="lifestyle")
+
+        app.dependency_overrides[_get_current_user] = lambda: user
+        response = client.put(
+            f"/users/{user.user_id}/categories/personality/answers",
+            json={
+                "answers": [
+                    {"question_id": question.question_id, "answer_text": "回答"},
+                ]
+            },
+            headers=csrf_headers,
+        )
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bulk_upsert_answers_of_another_user_is_forbidden(
+        self,
+        client,
+        test_db_session,
+        create_user,
+        create_question,
+        create_answer,
+        csrf_headers,
+    ):
+        owner = create_user(user_id="bulk_owner", user_name="bulkowner")
+        other = create_user(user_id="bulk_other", user_name="bulkother")
+        question = create_question(text="一括質問", category_id="personality")
+        answer = create_answer(owner.user_id, question.question_id, "本人の回答")
+
+        app.dependency_overrides[_get_current_user] = lambda: other
+        response = client.put(
+            f"/users/{owner.user_id}/categories/personality/answers",
+            json={
+                "answers": [
+                    {"question_id": question.question_id, "answer_text": "上書き"},
+                ]
+            },
+            headers=csrf_headers,
+        )
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        test_db_session.refresh(answer)
+        assert answer.answer_text == "本人の回答"
+
+    def test_bulk_upsert_answers_unauthenticated(
+        self, client, create_user, create_question, csrf_headers
+    ):
+        user = create_user(user_id="bulk_anon_user", user_name="bulkanon")
+        question = create_question(text="一括質問", category_id="personality")
+
+        response = client.put(
+            f"/users/{user.user_id}/categories/personality/answers",
+            json={
+                "answers": [
+                    {"question_id": question.question_id, "answer_text": "回答"},
+                ]
+            },
+            headers=csrf_headers,
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_bulk_upsert_answers_empty_payload(self, client, create_user, csrf_headers):
+        user = create_user(user_id="bulk_empty_user", user_name="bulkempty")
+
+        app.dependency_overrides[_get_current_user] = lambda: user
+        response = client.put(
+            f"/users/{user.user_id}/categories/personality/answers",
+            json={"answers": []},
+            headers=csrf_headers,
+        )
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_toggle_answer_like(
+        self, client, create_user, create_question, create_answer, csrf_headers
+    ):
+        owner = create_user(user_id="like_owner", user_name="likeowner")
+        liker = create_user(user_id="like_liker", user_name="likeliker")
+        question = create_question(text="いいね質問", category_id="personality")
+        answer = create_answer(owner.user_id, question.question_id)
+
+        app.dependency_overrides[_get_current_user] = lambda: liker
+        liked = client.post(f"/answers/{answer.answer_id}/like", headers=csrf_headers)
+        unliked = client.post(f"/answers/{answer.answer_id}/like", headers=csrf_headers)
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert liked.status_code == status.HTTP_200_OK
+        assert liked.json() == {"userLiked": True, "likeCount": 1}
+        assert unliked.json() == {"userLiked": False, "likeCount": 0}
+
+    def test_like_answer_idempotent(
+        self, client, create_user, create_question, create_answer, csrf_headers
+    ):
+        owner = create_user(user_id="like_owner", user_name="likeowner")
+        liker = create_user(user_id="like_liker", user_name="likeliker")
+        question = create_question(text="いいね質問", category_id="personality")
+        answer = create_answer(owner.user_id, question.question_id)
+
+        app.dependency_overrides[_get_current_user] = lambda: liker
+        client.put(f"/answers/{answer.answer_id}/like", headers=csrf_headers)
+        response = client.put(f"/answers/{answer.answer_id}/like", headers=csrf_headers)
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"userLiked": True, "likeCount": 1}
+
+    def test_toggle_answer_like_not_found(self, client, create_user, csrf_headers):
+        liker = create_user(user_id="like_liker", user_name="likeliker")
+
+        app.dependency_overrides[_get_current_user] = lambda: liker
+        response = client.post("/answers/99999/like", headers=csrf_headers)
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_answer_like_states(
+        self, client, create_user, create_question, create_answer, csrf_headers
+    ):
+        owner = create_user(user_id="like_owner", user_name="likeowner")
+        liker = create_user(user_id="like_liker", user_name="likeliker")
+        question = create_question(text="いいね質問", category_id="personality")
+        answer = create_answer(owner.user_id, question.question_id)
+
+        app.dependency_overrides[_get_current_user] = lambda: liker
+        client.post(f"/answers/{answer.answer_id}/like", headers=csrf_headers)
+        response = client.post(
+            "/answers/like-states", json=[answer.answer_id], headers=csrf_headers
+        )
+        app.dependency_overrides.pop(_get_current_user)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["likeStates"][str(answer.answer_id)] == {
+            "userLiked": True,
+            "likeCount": 1,
+        }
+
+    def test_answer_like_unauthenticated(
+        self, client, create_user, create_question, create_answer, csrf_headers
+    ):
+        owner = create_user(user_id="like_owner", user_name="likeowner")
+        question = create_question(text="いいね質問", category_id="personality")
+        answer = create_answer(owner.user_id, question.question_id)
+
+        response = client.post(
+            f"/answers/{answer.answer_id}/like", headers=csrf_headers
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,120 @@
+import pytest
+from fastapi import status
+
+from src.db.tables import Answer, Message, MessageStatusEnum, MessageTypeEnum, Question
+from src.main import app
+from src.router.auth import _get_current_user
+
+CATEGORIES = ("personality", "lifestyle", "career", "values")
+
+
+@pytest.fixture
+def busy_user(test_db_session, create_user):
+    """複数カテゴリの回答と、返信付きのメッセージを持つユーザー"""
+    owner = create_user(user_id="budget_owner", user_name="budgetowner")
+    senders = [
+        create_user(user_id=f"budget_sender_{i}", user_name=f"budgetsender{i}")
+        for i in range(4)
+    ]
+
+    for category_id in CATEGORIES:
+        for order in (1, 2):
+            question = Question(
+                category_id=category_id,
+                text=f"{category_id}-{order}",
+                display_order=order,
+            )
+            test_db_session.add(question)
+            test_db_session.flush()
+            test_db_session.add(
+                Answer(
+                    user_id=owner.user_id,
+                    question_id=question.question_id,
+                    answer_text="answer",
+                )
+            )
+
+    for i, sender in enumerate(senders):
+        root = Message(
+            message_id=f"budget_root_{i}",
+            from_user_id=sender.user_id,
+            to_user_id=owner.user_id,
+            message_type=MessageTypeEnum.comment,
+            content=f"root {i}",
+            status=MessageStatusEnum.unread,
+        )
+        reply = Message(
+            message_id=f"budget_reply_{i}",
+            from_user_id=owner.user_id,
+            to_user_id=sender.user_id,
+            message_type=MessageTypeEnum.comment,
+            content=f"reply {i}",
+            parent_message_id=root.message_id,
+            status=MessageStatusEnum.unread,
+        )
+        nested = Message(
+            message_id=f"budget_nested_{i}",
+            from_user_id=sender.user_id,
+            to_user_id=owner.user_id,
+            message_type=MessageTypeEnum.comment,
+            content=f"nested {i}",
+            parent_message_id=reply.message_id,
+            status=MessageStatusEnum.unread,
+        )
+        test_db_session.add_all([root, reply, nested])
+
+    test_db_session.commit()
+    # コミットで失効した属性の再読み込みが計測に混ざらないようにする
+    test_db_session.refresh(owner)
+    return owner
+
+
+@pytest.fixture
+def as_user():
+    def _as_user(user):
+        app.dependency_overrides[_get_current_user] = lambda: user
+
+    yield _as_user
+    app.dependency_overrides.pop(_get_current_user, None)
+
+
+@pytest.mark.integration
+class TestQueryBudgets:
+    """エンドポイントごとのクエリ数の上限（データ件数に比例して増えないこと）"""
+
+    @pytest.mark.parametrize(
+        "path,budget",
+        [
+            ("/by-username/budgetowner", 1),
+            ("/by-username/budgetowner/messages", 4),
+            ("/by-username/budgetowner/qna", 3),
+            ("/by-username/budgetowner/profile-items", 2),
+            ("/by-username/budgetowner/page", 6),
+        ],
+    )
+    def test_public_endpoints(self, client, query_recorder, busy_user, path, budget):
+        with query_recorder() as queries:
+            response = client.get(path)
+
+        assert response.status_code == status.HTTP_200_OK
+        queries.assert_budget(budget)
+
+    @pytest.mark.parametrize(
+        "path,budget",
+        [
+            ("/messages", 3),
+            ("/messages/budget_nested_0/thread", 4),
+            ("/notifications", 2),
+        ],
+    )
+    def test_authenticated_endpoints(
+        self, client, query_recorder, as_user, busy_user, path, budget
+    ):
+        as_user(busy_user)
+
+        with query_recorder() as queries:
+            response = client.get(path)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()
+        queries.assert_budget(budget)
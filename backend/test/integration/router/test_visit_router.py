@@ -5,7 +5,7 @@ from fastapi import status
 
 from src.db.tables import Visit
 from src.main import app
-from src.router.auth import _get_current_user
+from src.router.auth import _get_current_user, get_current_user_optional
 
 
 @pytest.mark.integration
@@ -16,11 +16,13 @@ class TestVisitRouter:
         visitor = create_user(user_id="visitor_user", user_name="visitoruser")
         visited = create_user(user_id="visited_user", user_name="visiteduser")
 
-        with patch("src.router.visit_router._get_current_user") as mock_get_user:
-            mock_get_user.return_value = test_db_session.merge(visitor)
+        app.dependency_overrides[get_current_user_optional] = lambda: visitor
+        try:
             response = client.post(
                 f"/users/{visited.user_id}/visit", headers=csrf_headers
             )
+        finally:
+            app.dependency_overrides.pop(get_current_user_optional, None)
 
         assert response.status_code == status.HTTP_201_CREATED
         response_data = response.json()
@@ -82,9 +84,11 @@ class TestVisitRouter:
     ):
         user = create_user(user_id="self_visit_user", user_name="selfvisituser")
 
-        with patch("src.router.visit_router._get_current_user") as mock_get_user:
-            mock_get_user.return_value = test_db_session.merge(user)
+        app.dependency_overrides[get_current_user_optional] = lambda: user
+        try:
             response = client.post(f"/users/{user.user_id}/visit", headers=csrf_headers)
+        finally:
+            app.dependency_overrides.pop(get_current_user_optional, None)
 
         # The current implementation silently handles self-visits and returns success
         assert response.status_code == status.HTTP_201_CREATED
@@ -0,0 +1,121 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+REQUIRED_ENV = {
+    "SECRET_KEY": "test_secret_key",
+    "TWITTER_CLIENT_ID": "test_client_id",
+    "TWITTER_CLIENT_SECRET": "test_client_secret",
+    "SESSION_SECRET_KEY": "test_session_secret",
+    "DB_USER": "test_user",
+    "DB_PASSWORD": "test_password",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test_db",
+    "ENVIRONMENT": "test",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_env(**overrides: str) -> dict[str, str]:
+    env = {**REQUIRED_ENV, **os.environ, "LOOP_MONITOR": "false", "LOG_ASYNC": "true"}
+    env.update(overrides)
+    return env
+
+
+def _children(pid: int) -> set[int]:
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return {int(child) for child in path.read_text().split()}
+
+
+def _wait_until(predicate, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = predicate()
+            if result:
+                return result
+        except (httpx.HTTPError, OSError):
+            pass
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses /proc")
+class TestPreforkServer:
+    def test_refuses_process_local_state_with_multiple_workers(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "src.server"],
+            cwd=BACKEND_DIR,
+            env=_server_env(
+                WEB_CONCURRENCY="2",
+                RATE_LIMIT_BACKEND="memory",
+                TOKEN_REVOCATION_BACKEND="memory",
+            ),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+
+        assert result.returncode == 1
+        assert "Refusing to start" in result.stdout
+        assert "RATE_LIMIT_BACKEND=memory" in result.stdout
+
+    def test_serves_with_shared_backends_and_restarts_workers(self, tmp_path):
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.server"],
+            cwd=BACKEND_DIR,
+            env=_server_env(
+                WEB_CONCURRENCY="2",
+                PORT=str(port),
+                HOST="127.0.0.1",
+                WORKER_RESTART_INTERVAL_SECONDS="0",
+                RATE_LIMIT_BACKEND="sqlite",
+                RATE_LIMIT_SQLITE_PATH=str(tmp_path / "rate_limit.sqlite3"),
+                TOKEN_REVOCATION_BACKEND="database",
+                TOKEN_REVOCATION_DATABASE_URL=f"sqlite:///{tmp_path / 'revoked.db'}",
+            ),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{port}/health"
+        try:
+            _wait_until(lambda: httpx.get(url).status_code == 200)
+            workers = _wait_until(
+                lambda: len(_children(process.pid)) == 2 and _children(process.pid)
+            )
+
+            # 異常終了したワーカーは起動し直される
+            killed = next(iter(workers))
+            os.kill(killed, signal.SIGKILL)
+            _wait_until(
+                lambda: (
+                    killed not in _children(process.pid)
+                    and len(_children(process.pid)) == 2
+                )
+            )
+            assert httpx.get(url).status_code == 200
+
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(timeout=15) == 0
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
@@ -0,0 +1,75 @@
+import io
+import logging
+import queue
+
+import pytest
+
+from src.config.logging_config import (
+    BatchingLogWriter,
+    DroppingQueueHandler,
+    RequestLogSampler,
+    _parse_route_rates,
+)
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+@pytest.mark.unit
+class TestRequestLogSampler:
+    def test_longest_prefix_wins(self):
+        sampler = RequestLogSampler(
+            default_rate=0.5, route_rates=(("/users", 0.1), ("/users/me", 1.0))
+        )
+
+        assert sampler.rate_for("/users/me/profile") == 1.0
+        assert sampler.rate_for("/users/alice") == 0.1
+        assert sampler.rate_for("/messages") == 0.5
+
+    def test_zero_rate_never_samples(self):
+        sampler = RequestLogSampler(route_rates=(("/health", 0.0),))
+
+        assert not any(sampler.should_sample("/health") for _ in range(100))
+        assert sampler.should_sample("/messages")
+
+    def test_keeps_errors_and_slow_requests(self):
+        sampler = RequestLogSampler(slow_request_seconds=1.0)
+
+        assert sampler.should_keep(False, 500, 0.01)
+        assert sampler.should_keep(False, 200, 2.0)
+        assert not sampler.should_keep(False, 404, 0.01)
+        assert sampler.should_keep(True, 200, 0.01)
+
+    def test_parse_route_rates(self):
+        assert _parse_route_rates("/health=0, /messages=0.25,invalid") == (
+            ("/health", 0.0),
+            ("/messages", 0.25),
+        )
+
+
+@pytest.mark.unit
+class TestAsyncLogSink:
+    def test_full_queue_drops_without_blocking(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.handle(_record("first"))
+        handler.handle(_record("second"))
+
+        assert handler.dropped == 1
+        assert handler.queue.qsize() == 1
+
+    def test_writer_batches_queued_records(self):
+        log_queue: queue.Queue = queue.Queue()
+        stream = io.StringIO()
+        handler = DroppingQueueHandler(log_queue)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for i in range(5):
+            handler.handle(_record(f"line {i}"))
+
+        writer = BatchingLogWriter(log_queue, stream, batch_size=3)
+        writer.start()
+        writer.stop()
+
+        assert stream.getvalue().splitlines() == [f"line {i}" for i in range(5)]
+        assert writer.batches == 2
@@ -0,0 +1,52 @@
+import pytest
+
+from src.config import workers
+from src.config.workers import check_worker_safety, ensure_worker_safety
+
+
+@pytest.mark.unit
+class TestWorkerSafety:
+    def test_single_worker_is_always_safe(self):
+        assert check_worker_safety(1, "memory", "memory") == []
+
+    def test_process_local_backends_are_unsafe_with_multiple_workers(self):
+        problems = check_worker_safety(4, "memory", "memory")
+
+        assert len(problems) == 2
+        assert problems[0].startswith("TOKEN_REVOCATION_BACKEND=memory")
+        assert "4x the configured limits" in problems[1]
+
+    @pytest.mark.parametrize("rate_limit_backend", ["sqlite", "redis"])
+    def test_shared_backends_are_safe(self, rate_limit_backend):
+        assert check_worker_safety(4, "database", rate_limit_backend) == []
+
+    @pytest.fixture
+    def pools(self, monkeypatch):
+        monkeypatch.setattr(workers, "DB_POOL_SIZE", 5)
+        monkeypatch.setattr(workers, "DB_MAX_OVERFLOW", 10)
+        monkeypatch.setattr(workers, "TOKEN_REVOCATION_POOL_SIZE", 2)
+        monkeypatch.setattr(workers, "TOKEN_REVOCATION_MAX_OVERFLOW", 3)
+        monkeypatch.setattr(workers, "TOKEN_REVOCATION_DATABASE_URL", None)
+
+    def test_connection_budget(self, pools):
+        # 4 ワーカー x (2 エンジン x (5 + 10) + 失効ストア (2 + 3)) = 140 接続
+        assert check_worker_safety(4, "database", "sqlite", max_connections=140) == []
+        problems = check_worker_safety(4, "database", "sqlite", max_connections=139)
+        assert problems == [
+            "4 workers may open 140 DB connections, more than "
+            "DB_MAX_CONNECTIONS=139 (lower DB_POOL_SIZE / DB_MAX_OVERFLOW "
+            "/ TOKEN_REVOCATION_POOL_SIZE / TOKEN_REVOCATION_MAX_OVERFLOW)"
+        ]
+
+    def test_separate_revocation_database_is_not_counted(self, pools, monkeypatch):
+        monkeypatch.setattr(
+            workers, "TOKEN_REVOCATION_DATABASE_URL", "postgresql://revocation/db"
+        )
+
+        assert check_worker_safety(4, "database", "sqlite", max_connections=120) == []
+
+    def test_ensure_raises_with_all_problems(self):
+        # テスト環境の既定（memory バックエンド）では複数ワーカーを拒否する
+        with pytest.raises(RuntimeError, match="Unsafe configuration for 2 workers"):
+            ensure_worker_safety(2)
+        ensure_worker_safety(1)
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.db import routing
+from src.db.tables import Base, User
+from src.middleware.read_your_writes import ReadYourWritesMiddleware
+
+
+@pytest.fixture
+def databases(tmp_path):
+    # プライマリとレプリカを別々のSQLiteファイルで用意し、同じユーザーの表示名を変えておく
+    factories = {}
+    engines = []
+    for name in ("primary", "replica"):
+        path = tmp_path / f"{name}.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(User(user_id="alice", user_name="alice", display_name=name))
+            db.commit()
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}", poolclass=NullPool
+        )
+        factories[name] = (
+            sessionmaker(bind=engine),
+            async_sessionmaker(bind=async_engine, expire_on_commit=False),
+        )
+        engines.append((engine, async_engine))
+    routing.track_writes()
+
+    yield factories
+
+    for engine, async_engine in engines:
+        engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def client(databases):
+    primary, async_primary = databases["primary"]
+    replica, async_replica = databases["replica"]
+    get_read_db = routing.read_session_dependency(primary, replica)
+    get_async_read_db = routing.async_read_session_dependency(
+        async_primary, async_replica
+    )
+
+    def get_db():
+        with primary() as db:
+            yield db
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, pin_seconds=5)
+
+    @app.get("/users/{user_id}")
+    def read_user(user_id: str, db: Session = Depends(get_read_db)):
+        return db.get(User, user_id).display_name
+
+    @app.get("/async/users/{user_id}")
+    async def read_user_async(
+        user_id: str, db: AsyncSession = Depends(get_async_read_db)
+    ):
+        return (await db.get(User, user_id)).display_name
+
+    @app.put("/users/{user_id}")
+    def rename_user(user_id: str, name: str, db: Session = Depends(get_db)):
+        db.get(User, user_id).display_name = name
+        db.commit()
+
+    @app.put("/bulk/users/{user_id}")
+    def rename_user_bulk(user_id: str, name: str, db: Session = Depends(get_db)):
+        db.execute(
+            update(User).where(User.user_id == user_id).values(display_name=name)
+        )
+        db.commit()
+
+    @app.get("/primary/users")
+    def count_users(db: Session = Depends(get_db)):
+        return len(db.scalars(select(User)).all())
+
+    # 固定用のクッキーは Secure のため https で送る
+    return TestClient(app, base_url="https://testserver")
+
+
+@pytest.mark.unit
+class TestReadReplicaRouting:
+    def test_reads_go_to_replica(self, client):
+        assert client.get("/users/alice").json() == "replica"
+        assert client.get("/async/users/alice").json() == "replica"
+
+    def test_write_pins_client_to_primary(self, client):
+        response = client.put("/users/alice", params={"name": "renamed"})
+
+        cookie = response.headers["set-cookie"]
+        assert cookie.startswith(f"{routing.PIN_COOKIE}=1;")
+        assert "Max-Age=5" in cookie
+        assert client.get("/users/alice").json() == "renamed"
+        assert client.get("/async/users/alice").json() == "renamed"
+
+        # 固定が切れればレプリカに戻る
+        client.cookies.clear()
+        assert client.get("/users/alice").json() == "replica"
+
+    def test_bulk_dml_counts_as_write(self, client):
+        response = client.put("/bulk/users/alice", params={"name": "bulk"})
+
+        assert routing.PIN_COOKIE in response.cookies
+        assert client.get("/users/alice").json() == "bulk"
+
+    def test_reads_on_primary_do_not_pin(self, client):
+        response = client.get("/primary/users")
+
+        assert response.json() == 1
+        assert "set-cookie" not in response.headers
+
+    def test_routing_outside_request_uses_replica(self):
+        assert routing.use_primary() is False
+        routing.mark_write()  # リクエスト外では何もしない
+        assert routing.request_routing.get() is None
@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from src.db.slow_query import SlowQueryLog, find_call_site
+from src.service import metrics, user_service
+from src.service.aio import user_service as aio_user_service
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "src.db.slow_query.logger.warning",
+        lambda event, **kw: calls.append((event, kw)),
+    )
+    return calls
+
+
+@pytest.fixture
+def slow_query_log():
+    installed = []
+
+    def _install(engine, **options) -> SlowQueryLog:
+        slow_log = SlowQueryLog(engine, "test", **options).install()
+        installed.append(slow_log)
+        return slow_log
+
+    yield _install
+    for slow_log in installed:
+        slow_log.remove()
+
+
+@pytest.mark.unit
+class TestSlowQueryLog:
+    def test_logs_statement_with_call_site_and_route(
+        self, test_db_engine, slow_query_log, warnings
+    ):
+        slow_log = slow_query_log(test_db_engine, threshold_seconds=0)
+        token = metrics.request_scope.set({"route": SimpleNamespace(path="/users")})
+        try:
+            with Session(test_db_engine) as db:
+                user_service.get_users(db, limit=5)
+        finally:
+            metrics.request_scope.reset(token)
+        slow_log.remove()  # 実行計画の取得を待つ
+
+        logged = dict(warnings)
+        query = logged["Slow query"]
+        assert query["statement"].startswith("SELECT users.user_id")
+        assert query["call_site"].startswith("src/service/user_service.py:")
+        assert query["call_site"].endswith("in get_users")
+        assert query["route"] == "/users"
+        assert query["parameters"] == "(5, 0)"
+        assert "SCAN users" in logged["Slow query plan"]["plan"]
+
+    def test_ignores_statements_under_threshold(
+        self, test_db_engine, slow_query_log, warnings
+    ):
+        slow_query_log(test_db_engine, threshold_seconds=60)
+
+        with Session(test_db_engine) as db:
+            user_service.get_users(db)
+
+        assert warnings == []
+
+    def test_explains_each_shape_once_per_interval(
+        self, test_db_engine, slow_query_log, warnings
+    ):
+        slow_log = slow_query_log(test_db_engine, threshold_seconds=0)
+
+        with Session(test_db_engine) as db:
+            for limit in (1, 2, 3):
+                user_service.get_users(db, limit=limit)
+        slow_log.remove()
+
+        events = [event for event, _ in warnings]
+        # EXPLAIN 自体は記録されない
+        assert events.count("Slow query") == 3
+        assert events.count("Slow query plan") == 1
+
+    def test_explain_can_be_disabled(self, test_db_engine, slow_query_log, warnings):
+        slow_log = slow_query_log(test_db_engine, threshold_seconds=0, explain=False)
+
+        with Session(test_db_engine) as db:
+            user_service.get_users(db)
+        slow_log.remove()
+
+        assert [event for event, _ in warnings] == ["Slow query"]
+
+    def test_async_engine_explains_on_event_loop(
+        self, test_async_engine, async_session_factory, slow_query_log, warnings
+    ):
+        slow_log = slow_query_log(test_async_engine, threshold_seconds=0)
+
+        async def _run():
+            async with async_session_factory() as db:
+                await aio_user_service.get_user_by_username(db, "nobody")
+            await asyncio.gather(*slow_log._tasks)
+
+        asyncio.run(_run())
+
+        logged = dict(warnings)
+        assert [event for event, _ in warnings].count("Slow query") == 1
+        assert logged["Slow query"]["call_site"].startswith(
+            "src/service/aio/user_service.py:"
+        )
+        assert "users" in logged["Slow query plan"]["plan"]
+
+    def test_call_site_is_none_outside_src(self):
+        assert find_call_site() is None
+
+    def test_shares_timer_with_metrics_and_survives_failed_statements(
+        self, slow_query_log, warnings
+    ):
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1)
+        metrics.instrument_engine(engine, "test")
+        slow_query_log(engine, threshold_seconds=0, explain=False)
+
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+            info = dict(conn.info)
+
+        assert info == {}
+        assert [event for event, _ in warnings] == ["Slow query"]
+        # 開始時刻を記録するフックはメトリクスとスロークエリログで1つを共有する
+        assert len(engine.dispatch.before_cursor_execute) == 1
+        assert event.contains(
+            engine, "before_cursor_execute", metrics._start_query_timer
+        )
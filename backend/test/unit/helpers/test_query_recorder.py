@@ -0,0 +1,39 @@
+import pytest
+
+from src.db.tables import User
+from test.helpers.query_recorder import normalize_statement
+
+
+@pytest.mark.unit
+class TestQueryRecorder:
+    def test_normalize_collapses_in_lists_and_whitespace(self):
+        assert normalize_statement(
+            "SELECT *\n  FROM users WHERE user_id IN (?, ?, ?)"
+        ) == normalize_statement("SELECT * FROM users WHERE user_id IN (?)")
+
+    def test_flags_repeated_statements_with_call_site(
+        self, test_db_session, create_user, query_recorder
+    ):
+        for i in range(3):
+            create_user(user_id=f"user_{i}", user_name=f"user{i}")
+
+        with query_recorder() as queries:
+            for i in range(3):
+                test_db_session.get(User, f"user_{i}", populate_existing=True)
+
+        repeated = queries.repeated_shapes()
+        assert len(repeated) == 1
+        (recorded,) = repeated.values()
+        assert len(recorded) == 3
+        assert all(q.call_site.startswith("test_query_recorder.py") for q in recorded)
+        with pytest.raises(AssertionError, match="N\\+1 suspect \\(3x\\)"):
+            queries.assert_no_n_plus_one()
+
+    def test_budget_failure_lists_statements(self, test_db_session, query_recorder):
+        with query_recorder() as queries:
+            test_db_session.query(User).all()
+            test_db_session.query(User).count()
+
+        assert queries.count == 2
+        with pytest.raises(AssertionError, match="query budget exceeded \\(2 > 1\\)"):
+            queries.assert_budget(1)
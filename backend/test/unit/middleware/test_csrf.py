@@ -0,0 +1,75 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.middleware.csrf import CSRFMiddleware
+from src.service.token_service import TokenService
+
+
+@pytest.fixture
+def csrf_app_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CSRFMiddleware)
+
+    @app.post("/items")
+    def create_item():
+        return {"created": True}
+
+    @app.get("/items")
+    def list_items():
+        return []
+
+    @app.post("/users/{user_id}/visit")
+    def visit(user_id: str):
+        return {"visited": user_id}
+
+    @app.delete("/debug/memory/tracing")
+    def stop_tracing():
+        return {"tracing": False}
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestCSRFMiddleware:
+    def test_safe_methods_skip_validation(self, csrf_app_client):
+        assert csrf_app_client.get("/items").status_code == 200
+
+    def test_exempt_pattern_skips_validation(self, csrf_app_client):
+        assert csrf_app_client.post("/users/u1/visit").status_code == 200
+
+    def test_debug_endpoints_skip_validation(self, csrf_app_client):
+        assert csrf_app_client.delete("/debug/memory/tracing").status_code == 200
+
+    def test_missing_token_is_rejected(self, csrf_app_client):
+        response = csrf_app_client.post("/items")
+
+        assert response.status_code == 403
+        assert response.json() == {"detail": "CSRF token missing"}
+
+    def test_mismatched_token_is_rejected(self, csrf_app_client):
+        csrf_app_client.cookies.set("csrf_token", TokenService.create_csrf_token())
+
+        response = csrf_app_client.post(
+            "/items", headers={"X-CSRFToken": TokenService.create_csrf_token()}
+        )
+
+        assert response.status_code == 403
+        assert response.json() == {"detail": "CSRF token mismatch"}
+
+    def test_invalid_token_is_rejected(self, csrf_app_client):
+        csrf_app_client.cookies.set("csrf_token", "forged")
+
+        response = csrf_app_client.post("/items", headers={"X-CSRFToken": "forged"})
+
+        assert response.status_code == 403
+        assert response.json() == {"detail": "Invalid CSRF token"}
+
+    def test_valid_token_passes(self, csrf_app_client):
+        csrf_token = TokenService.create_csrf_token()
+        csrf_app_client.cookies.set("csrf_token", csrf_token)
+
+        response = csrf_app_client.post("/items", headers={"X-CSRFToken": csrf_token})
+
+        assert response.status_code == 200
+        assert response.json() == {"created": True}
@@ -0,0 +1,104 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.config.logging_config import RequestLogSampler
+from src.middleware.logging import LoggingMiddleware
+
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/ok")
+    def ok():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]), media_type="text/plain")
+
+    @app.get("/server-error", status_code=503)
+    def server_error():
+        return {}
+
+    @app.get("/error")
+    def error():
+        raise RuntimeError("boom")
+
+    return app
+
+
+@pytest.mark.unit
+class TestLoggingMiddleware:
+    def test_adds_process_time_header(self):
+        response = TestClient(_create_app()).get("/ok")
+
+        assert response.status_code == 200
+        assert float(response.headers["X-Process-Time"]) >= 0
+
+    def test_streaming_response_passes_through(self):
+        with TestClient(_create_app()).stream("GET", "/stream") as response:
+            chunks = list(response.iter_bytes())
+
+        assert b"".join(chunks) == b"abc"
+        assert "X-Process-Time" in response.headers
+
+    def test_logs_completion_with_status_code(self):
+        with pytest.MonkeyPatch.context() as mp:
+            calls = []
+            mp.setattr(
+                "src.middleware.logging.logger.info",
+                lambda event, **kw: calls.append((event, kw)),
+            )
+            TestClient(_create_app()).get("/ok")
+
+        assert [event for event, _ in calls] == ["Request started", "Request completed"]
+        assert calls[1][1]["status_code"] == 200
+
+    def test_reraises_application_errors(self):
+        client = TestClient(_create_app())
+
+        with pytest.raises(RuntimeError, match="boom"):
+            client.get("/error")
+
+    @pytest.mark.parametrize(
+        "path,expected_events",
+        [
+            ("/ok", []),
+            ("/server-error", ["Request completed"]),
+        ],
+    )
+    def test_sampled_out_requests_keep_only_errors(
+        self, monkeypatch, path, expected_events
+    ):
+        calls = []
+        monkeypatch.setattr(
+            "src.middleware.logging.get_request_log_sampler",
+            lambda: RequestLogSampler(default_rate=0.0),
+        )
+        monkeypatch.setattr(
+            "src.middleware.logging.logger.info",
+            lambda event, **kw: calls.append((event, kw)),
+        )
+
+        TestClient(_create_app()).get(path)
+
+        assert [event for event, _ in calls] == expected_events
+        assert all(kw["sampled"] is False for _, kw in calls)
+
+    def test_sampled_out_slow_request_is_kept(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            "src.middleware.logging.get_request_log_sampler",
+            lambda: RequestLogSampler(default_rate=0.0, slow_request_seconds=0.0),
+        )
+        monkeypatch.setattr(
+            "src.middleware.logging.logger.info",
+            lambda event, **kw: calls.append((event, kw)),
+        )
+
+        TestClient(_create_app()).get("/ok")
+
+        assert [event for event, _ in calls] == ["Request completed"]
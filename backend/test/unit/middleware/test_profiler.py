@@ -0,0 +1,82 @@
+import json
+import pstats
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from src.middleware.profiler import ProfilerMiddleware
+from src.router.timed_route import TimedRoute
+
+TOKEN = "profile_secret"
+
+
+def slow_handler_work():
+    deadline = time.perf_counter() + 0.03
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _create_app(output_dir, **options) -> FastAPI:
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/threads/{thread_id}")
+    def get_thread(thread_id: str):
+        slow_handler_work()
+        return {"thread_id": thread_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ProfilerMiddleware, output_dir=str(output_dir), **options)
+    return app
+
+
+@pytest.mark.unit
+class TestProfilerMiddleware:
+    def test_signed_header_saves_speedscope_profile(self, tmp_path):
+        client = TestClient(_create_app(tmp_path, token=TOKEN))
+
+        response = client.get("/threads/t1", headers={"X-Profile": TOKEN})
+
+        assert response.status_code == 200
+        filename = response.headers["X-Profile-Id"]
+        assert filename.endswith("_GET_threads_thread_id.speedscope.json")
+        profile = json.loads((tmp_path / filename).read_text())
+        assert profile["name"] == "GET /threads/t1"
+        frame_names = {frame["name"] for frame in profile["shared"]["frames"]}
+        assert "slow_handler_work" in frame_names
+        # 同期エンドポイントはワーカースレッドで採取される
+        assert any(p["name"].startswith("worker") for p in profile["profiles"])
+        for p in profile["profiles"]:
+            assert len(p["samples"]) == len(p["weights"]) > 0
+
+    def test_cprofile_mode_saves_pstats(self, tmp_path):
+        client = TestClient(_create_app(tmp_path, token=TOKEN))
+
+        response = client.get(
+            "/threads/t1", headers={"X-Profile": TOKEN, "X-Profile-Mode": "cprofile"}
+        )
+
+        filename = response.headers["X-Profile-Id"]
+        assert filename.endswith(".prof")
+        stats = pstats.Stats(str(tmp_path / filename))
+        functions = {name for _, _, name in stats.stats}
+        assert "slow_handler_work" in functions
+
+    def test_wrong_or_missing_token_is_not_profiled(self, tmp_path):
+        client = TestClient(_create_app(tmp_path, token=TOKEN))
+
+        wrong = client.get("/threads/t1", headers={"X-Profile": "guess"})
+        missing = client.get("/threads/t1")
+
+        assert "X-Profile-Id" not in wrong.headers
+        assert "X-Profile-Id" not in missing.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sample_rate_profiles_without_header(self, tmp_path):
+        client = TestClient(_create_app(tmp_path / "out", sample_rate=1.0))
+
+        response = client.get("/threads/t1")
+
+        assert (tmp_path / "out" / response.headers["X-Profile-Id"]).exists()
@@ -0,0 +1,49 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.middleware.sessions import SessionMiddleware
+
+from src.middleware.scoped import ScopedMiddleware
+
+
+@pytest.fixture
+def scoped_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(
+        ScopedMiddleware,
+        path_prefixes=("/auth/",),
+        middleware=SessionMiddleware,
+        secret_key="test_session_secret",
+    )
+
+    @app.get("/auth/start")
+    def start(request: Request):
+        request.session["state"] = "abc"
+        return {}
+
+    @app.get("/auth/finish")
+    def finish(request: Request):
+        return {"state": request.session.pop("state", None)}
+
+    @app.get("/public")
+    def public(request: Request):
+        return {"has_session": "session" in request.scope}
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestScopedMiddleware:
+    def test_applies_inside_prefix(self, scoped_client):
+        response = scoped_client.get("/auth/start")
+
+        assert "session" in response.cookies
+        assert scoped_client.get("/auth/finish").json() == {"state": "abc"}
+
+    def test_skips_outside_prefix(self, scoped_client):
+        scoped_client.get("/auth/start")
+
+        response = scoped_client.get("/public")
+
+        assert response.json() == {"has_session": False}
+        assert "set-cookie" not in response.headers
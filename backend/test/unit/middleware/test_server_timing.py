@@ -0,0 +1,148 @@
+import re
+import time
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from src.db.tables import User
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.server_timing import ServerTimingMiddleware
+from src.router.timed_route import TimedRoute
+from src.service import server_timing
+from src.service.metrics import RequestDBStats
+
+
+class UserOut(BaseModel):
+    user_id: str
+    user_name: str
+
+
+def _durations(header: str) -> dict[str, float]:
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", header)
+    }
+
+
+def _create_app(db_session, with_middleware: bool = True) -> FastAPI:
+    server_timing.instrument_orm()
+    router = APIRouter(route_class=TimedRoute)
+
+    def current_user():
+        with server_timing.timer("auth"):
+            return "user_1"
+
+    @router.get("/users", response_model=list[UserOut])
+    def list_users(user_id: str = Depends(current_user)):
+        return db_session.scalars(select(User)).all()
+
+    @router.get("/async")
+    async def async_endpoint():
+        return {"status": "ok"}
+
+    app = FastAPI()
+    app.include_router(router)
+    if with_middleware:
+        app.add_middleware(ServerTimingMiddleware)
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+@pytest.mark.unit
+class TestServerTimingMiddleware:
+    def test_header_breaks_down_request(self, test_db_session, create_users):
+        create_users(3)
+
+        response = TestClient(_create_app(test_db_session)).get("/users")
+
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+        header = response.headers["Server-Timing"]
+        assert list(_durations(header)) == [
+            "auth",
+            "db",
+            "orm",
+            "serialize",
+            "app",
+            "middleware",
+            "total",
+        ]
+        assert "db;dur=" in header and 'desc="1 queries"' in header
+        durations = _durations(header)
+        assert durations["app"] <= durations["total"]
+
+    def test_async_endpoint_has_no_auth_or_orm(self, test_db_session):
+        response = TestClient(_create_app(test_db_session)).get("/async")
+
+        durations = _durations(response.headers["Server-Timing"])
+        assert "auth" not in durations and "orm" not in durations
+        assert {"db", "serialize", "app", "middleware", "total"} <= set(durations)
+        assert durations["db"] == 0
+
+    def test_no_header_without_middleware(self, test_db_session, create_users):
+        create_users(1)
+
+        response = TestClient(_create_app(test_db_session, with_middleware=False)).get(
+            "/users"
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+        assert "Server-Timing" not in response.headers
+
+    def test_works_without_metrics_middleware(self, test_db_session):
+        app = FastAPI()
+        router = APIRouter(route_class=TimedRoute)
+
+        @router.get("/ok")
+        def ok():
+            return {"status": "ok"}
+
+        app.include_router(router)
+        app.add_middleware(ServerTimingMiddleware)
+
+        response = TestClient(app).get("/ok")
+
+        assert "total;dur=" in response.headers["Server-Timing"]
+
+
+@pytest.mark.unit
+class TestRequestTimings:
+    def test_timer_is_noop_outside_request(self):
+        with server_timing.timer("auth"):
+            pass
+
+        assert server_timing.request_timings.get() is None
+
+    def test_timer_accumulates(self):
+        timings = server_timing.RequestTimings(RequestDBStats())
+        token = server_timing.request_timings.set(timings)
+        try:
+            with server_timing.timer("auth"):
+                pass
+            with server_timing.timer("auth"):
+                pass
+        finally:
+            server_timing.request_timings.reset(token)
+
+        assert list(timings.as_dict()) == ["auth", "db"]
+        assert timings.durations["auth"] > 0
+
+    def test_timer_excludes_nested_db_and_orm_time(self):
+        timings = server_timing.RequestTimings(RequestDBStats())
+        token = server_timing.request_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with server_timing.timer("auth"):
+                time.sleep(0.05)
+                # ユーザーの読み込みで計上された DB・ORM の時間
+                timings.db_stats.seconds += 0.03
+                timings.add("orm", 0.01)
+        finally:
+            server_timing.request_timings.reset(token)
+        elapsed = time.perf_counter() - started
+
+        assert 0.01 <= timings.durations["auth"] <= elapsed - 0.04
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from pydantic import TypeAdapter, field_validator
+
+from src.db.tables import Message as MessageRow
+from src.db.tables import (
+    MessageStatusEnum,
+    MessageTypeEnum,
+    NotificationLevelEnum,
+    User,
+    Visit,
+)
+from src.schema.common import OrmBaseModel
+from src.schema.message import MessageRead, NotificationRead
+from src.schema.serialization import (
+    ORJSONResponse,
+    compile_dumper,
+    dump_rows,
+    orm_list_response,
+)
+from src.schema.visit import VisitorInfo, VisitRead
+
+JST = timezone(timedelta(hours=9))
+
+
+def _user(user_id: str, created_at: datetime) -> User:
+    return User(
+        user_id=user_id,
+        user_name=f"name_{user_id}",
+        display_name=f"Display {user_id}",
+        bio=None,
+        icon_url="https://example.com/icon.png",
+        notification_level=NotificationLevelEnum.all,
+        created_at=created_at,
+    )
+
+
+def _messages() -> list[MessageRow]:
+    # UTC（マイクロ秒あり）・タイムゾーンなし・UTC 以外のオフセットの日時を混ぜる
+    alice = _user("alice", datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc))
+    bob = _user("bob", datetime(2024, 1, 2, 9, 30))
+    bob.last_login_at = datetime(2024, 1, 3, 8, 0, tzinfo=JST)
+
+    root = MessageRow(
+        message_id="m1",
+        from_user_id="alice",
+        to_user_id="bob",
+        message_type=MessageTypeEnum.comment,
+        content='こんにちは "quoted"',
+        status=MessageStatusEnum.replied,
+        created_at=datetime(2024, 2, 1, tzinfo=timezone.utc),
+        from_user=alice,
+        to_user=bob,
+    )
+    reply = MessageRow(
+        message_id="m2",
+        from_user_id="bob",
+        to_user_id="alice",
+        message_type=MessageTypeEnum.comment,
+        content="reply",
+        parent_message_id="m1",
+        status=MessageStatusEnum.unread,
+        created_at=datetime(2024, 2, 2, 0, 0, 0, 500000, tzinfo=timezone.utc),
+        from_user=bob,
+        to_user=alice,
+        parent_message=root,
+    )
+    root.replies = [reply]
+    root.reply_count = 1
+    return [root, reply]
+
+
+def _validated_json(model, rows) -> bytes:
+    adapter = TypeAdapter(list[model])
+    return adapter.dump_json(
+        adapter.validate_python(rows, from_attributes=True), by_alias=True
+    )
+
+
+@pytest.mark.unit
+class TestFastSerialization:
+    @pytest.mark.parametrize("model", [MessageRead, NotificationRead])
+    def test_matches_response_model_output(self, model):
+        rows = _messages()
+
+        response = orm_list_response(model, rows)
+
+        assert response.media_type == "application/json"
+        assert response.body == _validated_json(model, rows)
+
+    def test_visits_match_response_model_output(self):
+        visitor = _user("alice", datetime(2024, 1, 1, tzinfo=timezone.utc))
+        visits = [
+            Visit(
+                visit_id=1,
+                visitor_user_id="alice",
+                visited_user_id="bob",
+                is_anonymous=False,
+                visited_at=datetime(2024, 3, 1, 10, 0, 0, 1, tzinfo=timezone.utc),
+            ),
+            Visit(
+                visit_id=2,
+                visitor_user_id=None,
+                visited_user_id="bob",
+                is_anonymous=True,
+                visited_at=datetime(2024, 3, 2, tzinfo=timezone.utc),
+            ),
+        ]
+        visits[0].visitor_info = visitor
+        visits[1].visitor_info = VisitorInfo(is_anonymous=True)
+
+        body = ORJSONResponse(dump_rows(VisitRead, visits)).body
+
+        assert body == _validated_json(VisitRead, visits)
+        assert b'"visitorInfo":{"userId":"alice"' in body
+
+    def test_missing_attributes_use_defaults(self):
+        dump = compile_dumper(VisitorInfo)
+
+        assert dump(SimpleNamespace(user_id="u1")) == {
+            "userId": "u1",
+            "userName": None,
+            "displayName": None,
+            "iconUrl": None,
+            "isAnonymous": False,
+        }
+
+    def test_rejects_unsupported_field_types(self):
+        class WithUUID(OrmBaseModel):
+            block_id: UUID
+
+        with pytest.raises(TypeError, match="Unsupported field type"):
+            compile_dumper(WithUUID)
+
+    def test_rejects_models_that_transform_values(self):
+        class Normalized(OrmBaseModel):
+            name: str
+
+            @field_validator("name")
+            @classmethod
+            def strip(cls, value: str) -> str:
+                return value.strip()
+
+        with pytest.raises(TypeError, match="customizes validation"):
+            compile_dumper(Normalized)
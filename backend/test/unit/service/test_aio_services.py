@@ -0,0 +1,220 @@
+import pytest
+
+from src.db.tables import MessageStatusEnum, MessageTypeEnum, NotificationLevelEnum
+from src.schema.block import BlockCreate
+from src.schema.message import MessageCreate
+from src.service import block_service, message_service, visit_service
+from src.service.aio import message_service as aio_message_service
+from src.service.aio import notification_service as aio_notification_service
+from src.service.aio import user_service as aio_user_service
+from src.service.aio import visit_service as aio_visit_service
+
+
+def _comment(to_user_id, content="Test message", parent_message_id=None):
+    return MessageCreate(
+        to_user_id=to_user_id,
+        message_type=MessageTypeEnum.comment,
+        content=content,
+        parent_message_id=parent_message_id,
+    )
+
+
+@pytest.mark.unit
+class TestAioMessageService:
+    def test_create_message_loads_relations(self, run_async_db, create_user):
+        create_user(user_id="from_user", user_name="fromuser")
+        create_user(user_id="to_user")
+
+        result = run_async_db(
+            aio_message_service.create_message, _comment("to_user"), "from_user"
+        )
+
+        assert result.status == MessageStatusEnum.unread
+        # セッション終了後も先読み済みの関連にアクセスできる
+        assert result.from_user.user_name == "fromuser"
+        assert result.replies == []
+
+    def test_create_message_blocked_user(
+        self, test_db_session, run_async_db, create_user
+    ):
+        create_user(user_id="blocker")
+        create_user(user_id="blocked")
+        block_service.create_block(
+            test_db_session, "blocker", BlockCreate(blocked_user_id="blocked")
+        )
+
+        with pytest.raises(
+            ValueError, match="Cannot send message to user who has blocked you"
+        ):
+            run_async_db(
+                aio_message_service.create_message, _comment("blocker"), "blocked"
+            )
+
+    def test_get_messages_with_replies_matches_sync(
+        self, test_db_session, run_async_db, create_user
+    ):
+        create_user(user_id="owner")
+        create_user(user_id="sender")
+
+        root = message_service.create_message(
+            test_db_session, _comment("owner", "root"), "sender"
+        )
+        reply = message_service.create_message(
+            test_db_session,
+            _comment("sender", "reply", parent_message_id=root.message_id),
+            "owner",
+        )
+        message_service.create_message(
+            test_db_session,
+            _comment("owner", "nested", parent_message_id=reply.message_id),
+            "sender",
+        )
+        message_service.create_message(
+            test_db_session,
+            MessageCreate(
+                to_user_id="owner",
+                message_type=MessageTypeEnum.like,
+                content="❤️",
+                parent_message_id=root.message_id,
+            ),
+            "sender",
+        )
+        message_service.create_message(
+            test_db_session, _comment("owner", "lonely"), "sender"
+        )
+
+        expected = {
+            m.message_id: m.reply_count
+            for m in message_service.get_messages_with_replies(test_db_session, "owner")
+        }
+        result = run_async_db(aio_message_service.get_messages_with_replies, "owner")
+
+        assert {m.message_id: m.reply_count for m in result} == expected
+        assert expected[root.message_id] == 2
+
+    def test_get_heart_states_for_messages(
+        self, test_db_session, run_async_db, create_user
+    ):
+        create_user(user_id="owner")
+        create_user(user_id="fan")
+
+        liked = message_service.create_message(
+            test_db_session, _comment("owner", "liked"), "fan"
+        )
+        other = message_service.create_message(
+            test_db_session, _comment("owner", "other"), "fan"
+        )
+        message_service.toggle_heart_reaction(test_db_session, "fan", liked.message_id)
+
+        result = run_async_db(
+            aio_message_service.get_heart_states_for_messages,
+            "fan",
+            [liked.message_id, other.message_id],
+        )
+
+        assert result == {
+            liked.message_id: {"user_liked": True, "like_count": 1},
+            other.message_id: {"user_liked": False, "like_count": 0},
+        }
+
+
+@pytest.mark.unit
+class TestAioNotificationService:
+    def test_mark_all_notifications_as_read(
+        self, test_db_session, run_async_db, create_user
+    ):
+        create_user(user_id="recipient")
+        create_user(user_id="sender")
+        for content in ("first", "second"):
+            message_service.create_message(
+                test_db_session, _comment("recipient", content), "sender"
+            )
+
+        notifications = run_async_db(
+            aio_notification_service.get_notifications_for_user, "recipient"
+        )
+        assert sorted(n.content for n in notifications) == ["first", "second"]
+        assert all(n.from_user.user_id == "sender" for n in notifications)
+
+        assert (
+            run_async_db(
+                aio_notification_service.mark_all_notifications_as_read, "recipient"
+            )
+            == 2
+        )
+        assert all(
+            m.status == MessageStatusEnum.read
+            for m in message_service.get_messages_for_user(test_db_session, "recipient")
+        )
+
+    def test_notification_level_none(self, test_db_session, run_async_db, create_user):
+        create_user(user_id="quiet", notification_level=NotificationLevelEnum.none)
+        create_user(user_id="sender")
+        message_service.create_message(test_db_session, _comment("quiet"), "sender")
+
+        assert (
+            run_async_db(aio_notification_service.get_notifications_for_user, "quiet")
+            == []
+        )
+        assert (
+            run_async_db(
+                aio_notification_service.mark_all_notifications_as_read, "quiet"
+            )
+            == 0
+        )
+
+
+@pytest.mark.unit
+class TestAioVisitService:
+    def test_record_visit_updates_recent_visit(
+        self, test_db_session, run_async_db, create_user
+    ):
+        create_user(user_id="visited")
+        create_user(user_id="visitor")
+
+        first = run_async_db(aio_visit_service.record_visit, "visited", "visitor")
+        second = run_async_db(aio_visit_service.record_visit, "visited", "visitor")
+
+        assert first.visit_id == second.visit_id
+        assert second.visited_at >= first.visited_at
+        assert run_async_db(aio_visit_service.get_visit_count, "visited") == 1
+        assert visit_service.get_visit_count(test_db_session, "visited") == 1
+
+    def test_record_visit_ignores_self_and_unknown(self, run_async_db, create_user):
+        create_user(user_id="visited")
+
+        assert (
+            run_async_db(aio_visit_service.record_visit, "visited", "visited") is None
+        )
+        assert run_async_db(aio_visit_service.record_visit, "missing", None) is None
+
+    def test_get_user_visits_matches_sync(
+        self, test_db_session, run_async_db, create_user
+    ):
+        create_user(user_id="visited")
+        create_user(user_id="visitor_a")
+        create_user(user_id="visitor_b")
+        for visitor in ("visitor_a", "visitor_b", None):
+            visit_service.record_visit(test_db_session, "visited", visitor)
+
+        expected = [
+            v.visit_id
+            for v in visit_service.get_user_visits(test_db_session, "visited")
+        ]
+        result = run_async_db(aio_visit_service.get_user_visits, "visited")
+
+        assert [v.visit_id for v in result] == expected
+
+
+@pytest.mark.unit
+class TestAioUserService:
+    def test_get_user_snapshot_by_username(self, run_async_db, create_user):
+        create_user(user_id="user_1", user_name="alice")
+
+        snapshot = run_async_db(aio_user_service.get_user_snapshot_by_username, "alice")
+
+        assert snapshot.user_id == "user_1"
+        assert (
+            run_async_db(aio_user_service.get_user_snapshot_by_username, "nobody")
+            is None
+        )
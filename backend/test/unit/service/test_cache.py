@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.service.cache import TTLCache
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    def test_get_set_and_stats(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        assert cache.get("key") is None
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # a を最近使用したことにする
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_expires_after_ttl(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        with patch("src.service.cache.time.monotonic", return_value=1000.0):
+            cache.set("key", "value")
+        with patch("src.service.cache.time.monotonic", return_value=1059.0):
+            assert cache.get("key") == "value"
+        with patch("src.service.cache.time.monotonic", return_value=1060.0):
+            assert cache.get("key") is None
+
+        assert len(cache) == 0
+
+    def test_pop_and_clear(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.pop("a")
+        cache.pop("missing")
+        assert cache.get("a") is None
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 0
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from src.service import metrics
+from src.service.loop_monitor import LoopMonitor
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    calls = []
+    for level in ("warning", "info"):
+        monkeypatch.setattr(
+            f"src.service.loop_monitor.logger.{level}",
+            lambda event, **kw: calls.append((event, kw)),
+        )
+    return calls
+
+
+def block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def _run_monitor(monitor: LoopMonitor, body) -> None:
+    await monitor.start()
+    try:
+        await body()
+    finally:
+        await monitor.stop()
+
+
+@pytest.mark.unit
+class TestLoopMonitor:
+    def test_records_lag_and_threadpool_wait(self, logged):
+        monitor = LoopMonitor(interval=0.01, lag_threshold=1.0, probe_interval=0.01)
+
+        async def body():
+            # 初回のプローブはスレッドプールの起動を待つため、固定時間ではなく記録されるまで待つ
+            deadline = time.monotonic() + 2.0
+            while time.monotonic() < deadline and not (
+                metrics.EVENT_LOOP_LAG.count() and metrics.THREADPOOL_QUEUE_WAIT.count()
+            ):
+                await asyncio.sleep(0.01)
+
+        asyncio.run(_run_monitor(monitor, body))
+
+        assert metrics.EVENT_LOOP_LAG.count() > 0
+        assert metrics.THREADPOOL_QUEUE_WAIT.count() > 0
+        assert logged == []
+
+    def test_logs_blocking_stack_once_per_stall(self, logged):
+        monitor = LoopMonitor(interval=0.01, lag_threshold=0.05, probe_interval=1.0)
+
+        async def body():
+            await asyncio.sleep(0.03)
+            block_the_loop(0.3)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(_run_monitor(monitor, body))
+
+        events = [event for event, _ in logged]
+        assert events == ["Event loop blocked", "Event loop recovered"]
+        blocked = logged[0][1]
+        assert "block_the_loop" in blocked["stack"]
+        assert blocked["blocked_seconds"] >= 0.05
+        assert logged[1][1]["blocked_seconds"] >= 0.2
+        assert metrics.EVENT_LOOP_BLOCKED.value() == 1
+        assert "event_loop_blocked_total 1" in metrics.render_registry()
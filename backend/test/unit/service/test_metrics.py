@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+from src.db.pool import TimedQueuePool
+from src.service import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.mark.unit
+class TestMetrics:
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = metrics.Histogram(
+            "latency_seconds", "test", ("route",), buckets=(0.1, 1.0)
+        )
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, "/users")
+
+        rendered = histogram.render().splitlines()
+
+        assert 'latency_seconds_bucket{route="/users",le="0.1"} 1' in rendered
+        assert 'latency_seconds_bucket{route="/users",le="1.0"} 3' in rendered
+        assert 'latency_seconds_bucket{route="/users",le="+Inf"} 4' in rendered
+        assert 'latency_seconds_count{route="/users"} 4' in rendered
+        assert histogram.count("/users") == 4
+
+    def test_counter_escapes_label_values(self):
+        counter = metrics.Counter("errors_total", "test", ("route",))
+        counter.inc('/a"b')
+        counter.inc('/a"b', amount=2)
+
+        assert 'errors_total{route="/a\\"b"} 3' in counter.render()
+
+    def test_worker_label_is_added_to_every_sample(self, monkeypatch):
+        monkeypatch.setattr(metrics, "_worker_labels", {})
+        metrics.set_worker(2)
+        counter = metrics.Counter("errors_total", "test", ("route",))
+        counter.inc("/a")
+
+        rendered = "\n".join(
+            [
+                counter.render(),
+                *metrics.render_log_queue({"queued": 3, "dropped": 0, "batches": 1}),
+            ]
+        )
+
+        assert 'errors_total{worker="2",route="/a"} 1' in rendered
+        assert 'log_queue_depth{worker="2"} 3' in rendered
+
+    def test_render_counters_names_totals(self):
+        rendered = "\n".join(
+            metrics.render_counters(
+                "twitter_api",
+                "endpoint",
+                {"token": {"requests": 2, "total_seconds": 0.5}},
+            )
+        )
+
+        assert 'twitter_api_requests_total{endpoint="token"} 2' in rendered
+        assert 'twitter_api_seconds_total{endpoint="token"} 0.5' in rendered
+
+    def test_instrumented_engine_counts_queries_per_request(self):
+        engine = create_engine("sqlite://")
+        metrics.instrument_engine(engine, "test")
+        stats = metrics.RequestDBStats()
+        token = metrics.request_db_stats.set(stats)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        finally:
+            metrics.request_db_stats.reset(token)
+
+        assert stats.queries == 2
+        assert stats.seconds > 0
+        assert metrics.DB_QUERY_DURATION.count("test") == 2
+
+    def test_failed_statements_leave_no_state_on_connection(self):
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1)
+        metrics.instrument_engine(engine, "test")
+
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+            info = dict(conn.info)
+
+        assert info == {}
+        assert metrics.DB_QUERY_DURATION.count("test") == 1
+
+    def test_query_timer_is_installed_once(self):
+        engine = create_engine("sqlite://")
+        metrics.install_query_timer(engine)
+        metrics.instrument_engine(engine, "test")
+
+        assert event.contains(
+            engine, "before_cursor_execute", metrics._start_query_timer
+        )
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert metrics.DB_QUERY_DURATION.count("test") == 1
+
+    def test_timed_pool_records_checkout_wait(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool
+        )
+        with engine.connect():
+            pass
+
+        rendered = "\n".join(metrics.render_pools({"sync": engine.pool}))
+
+        assert isinstance(engine.pool, QueuePool)
+        assert metrics.DB_POOL_CHECKOUT_WAIT.count("sync") == 1
+        assert 'db_pool_checked_out{engine="sync"} 0' in rendered
+        assert 'db_pool_size{engine="sync"} 5' in rendered
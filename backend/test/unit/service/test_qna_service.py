@@ -1,9 +1,10 @@
+from datetime import datetime
 from unittest.mock import Mock, patch
 
 import pytest
 
-from src.db.tables import Answer, Question
-from src.schema.answer import AnswerCreate
+from src.db.tables import Answer, AnswerLike, Question
+from src.schema.answer import AnswerBulkItem, AnswerBulkUpsert, AnswerCreate
 from src.service import qna_service
 
 
@@ -111,6 +112,36 @@ class TestQnaService:
         assert result.answer_text == "これは私の回答です"
         assert result.answer_id is not None
 
+    def test_create_answer_upserts_existing(
+        self, test_db_session, create_user, create_question, create_answer
+    ):
+        user = create_user(user_id="test_user")
+        question = create_question()
+        existing = create_answer(user.user_id, question.question_id, "最初の回答")
+        existing.created_at = datetime(2020, 1, 1)
+        test_db_session.commit()
+
+        result = qna_service.create_answer(
+            test_db_session,
+            user.user_id,
+            question.question_id,
+            AnswerCreate(answer_text="編集後の回答"),
+        )
+
+        assert result.answer_id == existing.answer_id
+        assert result.answer_text == "編集後の回答"
+        # 編集すると created_at は最終編集時刻になる
+        assert result.created_at > datetime(2020, 1, 1)
+        assert (
+            test_db_session.query(Answer)
+            .filter(
+                Answer.user_id == user.user_id,
+                Answer.question_id == question.question_id,
+            )
+            .count()
+            == 1
+        )
+
     def test_get_answer_with_question(
         self, test_db_session, create_user, create_question, create_answer
     ):
@@ -248,3 +279,184 @@ class TestQnaService:
         assert len(answered) == 1
         assert len(unanswered) == 1
         assert unanswered[0].answer_id == 0  # 未回答の場合のデフォルト値
+
+    def test_bulk_upsert_answers_inserts_and_updates(
+        self, test_db_session, create_user, create_question, create_answer
+    ):
+        user = create_user(user_id="test_user")
+        question1 = create_question(category_id="personality", text="質問1")
+        question2 = create_question(
+            category_id="personality", text="質問2", display_order=2
+        )
+        create_question(category_id="personality", text="質問3", display_order=3)
+        existing = create_answer(user.user_id, question1.question_id, "古い回答")
+        existing.created_at = datetime(2020, 1, 1)
+        test_db_session.commit()
+
+        bulk_in = AnswerBulkUpsert(
+            answers=[
+                AnswerBulkItem(
+                    question_id=question1.question_id, answer_text="新しい回答"
+                ),
+                AnswerBulkItem(question_id=question2.question_id, answer_text="回答2"),
+            ]
+        )
+        result = qna_service.bulk_upsert_answers(
+            test_db_session, user.user_id, "personality", bulk_in
+        )
+
+        assert result.template_id == "personality"
+        assert [a.answer_text for a in result.answers] == ["新しい回答", "回答2", ""]
+        assert result.answers[0].answer_id == existing.answer_id
+        assert result.answers[1].answer_id != 0
+        test_db_session.refresh(existing)
+        assert existing.created_at > datetime(2020, 1, 1)
+        assert (
+            test_db_session.query(Answer).filter(Answer.user_id == user.user_id).count()
+            == 2
+        )
+
+    def test_bulk_upsert_answers_rejects_question_outside_category(
+        self, test_db_session, create_user, create_question
+    ):
+        user = create_user(user_id="test_user")
+        question = create_question(category_id="lifestyle", text="別カテゴリの質問")
+
+        bulk_in = AnswerBulkUpsert(
+            answers=[AnswerBulkItem(question_id=question.question_id, answer_text="x")]
+        )
+        with pytest.raises(ValueError, match="Question not found in category"):
+            qna_service.bulk_upsert_answers(
+                test_db_session, user.user_id, "personality", bulk_in
+            )
+
+        assert test_db_session.query(Answer).count() == 0
+
+    @pytest.mark.parametrize(
+        "user_id,category_id,expected_error",
+        [
+            ("nonexistent_user", "personality", "User not found"),
+            ("test_user", "nonexistent_category", "Category not found"),
+        ],
+    )
+    def test_bulk_upsert_answers_not_found(
+        self,
+        test_db_session,
+        create_user,
+        create_question,
+        user_id,
+        category_id,
+        expected_error,
+    ):
+        create_user(user_id="test_user")
+        question = create_question(category_id="personality")
+
+        bulk_in = AnswerBulkUpsert(
+            answers=[AnswerBulkItem(question_id=question.question_id, answer_text="x")]
+        )
+        with pytest.raises(ValueError, match=expected_error):
+            qna_service.bulk_upsert_answers(
+                test_db_session, user_id, category_id, bulk_in
+            )
+
+    def test_set_answer_like_is_idempotent(
+        self, test_db_session, create_user, create_question, create_answer
+    ):
+        owner = create_user(user_id="owner_user")
+        liker = create_user(user_id="liker_user")
+        question = create_question()
+        answer = create_answer(owner.user_id, question.question_id)
+
+        first = qna_service.set_answer_like(
+            test_db_session, liker.user_id, answer.answer_id, liked=True
+        )
+        second = qna_service.set_answer_like(
+            test_db_session, liker.user_id, answer.answer_id, liked=True
+        )
+
+        assert first == {"user_liked": True, "like_count": 1}
+        assert second == {"user_liked": True, "like_count": 1}
+        assert test_db_session.query(AnswerLike).count() == 1
+
+        unliked = qna_service.set_answer_like(
+            test_db_session, liker.user_id, answer.answer_id, liked=False
+        )
+        unliked_again = qna_service.set_answer_like(
+            test_db_session, liker.user_id, answer.answer_id, liked=False
+        )
+
+        assert unliked == {"user_liked": False, "like_count": 0}
+        assert unliked_again == {"user_liked": False, "like_count": 0}
+
+    def test_toggle_answer_like(
+        self, test_db_session, create_user, create_question, create_answer
+    ):
+        owner = create_user(user_id="owner_user")
+        liker = create_user(user_id="liker_user")
+        question = create_question()
+        answer = create_answer(owner.user_id, question.question_id)
+
+        liked = qna_service.toggle_answer_like(
+            test_db_session, liker.user_id, answer.answer_id
+        )
+        unliked = qna_service.toggle_answer_like(
+            test_db_session, liker.user_id, answer.answer_id
+        )
+
+        assert liked == {"user_liked": True, "like_count": 1}
+        assert unliked == {"user_liked": False, "like_count": 0}
+
+    def test_set_answer_like_answer_not_found(self, test_db_session, create_user):
+        user = create_user(user_id="liker_user")
+
+        with pytest.raises(ValueError, match="Answer not found"):
+            qna_service.set_answer_like(test_db_session, user.user_id, 99999, True)
+
+    def test_get_answer_like_states(
+        self, test_db_session, create_user, create_question, create_answer
+    ):
+        owner = create_user(user_id="owner_user")
+        liker = create_user(user_id="liker_user")
+        other = create_user(user_id="other_user")
+        question1 = create_question(text="質問1")
+        question2 = create_question(text="質問2", display_order=2)
+        answer1 = create_answer(owner.user_id, question1.question_id)
+        answer2 = create_answer(owner.user_id, question2.question_id)
+
+        qna_service.set_answer_like(
+            test_db_session, liker.user_id, answer1.answer_id, True
+        )
+        qna_service.set_answer_like(
+            test_db_session, other.user_id, answer1.answer_id, True
+        )
+        qna_service.set_answer_like(
+            test_db_session, other.user_id, answer2.answer_id, True
+        )
+
+        result = qna_service.get_answer_like_states(
+            test_db_session, liker.user_id, [answer1.answer_id, answer2.answer_id]
+        )
+
+        assert result[answer1.answer_id] == {"user_liked": True, "like_count": 2}
+        assert result[answer2.answer_id] == {"user_liked": False, "like_count": 1}
+
+    def test_get_user_qna_embeds_like_states(
+        self, test_db_session, create_user, create_question, create_answer
+    ):
+        owner = create_user(user_id="owner_user")
+        viewer = create_user(user_id="viewer_user")
+        question = create_question(category_id="personality")
+        answer = create_answer(owner.user_id, question.question_id)
+        qna_service.set_answer_like(
+            test_db_session, viewer.user_id, answer.answer_id, True
+        )
+
+        as_viewer = qna_service.get_user_qna(
+            test_db_session, owner.user_id, viewer_user_id=viewer.user_id
+        )
+        as_anonymous = qna_service.get_user_qna(test_db_session, owner.user_id)
+
+        assert as_viewer[0].answers[0].like_count == 1
+        assert as_viewer[0].answers[0].user_liked is True
+        assert as_anonymous[0].answers[0].like_count == 1
+        assert as_anonymous[0].answers[0].user_liked is False
@@ -0,0 +1,146 @@
+import sqlite3
+from unittest.mock import Mock
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.service.rate_limiter import (
+    MemoryRateLimitBackend,
+    Rate,
+    RateLimiter,
+    SQLiteRateLimitBackend,
+)
+from src.service.token_service import TokenService
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryRateLimitBackend()
+    return SQLiteRateLimitBackend(str(tmp_path / "rate_limit.sqlite3"))
+
+
+def _client(limiter: RateLimiter, rate: str, per: str = "ip") -> TestClient:
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(limiter.limit(rate, per=per))])
+    def limited():
+        return {"ok": True}
+
+    @app.get("/other", dependencies=[Depends(limiter.limit(rate, per=per))])
+    def other():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    def test_parse_rate(self):
+        rate = Rate.parse("10/minute")
+
+        assert (rate.count, rate.period) == (10, 60)
+        assert rate.refill_per_second == pytest.approx(10 / 60)
+        assert Rate.parse("100 / hours").period == 3600
+        with pytest.raises(ValueError):
+            Rate.parse("ten per minute")
+        with pytest.raises(ValueError):
+            Rate.parse("0/second")
+
+    def test_bucket_allows_burst_then_refills(self, backend):
+        for _ in range(3):
+            assert backend.consume("key", 3, 1.0) == 0
+
+        retry_after = backend.consume("key", 3, 1.0)
+        assert 0 < retry_after <= 1.0
+        # 他のキーには影響しない
+        assert backend.consume("other", 3, 1.0) == 0
+
+    def test_bucket_refills_over_time(self, backend, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("src.service.rate_limiter.time.monotonic", lambda: clock[0])
+        monkeypatch.setattr("src.service.rate_limiter.time.time", lambda: clock[0])
+
+        assert backend.consume("key", 1, 0.5) == 0
+        assert backend.consume("key", 1, 0.5) == pytest.approx(2.0)
+
+        clock[0] += 2.0
+        assert backend.consume("key", 1, 0.5) == 0
+
+    def test_reset_clears_buckets(self, backend):
+        backend.consume("key", 1, 0.01)
+        assert backend.consume("key", 1, 0.01) > 0
+
+        backend.reset()
+
+        assert backend.consume("key", 1, 0.01) == 0
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryRateLimitBackend(maxsize=2)
+        backend.consume("a", 1, 0.01)
+        backend.consume("b", 1, 0.01)
+        backend.consume("c", 1, 0.01)
+
+        assert backend.consume("a", 1, 0.01) == 0
+        assert backend.consume("c", 1, 0.01) > 0
+
+    def test_sqlite_backend_is_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "rate_limit.sqlite3")
+        worker_a = SQLiteRateLimitBackend(path)
+        worker_b = SQLiteRateLimitBackend(path)
+
+        assert worker_a.consume("key", 2, 0.01) == 0
+        assert worker_b.consume("key", 2, 0.01) == 0
+        assert worker_a.consume("key", 2, 0.01) > 0
+
+        rows = sqlite3.connect(path).execute("SELECT COUNT(*) FROM rate_limit_buckets")
+        assert rows.fetchone() == (1,)
+
+    def test_limit_returns_429_with_retry_after_per_route(self, backend):
+        client = _client(RateLimiter(backend), "2/minute")
+
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 200
+        response = client.get("/limited")
+
+        assert response.status_code == 429
+        assert response.json() == {"detail": "Rate limit exceeded: 2/minute"}
+        assert response.headers["Retry-After"] == "30"
+        # ルートごとにバケツは別
+        assert client.get("/other").status_code == 200
+
+    def test_limit_per_user_uses_token_subject(self):
+        client = _client(RateLimiter(MemoryRateLimitBackend()), "1/minute", "user")
+
+        for user_id in ("alice", "bob"):
+            client.cookies.set(
+                "access_token", TokenService.create_access_token(user_id)
+            )
+            assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 429
+
+        # 無効なトークンはIPアドレスで数える
+        client.cookies.set("access_token", "invalid")
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 429
+
+    def test_disabled_limiter_skips_backend(self):
+        backend = Mock()
+        client = _client(RateLimiter(backend, enabled=False), "1/minute")
+
+        for _ in range(3):
+            assert client.get("/limited").status_code == 200
+        backend.consume.assert_not_called()
+
+    def test_backend_failure_allows_request(self):
+        backend = Mock(blocking=True)
+        backend.consume.side_effect = ConnectionError("down")
+        client = _client(RateLimiter(backend), "1/minute")
+
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 200
+
+    def test_unknown_key_is_rejected(self):
+        with pytest.raises(ValueError):
+            RateLimiter(MemoryRateLimitBackend()).limit("1/minute", per="session")
@@ -0,0 +1,146 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from src.db.tables import RevokedToken
+from src.service.revocation_store import (
+    BloomFilter,
+    BloomFilteredRevocationStore,
+    DatabaseRevocationStore,
+    MemoryRevocationStore,
+    hash_token,
+)
+
+
+@pytest.fixture
+def revocation_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    RevokedToken.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+def _wait_for_refresh(store: BloomFilteredRevocationStore) -> None:
+    deadline = time.monotonic() + 5
+    while store._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not store._refreshing
+
+
+def _in(seconds: int) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+@pytest.mark.unit
+class TestRevocationStore:
+    def test_hash_token_is_stable_digest(self):
+        assert hash_token("token") == hash_token("token")
+        assert hash_token("token") != hash_token("other")
+        assert len(hash_token("token")) == 64
+
+    def test_memory_store_revokes_until_expiry(self):
+        store = MemoryRevocationStore()
+
+        store.revoke("active", _in(60))
+        store.revoke("already_expired", _in(-60))
+
+        assert store.is_revoked("active") is True
+        assert store.is_revoked("already_expired") is False
+        assert store.is_revoked("unknown") is False
+        assert list(store.active_hashes()) == ["active"]
+
+    def test_database_store_is_shared_between_instances(self, revocation_engine):
+        worker_a = DatabaseRevocationStore(revocation_engine)
+        worker_b = DatabaseRevocationStore(revocation_engine)
+
+        worker_a.revoke("shared", _in(60))
+        worker_a.revoke("shared", _in(60))  # 二重失効しても失敗しない
+
+        assert worker_b.is_revoked("shared") is True
+        assert worker_b.is_revoked("unknown") is False
+        assert list(worker_b.active_hashes()) == ["shared"]
+
+    def test_database_store_ignores_and_purges_expired(self, revocation_engine):
+        store = DatabaseRevocationStore(revocation_engine)
+
+        store.revoke("expired", _in(-60))
+        assert store.is_revoked("expired") is False
+
+        store.revoke("fresh", _in(60))
+        assert list(store.active_hashes()) == ["fresh"]
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000)
+        keys = [hash_token(str(i)) for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        assert all(key in bloom for key in keys)
+        false_positives = sum(hash_token(f"x{i}") in bloom for i in range(1000))
+        assert false_positives < 50
+
+    def test_bloom_front_skips_backend_for_unknown_tokens(self):
+        backend = Mock()
+        backend.active_hashes.return_value = []
+        store = BloomFilteredRevocationStore(backend, capacity=1000, sync_interval=60)
+
+        assert store.is_revoked("never_revoked") is False
+        backend.is_revoked.assert_not_called()
+
+        backend.is_revoked.return_value = True
+        store.revoke("revoked", _in(60))
+        assert store.is_revoked("revoked") is True
+        assert store.backend_lookups == 1
+
+    def test_bloom_front_syncs_revocations_from_other_workers(self, revocation_engine):
+        shared = DatabaseRevocationStore(revocation_engine)
+        store = BloomFilteredRevocationStore(
+            DatabaseRevocationStore(revocation_engine), capacity=1000, sync_interval=0
+        )
+
+        assert store.is_revoked("other_worker") is False
+        shared.revoke("other_worker", _in(60))
+        # 2回目以降の同期はバックグラウンドで行われる
+        store.is_revoked("other_worker")
+        _wait_for_refresh(store)
+
+        assert store.is_revoked("other_worker") is True
+
+    def test_bloom_front_rebuilds_without_blocking_requests(self):
+        backend = Mock()
+        backend.active_hashes.return_value = []
+        backend.is_revoked.return_value = True
+        store = BloomFilteredRevocationStore(backend, capacity=1000, sync_interval=0)
+        store.is_revoked("warmup")  # 初回の同期はその場で行う
+
+        scanning = threading.Event()
+        release = threading.Event()
+
+        def slow_scan():
+            scanning.set()
+            release.wait(5)
+            return ["from_other_worker"]
+
+        backend.active_hashes.side_effect = slow_scan
+        assert store.is_revoked("unknown") is False
+        assert scanning.wait(5)
+
+        # 再構築中もリクエスト側は待たされず、失効操作も失われない
+        assert store.is_revoked("unknown") is False
+        store.revoke("revoked_meanwhile", _in(60))
+        assert backend.active_hashes.call_count == 2
+
+        release.set()
+        _wait_for_refresh(store)
+        store.sync_interval = 60
+        assert store.is_revoked("from_other_worker") is True
+        assert store.is_revoked("revoked_meanwhile") is True
@@ -1,11 +1,15 @@
+import time
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
 import jwt
 import pytest
 from fastapi import HTTPException
 
 from src.config.env_config import SECRET_KEY
-from src.service.token_service import TokenService
+from src.db.tables import NotificationLevelEnum
+from src.service import cache as cache_module
+from src.service.token_service import TokenService, verified_tokens
 
 
 class TestTokenService:
@@ -140,3 +144,103 @@ class TestTokenService:
 
         assert TokenService.verify_csrf_token(token1) is True
         assert TokenService.verify_csrf_token(token2) is True
+
+    def test_create_access_token_with_user_claims(self):
+        user = SimpleNamespace(
+            user_name="claimsuser",
+            notification_level=NotificationLevelEnum.important,
+            security_stamp="stamp123",
+        )
+        token = TokenService.create_access_token("claims_user", user)
+
+        payload = TokenService.verify_token(token, "access")
+        claims_user = TokenService.get_claims_user(payload)
+
+        assert claims_user is not None
+        assert claims_user.user_id == "claims_user"
+        assert claims_user.user_name == "claimsuser"
+        assert claims_user.notification_level == NotificationLevelEnum.important
+        assert claims_user.security_stamp == "stamp123"
+
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            None,
+            {"v": 999, "name": "u", "nl": "all", "ss": "stamp"},
+            {"v": 1, "name": "u", "nl": "all", "ss": ""},
+            {"v": 1, "name": "u", "nl": "unknown", "ss": "stamp"},
+            {"v": 1, "nl": "all", "ss": "stamp"},
+        ],
+    )
+    def test_get_claims_user_rejects_unusable_claims(self, claims):
+        payload = {"sub": "user", "type": "access"}
+        if claims is not None:
+            payload["usr"] = claims
+
+        assert TokenService.get_claims_user(payload) is None
+
+    def test_revoke_security_stamp(self):
+        TokenService.revoke_security_stamp("revoked_stamp")
+        TokenService.revoke_security_stamp(None)
+
+        assert TokenService.is_security_stamp_revoked("revoked_stamp") is True
+        assert TokenService.is_security_stamp_revoked("other_stamp") is False
+        assert TokenService.is_security_stamp_revoked("") is False
+
+    def test_verify_token_uses_verification_cache(self):
+        token = TokenService.create_access_token("cached_user")
+        before = TokenService.verification_cache_stats()
+
+        first = TokenService.verify_token(token, "access")
+        second = TokenService.verify_token(token, "access")
+        stats = TokenService.verification_cache_stats()
+
+        assert first == second
+        assert stats["misses"] == before["misses"] + 1
+        assert stats["hits"] == before["hits"] + 1
+
+    def test_verification_cache_checks_type_and_revocation(self):
+        token = TokenService.create_refresh_token("cached_refresh_user")
+        TokenService.verify_token(token, "refresh")
+
+        with pytest.raises(HTTPException) as exc_info:
+            TokenService.verify_token(token, "access")
+        assert exc_info.value.detail == "Invalid token type"
+
+        TokenService.blacklist_refresh_token(token)
+        with pytest.raises(HTTPException) as exc_info:
+            TokenService.verify_token(token, "refresh")
+        assert exc_info.value.detail == "Token has been revoked"
+
+    def test_verification_cache_expires_with_token(self, monkeypatch):
+        payload = {
+            "sub": "short_lived",
+            "type": "access",
+            "exp": datetime.now(timezone.utc) + timedelta(seconds=30),
+        }
+        token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+        TokenService.verify_token(token, "access")
+        assert TokenService.verify_token(token, "access")["sub"] == "short_lived"
+
+        # exp を過ぎたエントリはキャッシュから外れ、再検証される
+        now = time.monotonic()
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 60)
+        before_misses = verified_tokens.misses
+        TokenService.verify_token(token, "access")
+        assert verified_tokens.misses == before_misses + 1
+
+    def test_verification_cache_skips_rejected_tokens(self):
+        expired = jwt.encode(
+            {
+                "sub": "expired_user",
+                "type": "access",
+                "exp": datetime.now(timezone.utc) - timedelta(seconds=1),
+            },
+            SECRET_KEY,
+            algorithm="HS256",
+        )
+        size_before = len(verified_tokens)
+
+        assert TokenService.get_user_id_from_token(expired) is None
+        assert TokenService.verify_csrf_token("not.a.token") is False
+        assert len(verified_tokens) == size_before
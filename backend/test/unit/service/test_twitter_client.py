@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.service import twitter_client
+from src.service.twitter_client import (
+    TWITTER_TOKEN_URL,
+    TWITTER_USER_ME_URL,
+    TwitterAPIError,
+    TwitterClient,
+)
+
+
+def _client(handler, **kwargs) -> TwitterClient:
+    return TwitterClient(
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs
+    )
+
+
+@pytest.mark.unit
+class TestTwitterClient:
+    def test_exchange_code_and_get_me(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            if request.url == TWITTER_TOKEN_URL:
+                return httpx.Response(200, json={"access_token": "twitter_token"})
+            return httpx.Response(200, json={"data": {"id": "1"}})
+
+        client = _client(handler)
+
+        async def run():
+            token = await client.exchange_code("code", "verifier", "http://cb")
+            me = await client.get_me(token["access_token"])
+            await client.aclose()
+            return me
+
+        assert asyncio.run(run()) == {"data": {"id": "1"}}
+        assert b"code_verifier=verifier" in requests[0].content
+        assert requests[1].url.copy_with(query=None) == TWITTER_USER_ME_URL
+        assert requests[1].headers["Authorization"] == "Bearer twitter_token"
+        assert client.stats()["token"]["requests"] == 1
+        assert client.stats()["users_me"]["requests"] == 1
+
+    def test_retries_rate_limited_request(self):
+        responses = iter(
+            [
+                httpx.Response(429, headers={"Retry-After": "0"}),
+                httpx.Response(200, json={"data": {"id": "1"}}),
+            ]
+        )
+        client = _client(lambda request: next(responses))
+
+        assert asyncio.run(client.get_me("token")) == {"data": {"id": "1"}}
+        stats = client.stats()["users_me"]
+        assert stats["requests"] == 2
+        assert stats["rate_limited"] == 1
+        assert stats["retries"] == 1
+
+    def test_gives_up_when_backoff_exceeds_budget(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(429, headers={"Retry-After": "60"})
+
+        client = _client(handler, max_backoff=5)
+
+        with pytest.raises(TwitterAPIError) as exc_info:
+            asyncio.run(client.get_me("token"))
+        assert exc_info.value.status_code == 429
+        assert len(calls) == 1
+
+    def test_retries_connect_errors_up_to_limit(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            raise httpx.ConnectError("connection refused", request=request)
+
+        client = _client(handler, max_retries=1, max_backoff=1)
+
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(client.get_me("token"))
+        assert len(calls) == 2
+        assert client.stats()["users_me"]["errors"] == 2
+
+    def test_does_not_retry_client_errors(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(400, text="invalid_grant")
+
+        client = _client(handler)
+
+        with pytest.raises(TwitterAPIError) as exc_info:
+            asyncio.run(client.exchange_code("code", "verifier", "http://cb"))
+        assert exc_info.value.detail == "invalid_grant"
+        assert len(calls) == 1
+
+    def test_default_client_can_use_http2(self, monkeypatch):
+        # h2 が依存関係に無いと、http2=True のクライアントは作成時に ImportError になる
+        monkeypatch.setattr(twitter_client, "TWITTER_HTTP2", True)
+
+        client = twitter_client._create_http_client()
+
+        asyncio.run(client.aclose())
@@ -2,9 +2,11 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import event
 
 from src.schema.user import UserCreate
-from src.service import user_service
+from src.service import qna_service, user_cache, user_service, visit_service
+from src.service.user_cache import UserSnapshot
 
 
 @pytest.mark.unit
@@ -103,6 +105,31 @@ class TestUserService:
         assert result.bio == "New bio"
         assert result.icon_url == "https://example.com/new_avatar.jpg"
 
+    def test_upsert_user_releases_user_name_of_another_account(
+        self, test_db_session, create_user
+    ):
+        create_user(user_id="old_account", user_name="takenname")
+        user_cache.put(
+            UserSnapshot.from_user(
+                user_service.get_user(test_db_session, "old_account")
+            )
+        )
+
+        result = user_service.upsert_user(
+            test_db_session,
+            UserCreate(
+                user_id="new_account", user_name="takenname", display_name="New"
+            ),
+        )
+
+        assert result.user_id == "new_account"
+        assert result.user_name == "takenname"
+        assert user_service.get_user(test_db_session, "old_account").user_name == (
+            "~old_account"
+        )
+        assert user_cache.user_id_by_name.get("takenname") == "new_account"
+        assert user_cache.snapshot_by_id.get("old_account") is None
+
     def test_delete_user_success(self, test_db_session, create_user):
         create_user(
             user_id="delete_user", user_name="deleteuser", display_name="Delete Me"
@@ -116,6 +143,22 @@ class TestUserService:
         deleted_user = user_service.get_user(test_db_session, "delete_user")
         assert deleted_user is None
 
+    def test_delete_user_decrements_answer_like_counts(
+        self, test_db_session, create_user, create_question, create_answer
+    ):
+        owner = create_user(user_id="owner_user", user_name="owneruser")
+        create_user(user_id="delete_user", user_name="deleteuser")
+        question = create_question()
+        answer = create_answer(owner.user_id, question.question_id)
+        qna_service.set_answer_like(
+            test_db_session, "delete_user", answer.answer_id, True
+        )
+
+        user_service.delete_user(test_db_session, "delete_user")
+
+        test_db_session.refresh(answer)
+        assert answer.like_count == 0
+
     def test_delete_user_not_found(self, test_db_session):
         """存在しないユーザーの削除"""
         result = user_service.delete_user(test_db_session, "nonexistent_user")
@@ -153,8 +196,61 @@ class TestUserService:
 
         user_service.upsert_user(test_db_session, user_data)
 
-        # initialize_default_questions はユーザーIDではなくセッションのみで呼ばれる
-        mock_init_questions.assert_called_once_with(test_db_session)
+        # 質問の初期化はユーザー作成と同じトランザクションで行う
+        mock_init_questions.assert_called_once_with(test_db_session, commit=False)
+
+    @patch("src.service.user_service.initialize_default_questions")
+    def test_upsert_user_existing_skips_initialization(
+        self, mock_init_questions, test_db_session, create_user
+    ):
+        create_user(user_id="login_user", user_name="loginuser")
+
+        result = user_service.upsert_user(
+            test_db_session,
+            UserCreate(
+                user_id="login_user", user_name="renamed", display_name="Renamed"
+            ),
+        )
+
+        mock_init_questions.assert_not_called()
+        assert result.user_name == "renamed"
+        assert result.last_login_at is not None
+        assert user_service.get_profile_items(test_db_session, "login_user") == []
+
+    def test_upsert_user_creates_default_profile_items(self, test_db_session):
+        user_service.upsert_user(
+            test_db_session,
+            UserCreate(user_id="new_user", user_name="newuser", display_name="New"),
+        )
+
+        items = user_service.get_profile_items(test_db_session, "new_user")
+        assert [item.display_order for item in items] == list(range(1, len(items) + 1))
+        assert items
+        assert user_service.get_user(test_db_session, "new_user").last_login_at
+
+    def test_upsert_user_existing_is_single_statement(
+        self, test_db_session, test_db_engine, create_user
+    ):
+        create_user(user_id="login_user", user_name="loginuser")
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        event.listen(test_db_engine, "before_cursor_execute", count_statement)
+        try:
+            user = user_service.upsert_user(
+                test_db_session,
+                UserCreate(
+                    user_id="login_user", user_name="loginuser", display_name="User"
+                ),
+            )
+        finally:
+            event.remove(test_db_engine, "before_cursor_execute", count_statement)
+
+        assert len(statements) == 1
+        assert user_cache.snapshot_by_id.get("login_user").display_name == "User"
+        assert user.user_id == "login_user"
 
     @pytest.mark.parametrize(
         "discover_type,limit,setup_func",
@@ -257,3 +353,48 @@ class TestUserService:
     def test_update_last_login_user_not_found(self, test_db_session):
         # 存在しないユーザーの最終ログイン時刻更新
         user_service.update_last_login(test_db_session, "nonexistent_user")
+
+    def test_get_user_snapshot_by_username_is_cached(
+        self, test_db_session, create_user
+    ):
+        create_user(user_id="cached_user", user_name="cacheduser")
+
+        first = user_service.get_user_snapshot_by_username(
+            test_db_session, "cacheduser"
+        )
+        with patch("src.service.user_service.get_user_by_username") as mock_lookup:
+            second = user_service.get_user_snapshot_by_username(
+                test_db_session, "cacheduser"
+            )
+
+        mock_lookup.assert_not_called()
+        assert first is second
+        assert second.user_id == "cached_user"
+        assert user_cache.stats()["user_snapshot"]["hits"] == 1
+
+    def test_get_user_snapshot_not_found_is_not_cached(self, test_db_session):
+        assert user_service.get_user_snapshot(test_db_session, "missing") is None
+        assert len(user_cache.snapshot_by_id) == 0
+
+    def test_user_snapshot_invalidated_on_visibility_change(
+        self, test_db_session, create_user
+    ):
+        create_user(user_id="visible_user", user_name="visibleuser")
+
+        before = user_service.get_user_snapshot(test_db_session, "visible_user")
+        visit_service.update_visits_visibility(test_db_session, "visible_user", False)
+        after = user_service.get_user_snapshot(test_db_session, "visible_user")
+
+        assert before.visits_visible is True
+        assert after.visits_visible is False
+
+    def test_user_snapshot_invalidated_on_delete(self, test_db_session, create_user):
+        create_user(user_id="gone_user", user_name="goneuser")
+
+        assert user_service.get_user_snapshot_by_username(test_db_session, "goneuser")
+        user_service.delete_user(test_db_session, "gone_user")
+
+        assert (
+            user_service.get_user_snapshot_by_username(test_db_session, "goneuser")
+            is None
+        )
@@ -7,6 +7,7 @@ import yaml
 from src.service.yaml_loader import (
     QuestionTemplate,
     YamlTemplateLoader,
+    _read_default_labels,
     get_yaml_loader,
     load_default_labels,
 )
@@ -202,6 +203,13 @@ class TestYamlTemplateLoader:
 
 @pytest.mark.unit
 class TestGlobalFunctions:
+    @pytest.fixture(autouse=True)
+    def clear_label_cache(self):
+        # ラベルは初回読み込み後キャッシュされるため、各テストでファイルから読み直す
+        _read_default_labels.cache_clear()
+        yield
+        _read_default_labels.cache_clear()
+
     def test_get_yaml_loader_singleton(self):
         loader1 = get_yaml_loader()
         loader2 = get_yaml_loader()